@@ -34,6 +34,7 @@ from .save import (
     npy2json,
     to_json,
     to_csv,
+    to_parquet,
     to_npy,
     to_xlsx,
     cwriter,
@@ -76,6 +77,7 @@ from .utils import (
     nonstationary_epdf,
     epdf,
     acorr,
+    acorr_batch,
     bidimensional_ecdf,
     bias_adjustment,
     probability_mapping,
@@ -124,6 +126,7 @@ __all__ = [
     "npy2json",
     "to_json",
     "to_csv",
+    "to_parquet",
     "to_npy",
     "to_xlsx",
     "cwriter",
@@ -156,6 +159,7 @@ __all__ = [
     "nonstationary_epdf",
     "epdf",
     "acorr",
+    "acorr_batch",
     "bidimensional_ecdf",
     "bias_adjustment",
     "probability_mapping",
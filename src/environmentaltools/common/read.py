@@ -1,6 +1,10 @@
+import copy
 import json
+import os
 import sys
 from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
 from zipfile import ZipFile
 
 import numpy as np
@@ -17,6 +21,11 @@ import PyPDF2
 from tabula import read_pdf
 from environmentaltools.common import utils
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def keys_as_int(obj: dict):
     """Convert the keys at reading json file into a dictionary of integers.
 
@@ -72,11 +81,13 @@ def keys_as_nparray(obj: dict):
     return out
 
 
-def read_json(file_name: str, conversion_type: str = None):
+def read_json(file_name: str, conversion_type: str = None, cache: bool = False):
     """Read data from JSON files with optional type conversion.
 
     Loads JSON files and converts keys to integers or numpy arrays based on
-    the specified conversion type.
+    the specified conversion type. Parsed files are memoized on their path,
+    modification time and size, so reloading an unchanged file skips parsing.
+    A deep copy is returned so callers can modify the result freely.
 
     Args:
         file_name (str): Path to the JSON file.
@@ -84,18 +95,153 @@ def read_json(file_name: str, conversion_type: str = None):
             - "td" (temporal dependency): Converts values to numpy arrays
             - None or other: Converts keys to integers
             Defaults to None.
+        cache (bool): If True, the numeric arrays of the document are stored in a
+            binary ``<file_name>.npz`` file (``<file_name>.td.npz`` for "td") next
+            to the source and reused while it is newer than the source file,
+            skipping the JSON parsing on later reads. Worthwhile for large
+            documents such as fitted VAR models. Defaults to False.
 
     Returns:
         dict: Loaded and converted dictionary data.
     """
+    stat = os.stat(file_name)
+    params = _read_json_cached(
+        os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size, conversion_type, cache
+    )
+    return copy.deepcopy(params)
+
+
+@lru_cache(maxsize=32)
+def _read_json_cached(
+    file_name: str, mtime_ns: int, size: int, conversion_type: str, cache: bool = False
+):
+    """Parse a JSON file; ``mtime_ns`` and ``size`` only key the cache."""
     if conversion_type == "td":
-        params = json.load(open(file_name, "r"), object_hook=keys_as_nparray)
+        object_hook = keys_as_nparray
     else:
-        params = json.load(open(file_name, "r"), object_hook=keys_as_int)
+        object_hook = keys_as_int
+
+    suffix = ".td.npz" if conversion_type == "td" else ".npz"
+    cache_file = Path(f"{file_name}{suffix}")
+    if cache and cache_file.exists():
+        if cache_file.stat().st_mtime >= Path(file_name).stat().st_mtime:
+            return _read_json_npz(cache_file, object_hook)
+
+    params = _parse_json(file_name, object_hook)
+    if cache:
+        _write_json_npz(cache_file, params)
+    return params
+
+
+def _parse_json(file_name: str, object_hook):
+    """Decode a JSON file applying ``object_hook`` to every dictionary."""
+    with open(file_name, "rb") as file_:
+        content = file_.read()
+
+    if orjson is not None:
+        try:
+            return _apply_object_hook(orjson.loads(content), object_hook)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN/Infinity literals written by the json module
+            pass
+    params = json.loads(content, object_hook=object_hook)
     return params
 
 
-def read_pde(file_name: str, new_format: bool = False):
+def _write_json_npz(cache_file: Path, params: dict):
+    """Store a decoded JSON document as a binary ``.npz`` file.
+
+    Numeric arrays and flat lists of numbers at the first level are saved as
+    raw arrays. The remaining entries, together with the key order and the
+    names of the entries that were lists, are kept as a small JSON string.
+    Documents that cannot be split this way are not cached.
+
+    Args:
+        cache_file (Path): Output ``.npz`` file.
+        params (dict): Decoded document as returned by ``read_json``.
+    """
+    if not isinstance(params, dict):
+        return
+
+    arrays, lists, rest = {}, [], {}
+    for key, value in params.items():
+        if isinstance(key, str) and not key.startswith("__"):
+            if isinstance(value, np.ndarray) and value.dtype.kind in "biufcU":
+                arrays[key] = value
+                continue
+            if _is_numeric_list(value):
+                arrays[key] = np.asarray(value)
+                lists.append(key)
+                continue
+        rest[key] = value
+
+    try:
+        rest = json.dumps(rest, default=_ndarray_to_list)
+    except (TypeError, ValueError):
+        return
+    meta = json.dumps({"order": [str(key) for key in params], "lists": lists})
+    np.savez(cache_file, __meta__=np.asarray(meta), __rest__=np.asarray(rest), **arrays)
+    return
+
+
+def _read_json_npz(cache_file: Path, object_hook):
+    """Rebuild a document stored by ``_write_json_npz``."""
+    with np.load(cache_file) as cached:
+        meta = json.loads(str(cached["__meta__"]))
+        rest = json.loads(str(cached["__rest__"]), object_hook=object_hook)
+        arrays = {key: cached[key] for key in cached.files if not key.startswith("__")}
+
+    for key in meta["lists"]:
+        arrays[key] = arrays[key].tolist()
+    rest = {str(key): (key, value) for key, value in rest.items()}
+
+    params = {}
+    for key in meta["order"]:
+        if key in arrays:
+            params[key] = arrays[key]
+        else:
+            original_key, value = rest[key]
+            params[original_key] = value
+    return params
+
+
+def _ndarray_to_list(obj):
+    """``json.dumps`` fallback for arrays left by the ``"td"`` conversion."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _is_numeric_list(value) -> bool:
+    """Check that ``value`` is a non-empty flat list of floats or of integers."""
+    if not isinstance(value, list) or not value:
+        return False
+    type_ = type(value[0])
+    return type_ in (float, int) and all(type(item) is type_ for item in value)
+
+
+def _apply_object_hook(obj, object_hook):
+    """Apply a json object hook to an already decoded JSON document.
+
+    Mimics the behaviour of ``json.loads(..., object_hook=...)``: the hook is
+    called bottom-up on every decoded dictionary, so nested objects are
+    converted before their parents.
+
+    Args:
+        obj: Decoded JSON document (dict, list or scalar).
+        object_hook (callable): Function applied to each dictionary.
+
+    Returns:
+        The document with every dictionary replaced by ``object_hook(dict)``.
+    """
+    if isinstance(obj, dict):
+        return object_hook({key: _apply_object_hook(value, object_hook) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return [_apply_object_hook(value, object_hook) for value in obj]
+    return obj
+
+
+def read_pde(file_name: str, new_format: bool = False, cache: bool = False):
     """Read data from Spanish Puertos del Estado (PdE) wave buoy files.
 
     Parses wave data files from the Spanish port authority, handling both
@@ -105,12 +251,26 @@ def read_pde(file_name: str, new_format: bool = False):
         file_name (str): Path to the PdE data file.
         new_format (bool): If True, uses new PdE file format. If False, uses legacy format
             with auto-detection of data start row. Defaults to False.
+        cache (bool): If True, the parsed data is stored in a binary ``<file_name>.npz``
+            file next to the source and reused while it is newer than the source
+            file, skipping the text parsing on later reads. Defaults to False.
 
     Returns:
         pd.DataFrame: Wave parameters with datetime index. Columns include significant
             wave height (Hs), mean period (Tm), peak period (Tp), mean direction (DirM),
             and swell components. Invalid values (-100, -99.9, -9999) are replaced with NaN.
     """
+    cache_file = Path(f"{file_name}.npz")
+    if cache and cache_file.exists():
+        if cache_file.stat().st_mtime >= Path(file_name).stat().st_mtime:
+            with np.load(cache_file) as cached:
+                data = pd.DataFrame(
+                    cached["values"],
+                    index=pd.DatetimeIndex(cached["index"], name="date"),
+                    columns=cached["columns"],
+                )
+            return data
+
     if new_format:
         data = pd.read_table(
             file_name,
@@ -155,6 +315,14 @@ def read_pde(file_name: str, new_format: bool = False):
     # Replace invalid/missing data values with NaN
     invalid_values = [-100, -99.9, -99.99, -9999, -9999.9]
     data.replace(invalid_values, np.nan, inplace=True)
+
+    if cache:
+        np.savez(
+            cache_file,
+            index=data.index.values,
+            columns=data.columns.values.astype(str),
+            values=data.to_numpy(dtype=float),
+        )
     return data
 
 
@@ -174,7 +342,8 @@ def csv(
     various encodings, and handling of non-natural date formats (e.g., 30-day months).
 
     Args:
-        file_name (str): Path to CSV file (supports .csv, .txt, .dat, .zip).
+        file_name (str): Path to CSV file (supports .csv, .txt, .dat, .zip). Parquet
+            files (.parquet), as written by the simulations, are read directly.
         ts (bool): If True, treats first column as datetime index. Defaults to False.
         date_format (str, optional): Date format string for parsing. Defaults to None.
         sep (str): Column separator character. Defaults to ",".
@@ -192,18 +361,30 @@ def csv(
     # else:
     #     filename = str(file_name)
 
+    if str(file_name).endswith(".parquet"):
+        data = pd.read_parquet(file_name)
+        return data[data != no_data_values]
+
     if non_natural_date:
         ts = False
 
     if not ts:
         if "zip" in file_name:
-            data = pd.read_csv(
-                file_name,
-                sep=sep,
-                index_col=index_col,
-                compression="zip",
-                engine="python",
-            )
+            try:
+                data = pd.read_csv(
+                    file_name,
+                    sep=sep,
+                    index_col=index_col,
+                    compression="zip",
+                )
+            except pd.errors.ParserError:
+                data = pd.read_csv(
+                    file_name,
+                    sep=sep,
+                    index_col=index_col,
+                    compression="zip",
+                    engine="python",
+                )
         else:
             try:
                 data = pd.read_csv(
@@ -235,7 +416,10 @@ def csv(
                     index_col=index_col,
                     compression="zip",
                     date_format=date_format,
+                    engine=_csv_engine(),
                 )
+                # pyarrow returns date-only columns as datetime.date objects
+                data.index = pd.to_datetime(data.index).as_unit("ns")
             except Exception as e:
                 data = pd.read_csv(
                     file_name,
@@ -253,8 +437,11 @@ def csv(
                     parse_dates=["date"],
                     index_col=["date"],
                     date_format=date_format,
+                    engine=_csv_engine(),
                 )
-            except (KeyError, pd.errors.ParserError):
+                # pyarrow returns date-only columns as datetime.date objects
+                data.index = pd.to_datetime(data.index).as_unit("ns")
+            except (KeyError, pd.errors.ParserError, ValueError):
                 if date_format is None:
                     data = pd.read_csv(
                         file_name,
@@ -297,24 +484,56 @@ def npy(file_name: str):
     return data
 
 
-def xlsx(file_name: str, sheet_name: str = 0, names: str = None):
+def xlsx(file_name: str, sheet_name: str = 0, names: str = None, cache: bool = False):
     """Read Excel file (.xls or .xlsx).
 
     Reads Excel workbook with support for specific sheets and column naming.
+    The Rust-based calamine engine is used when python-calamine is installed.
 
     Args:
         file_name (str): Path to Excel file.
         sheet_name (str or int): Sheet name or index to read. Defaults to 0 (first sheet).
         names (list, optional): Custom column names. Defaults to None (use file headers).
+        cache (bool): If True, the sheet is stored in a binary
+            ``<file_name>.<sheet_name>.pkl`` file next to the workbook and reused
+            while it is newer than the workbook. Not used when ``names`` is given.
+            Defaults to False.
 
     Returns:
         pd.DataFrame: Data from specified Excel sheet with first column as index.
     """
-    xlsx = pd.ExcelFile(file_name)
+    cache = cache and names is None
+    cache_file = Path(f"{file_name}.{sheet_name}.pkl")
+    if cache and cache_file.exists():
+        if cache_file.stat().st_mtime >= Path(file_name).stat().st_mtime:
+            return pd.read_pickle(cache_file)
+
+    xlsx = pd.ExcelFile(file_name, engine=_excel_engine())
     data = pd.read_excel(xlsx, sheet_name=sheet_name, index_col=0, names=names)
+
+    if cache:
+        data.to_pickle(cache_file)
     return data
 
 
+def _csv_engine():
+    """Return "pyarrow" if pyarrow is installed, else "c" (pandas default)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "c"
+    return "pyarrow"
+
+
+def _excel_engine():
+    """Return "calamine" if python-calamine is installed, else None (pandas default)."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    return "calamine"
+
+
 def netcdf(
     file_name: str,
     variables: str = None,
@@ -9,6 +9,11 @@ import rasterio
 from affine import Affine
 import shapefile
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def npy2json(params: dict):
     """Convert dictionary with numpy arrays to JSON format and save to file.
@@ -48,7 +53,9 @@ def to_json(params: dict, file_name: str, numpy_array_serialization: bool = Fals
     """Save dictionary to JSON file with optional numpy array serialization.
 
     Exports data to JSON format with optional automatic conversion of numpy
-    arrays to lists for JSON compatibility.
+    arrays to lists for JSON compatibility. If orjson is installed it is used
+    as serializer; the json module is kept for documents with NaN or infinite
+    values, which orjson cannot represent. Both write 2-space indentation.
 
     Args:
         params (dict): Data dictionary to save.
@@ -59,26 +66,67 @@ def to_json(params: dict, file_name: str, numpy_array_serialization: bool = Fals
     Returns:
         None
     """
-    with open(f"{str(file_name)}", "w") as f:
-        if numpy_array_serialization:
-            for key in params.keys():
-                if isinstance(params[key], dict):
-                    for subkey in params[key].keys():
-                        try:
-                            params[key][subkey] = params[key][subkey].tolist()
-                        except (AttributeError, TypeError):
-                            pass
-                else:
+    if numpy_array_serialization:
+        for key in params.keys():
+            if isinstance(params[key], dict):
+                for subkey in params[key].keys():
                     try:
-                        params[key] = params[key].tolist()
+                        params[key][subkey] = params[key][subkey].tolist()
                     except (AttributeError, TypeError):
                         pass
-        json.dump(params, f, ensure_ascii=False, indent=4)
+            else:
+                try:
+                    params[key] = params[key].tolist()
+                except (AttributeError, TypeError):
+                    pass
+
+    if (orjson is not None) and _all_finite(params):
+        try:
+            content = orjson.dumps(
+                params,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            with open(f"{str(file_name)}", "wb") as f:
+                f.write(content)
+            return
+
+    with open(f"{str(file_name)}", "w") as f:
+        json.dump(params, f, ensure_ascii=False, indent=2)
 
     return
 
 
-def to_csv(data: pd.DataFrame, file_name: str, compression: str = "infer"):
+def _all_finite(obj):
+    """Check that a JSON-like document holds no NaN or infinite float.
+
+    Args:
+        obj: Dictionary, list, numpy array or scalar.
+
+    Returns:
+        bool: False if any float value is NaN or infinite.
+    """
+    if isinstance(obj, dict):
+        return all(_all_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return all(_all_finite(value) for value in obj)
+    if isinstance(obj, np.ndarray):
+        return (not np.issubdtype(obj.dtype, np.floating)) or bool(np.isfinite(obj).all())
+    if isinstance(obj, (float, np.floating)):
+        return bool(np.isfinite(obj))
+    return True
+
+
+def to_csv(
+    data: pd.DataFrame,
+    file_name: str,
+    compression: str = "infer",
+    compresslevel: int = 3,
+):
     """Save DataFrame to CSV file with optional compression.
 
     Exports data to CSV format with automatic compression detection or
@@ -89,18 +137,50 @@ def to_csv(data: pd.DataFrame, file_name: str, compression: str = "infer"):
         file_name (str): Output file path.
         compression (str): Compression type ('infer', 'zip', 'gzip', etc.).
             Defaults to 'infer' (auto-detect from extension).
+        compresslevel (int): Deflate level of zip files, from 0 to 9. Low levels
+            are much faster for a slightly larger file. Defaults to 3.
 
     Returns:
         None
     """
     if ".zip" in file_name:
-        data.to_csv(file_name, compression="zip")
+        data.to_csv(
+            file_name, compression={"method": "zip", "compresslevel": compresslevel}
+        )
     else:
         data.to_csv(file_name, compression=compression)
 
     return
 
 
+def to_parquet(data: pd.DataFrame, file_name: str, compression_level: int = 3):
+    """Save DataFrame to a Parquet file compressed with Zstandard.
+
+    Stores the floating-point columns in binary form, which is much smaller and
+    faster to write and read than CSV. The bytes of the floats are split in
+    streams (byte-stream-split encoding), which compresses much better than
+    the dictionary encoding for continuous values. Requires pyarrow.
+
+    Args:
+        data (pd.DataFrame): Data to save.
+        file_name (str): Output file path.
+        compression_level (int): Zstandard compression level. Defaults to 3.
+
+    Returns:
+        None
+    """
+    data.to_parquet(
+        file_name,
+        engine="pyarrow",
+        compression="zstd",
+        compression_level=compression_level,
+        use_dictionary=False,
+        use_byte_stream_split=True,
+    )
+
+    return
+
+
 def to_npy(data: np.ndarray, file_name: str):
     """Save numpy array to binary .npy file.
 
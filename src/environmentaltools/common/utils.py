@@ -4,9 +4,11 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import scipy.stats as st
+from scipy.fft import irfft, next_fast_len, rfft, set_backend
 from scipy.interpolate import Rbf
 from scipy.optimize import differential_evolution, minimize
 from scipy.signal import savgol_filter
+from scipy.spatial.distance import cdist
 from sklearn import svm
 from sklearn.covariance import EllipticEnvelope
 from sklearn.ensemble import IsolationForest
@@ -114,7 +116,7 @@ def gaps(data: pd.DataFrame, variables: str | list, file_name: str = "gaps", buo
         dt_nan = data[i].dropna()  # Remove NaNs for the variable
         if buoy:
             # Count good quality data points if buoy
-            quality = np.sum(data.loc[dt_nan.index, "Qc_e"] <= 2)
+            quality = np.count_nonzero(data.loc[dt_nan.index, "Qc_e"] <= 2)
 
         # Calculate time differences (in hours) between consecutive non-NaN samples
         dt0 = (dt_nan.index[1:] - dt_nan.index[:-1]).total_seconds() / 3600
@@ -182,28 +184,36 @@ def nonstationary_ecdf(
         if (variable == "Hs") | (variable == "Hm0"):
             pemp = np.array([0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 0.995])
 
-    # Create result DataFrame: rows are unique normalized times, columns are percentiles
-    res = pd.DataFrame(0, index=data.n.unique(), columns=pemp)
+    # Sort the valid values by normalized time, so every window is a contiguous
+    # range found by binary search instead of a mask over the whole series
+    valid = data[variable].notna().to_numpy()
+    n_ = data["n"].to_numpy()[valid]
+    order_ = np.argsort(n_, kind="stable")
+    n_ = n_[order_]
+    values = data[variable].to_numpy(dtype=float)[valid][order_]
+
+    # Rows are unique normalized times, columns are percentiles
+    index = data.n.unique()
+    quantiles = np.full([len(index), len(pemp)], np.nan)
 
     # For each time index, compute percentiles in a moving window
-    for i in res.index:
+    for k, i in enumerate(index):
+        lower = np.searchsorted(n_, i - wlen, side="left")
+        upper = np.searchsorted(n_, i + wlen, side="right")
+        window = values[lower:upper]
         if i >= (1 - wlen):
             # Handle window at the end of the time series (wrap-around)
-            final_offset = i + wlen - 1
-            mask = ((data["n"] >= i - wlen) & (data["n"] <= i + wlen)) | (
-                data["n"] <= final_offset
-            )
+            final_offset = min(np.searchsorted(n_, i + wlen - 1, side="right"), lower)
+            window = np.concatenate([values[:final_offset], window])
         elif i <= wlen:
             # Handle window at the start of the time series (wrap-around)
-            initial_offset = i - wlen
-            mask = ((data["n"] >= i - wlen) & (data["n"] <= i + wlen)) | (
-                data["n"] >= 1 + initial_offset
-            )
-        else:
-            # Standard window in the middle
-            mask = (data["n"] >= i - wlen) & (data["n"] <= i + wlen)
+            initial_offset = max(np.searchsorted(n_, 1 + i - wlen, side="left"), upper)
+            window = np.concatenate([window, values[initial_offset:]])
         # Compute percentiles for the window
-        res.loc[i, pemp] = data[variable].loc[mask].quantile(q=pemp).values
+        if window.size:
+            quantiles[k] = np.quantile(window, pemp)
+
+    res = pd.DataFrame(quantiles, index=index, columns=pemp)
 
     return res, pemp
 
@@ -367,7 +377,7 @@ def epdf(df: pd.DataFrame, variable: str, num_bins: int = 14) -> pd.DataFrame:
     count_ = pd.DataFrame(-1, index=dfs[variable].unique(), columns=["prob"])
 
     for _, ind_ in enumerate(count_.index):
-        count_.loc[ind_] = np.sum(dfs[variable] == ind_)
+        count_.loc[ind_] = np.count_nonzero(dfs[variable] == ind_)
 
     values_ = np.linspace(df[variable].min(), df[variable].max(), num_bins)
     pdf_ = pd.DataFrame(-1, index=(values_[:-1] + values_[1:]) / 2, columns=["prob"])
@@ -386,21 +396,71 @@ def epdf(df: pd.DataFrame, variable: str, num_bins: int = 14) -> pd.DataFrame:
 def acorr(data: np.ndarray | pd.Series, max_lags: int = 24):
     """Compute autocorrelation function of a time series.
 
-    Calculates the normalized autocorrelation for a range of lags using
-    matplotlib's autocorrelation function.
+    Calculates the normalized autocorrelation for a range of lags, as
+    matplotlib's ``acorr`` does (no detrending), through the FFT of the series.
 
     Args:
         data (np.ndarray or pd.Series): Input time series data.
         max_lags (int): Maximum number of lags to compute. Defaults to 24.
 
     Returns:
-        tuple: (lags, autocorrelation) - Arrays of lag values and corresponding
-            autocorrelation coefficients.
+        tuple: (lags, autocorrelation) - Arrays of lag values from -max_lags to
+            max_lags and corresponding autocorrelation coefficients.
     """
-    lags, c_, _, _ = plt.acorr(data, usevlines=False, maxlags=max_lags, normed=True)
-    plt.close()
-    # lags, c_ = lags[-maxlags:], c_[-maxlags:]
-    return lags, c_
+    lags, c_ = acorr_batch(np.asarray(data, dtype=float)[np.newaxis, :], max_lags)
+    return lags, c_[0]
+
+
+def _fft_backend():
+    """Return the pyFFTW scipy.fft backend (with its plan cache enabled) if pyfftw
+    is installed, else "scipy" (pocketfft)."""
+    try:
+        import pyfftw
+    except ImportError:
+        return "scipy"
+    pyfftw.interfaces.cache.enable()
+    return pyfftw.interfaces.scipy_fft
+
+
+def acorr_batch(data: np.ndarray, max_lags: int = 24, workers: int = None):
+    """Compute the autocorrelation function of several time series at once.
+
+    The autocorrelations are obtained from the power spectrum of every row
+    (Wiener-Khinchin theorem), zero-padded to avoid circular wrapping, and
+    normalized by the value at lag zero.
+
+    Args:
+        data (np.ndarray): Input time series, one per row (n_series x time).
+            Single precision input is transformed in single precision.
+        max_lags (int): Maximum number of lags to compute (None for all of
+            them, nobs - 1). Defaults to 24.
+        workers (int, optional): Number of threads of the transforms (-1 for all
+            the cores). Defaults to None (single thread).
+
+    Returns:
+        tuple: (lags, autocorrelation) - Array of lag values from -max_lags to
+            max_lags and array (n_series x (2 * max_lags + 1)) of autocorrelation
+            coefficients.
+    """
+    data = np.asarray(data)
+    if data.dtype != np.float32:
+        data = data.astype(float, copy=False)
+    nobs = data.shape[1]
+    if max_lags is None:
+        max_lags = nobs - 1
+    if max_lags >= nobs or max_lags < 1:
+        raise ValueError(f"max_lags must be None or strictly positive < {nobs}")
+
+    nfft = next_fast_len(2 * nobs - 1, real=True)
+    # Series of the same length share the FFT plan (cached by pocketfft or pyFFTW)
+    with set_backend(_fft_backend()):
+        spectrum = rfft(data, nfft, axis=1, workers=workers)
+        c_ = irfft(spectrum * np.conj(spectrum), nfft, axis=1, workers=workers)
+    c_ = c_[:, : max_lags + 1]
+    c_ /= c_[:, :1]
+
+    lags = np.arange(-max_lags, max_lags + 1)
+    return lags, np.hstack((c_[:, :0:-1], c_))
 
 
 def bidimensional_ecdf(data1: np.ndarray, data2: np.ndarray, num_bins: int):
@@ -741,6 +801,48 @@ def optimize_rbf_epsilon(coords, data, n_train, method="gaussian", smooth=0.5, e
 
 
 
+# Kernels of the legacy Rbf functions written in terms of the squared scaled
+# distance (r / epsilon)**2, so they are evaluated without the square root
+_RBF_SQUARED_KERNELS = {
+    "multiquadric": lambda r2: np.sqrt(r2 + 1),
+    "inverse": lambda r2: 1 / np.sqrt(r2 + 1),
+    "gaussian": lambda r2: np.exp(-r2),
+}
+
+
+def rbf_evaluate(func, points, chunk=5000):
+    """Evaluate a scipy.interpolate.Rbf at the given points.
+
+    The multiquadric, inverse and gaussian kernels are computed from the squared
+    euclidean distances to the nodes, which skips the square root of every
+    distance. The points are evaluated by chunks, so the matrix of distances
+    stays small. Other kernels or norms use the Rbf itself.
+
+    Args:
+        func (scipy.interpolate.Rbf): Fitted interpolator.
+        points (np.ndarray): Evaluation points (n_points, n_features).
+        chunk (int, optional): Number of points evaluated at once. Default 5000.
+
+    Returns:
+        np.ndarray: Interpolated values at the points.
+    """
+    kernel = None
+    if func.norm == "euclidean" and isinstance(func.function, str):
+        kernel = _RBF_SQUARED_KERNELS.get(func.function.lower())
+
+    # At least one (possibly empty) chunk, so that no points give an empty array
+    values = []
+    for i in range(0, max(len(points), 1), chunk):
+        block = points[i : i + chunk]
+        if kernel is None:
+            values.append(func(*block.T))
+        else:
+            r2 = cdist(block, func.xi.T, metric="sqeuclidean")
+            r2 /= func.epsilon**2
+            values.append(kernel(r2) @ func.nodes)
+    return np.concatenate(values)
+
+
 def rbf_error_metric(params, coords, data, train_idx, valid_idx, method, metric="rmse"):
     """
     Compute the error of an RBF for given epsilon and smooth values.
@@ -763,7 +865,7 @@ def rbf_error_metric(params, coords, data, train_idx, valid_idx, method, metric=
     func = Rbf(
         *coords[train_idx, :].T, data[train_idx], function=method, smooth=smooth, epsilon=epsilon
     )
-    validation = func(*coords[valid_idx, :].T)
+    validation = rbf_evaluate(func, coords[valid_idx, :])
     if metric == "mae":
         error = np.mean(np.abs(validation - data[valid_idx]))
     else:
@@ -297,6 +297,20 @@ def save_waypoints_csv(waypoints, output_path, polygon_number=None):
     return filepath
 
 
+def _vector_write_options():
+    """Return the options to write vector files through Arrow buffers with
+    pyogrio if pyogrio and pyarrow are installed and GDAL supports Arrow
+    writes (3.8 or later), else none (geopandas default)."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyogrio
+    except ImportError:
+        return {}
+    if pyogrio.__gdal_version__ < (3, 8, 0):
+        return {}
+    return {"engine": "pyogrio", "use_arrow": True}
+
+
 def save_waypoints_gpkg(waypoints, output_path):
     """Saves waypoints in GeoPackage format.
     
@@ -317,13 +331,15 @@ def save_waypoints_gpkg(waypoints, output_path):
         
     df = pd.DataFrame(waypoints)
     gdf_points = gpd.GeoDataFrame(
-        df.copy(),
+        df,
         geometry=gpd.points_from_xy(df["longitude"], df["latitude"]),
         crs="EPSG:4326",
     )
     
     filepath = os.path.join(output_path, "waypoints_dji.gpkg")
-    gdf_points.to_file(filepath, layer="waypoints", driver="GPKG")
+    gdf_points.to_file(
+        filepath, layer="waypoints", driver="GPKG", **_vector_write_options()
+    )
     
     return filepath
 
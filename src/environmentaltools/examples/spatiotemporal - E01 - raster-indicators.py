@@ -35,7 +35,8 @@ import environmentaltools.spatiotemporal.indicators as indicators
 import numpy as np
 
 # Data simulation: (time, latitude, longitude)
-data_cube = np.random.rand(12, 100, 100)
+# Single precision halves the memory traffic of the indicators
+data_cube = np.random.rand(12, 100, 100).astype(np.float32)
 threshold = 0.8
 size = 3  # Neighborhood size
 
@@ -133,11 +134,22 @@ threshold = 0.7
 persistence_ratio = 0.8
 mask, freq_map = indicators.permanently_affected_zone(data_cube, threshold, persistence_ratio)
 
+# Polygonize the persistent region in a single GDAL call. The half-cell shift
+# aligns the polygon corners with the pixel edges drawn by imshow.
+from affine import Affine
+from rasterio import features
+
+mask_uint8 = mask.astype(np.uint8)
+zone_polygons = features.shapes(mask_uint8, mask=mask_uint8, transform=Affine.translation(-0.5, -0.5))
+
 plt.figure()
 plt.imshow(freq_map, cmap='plasma')
-plt.contour(mask, levels=[0.5], colors='white')
-plt.title("Permanently Affected Zone")
 plt.colorbar(label='Proportion of Time Above Threshold')
+for polygon, _ in zone_polygons:
+    for ring in polygon["coordinates"]:
+        ring = np.asarray(ring)
+        plt.plot(ring[:, 0], ring[:, 1], color='white')
+plt.title("Permanently Affected Zone")
 plt.show()
 
 # ------------------------------------------------------------
@@ -246,14 +258,16 @@ print(f"Final functional area: {area_end}")
 
 # Indicator 9: Critical Boundary Retreat
 threshold = 0.6
-contours_start, contours_end, retreat_mask = indicators.critical_boundary_retreat(data_cube, threshold, t_start=0, t_end=-1)
+# Contours come packed as one coordinate buffer plus the offsets of each contour
+contours_start, contours_end, retreat_mask = indicators.critical_boundary_retreat(
+    data_cube, threshold, t_start=0, t_end=-1, packed=True
+)
 
 plt.figure()
 plt.imshow(retreat_mask, cmap='Purples')
-for c in contours_start:
-    plt.plot(c[:, 1], c[:, 0], color='green', label='Start')
-for c in contours_end:
-    plt.plot(c[:, 1], c[:, 0], color='orange', label='End')
+for (coords, offsets), color, label in [(contours_start, 'green', 'Start'), (contours_end, 'orange', 'End')]:
+    for first, last in zip(offsets[:-1], offsets[1:]):
+        plt.plot(coords[first:last, 1], coords[first:last, 0], color=color, label=label)
 plt.title("Critical Boundary Retreat")
 plt.legend()
 plt.show()
@@ -269,49 +283,50 @@ plt.show()
 # Code Cell 25
 # ------------------------------------------------------------
 
-# 10. Neighbourhood Mean
-neigh_cube = indicators.neighbourhood_mean(data_cube, size=size)
-neigh_mean_map = np.mean(neigh_cube, axis=0)
-plt.figure()
-plt.imshow(neigh_mean_map, cmap='viridis')
-plt.title("Neighbourhood Mean")
-plt.colorbar()
+# The six neighbourhood indicators are independent of each other, so they are
+# computed concurrently. Threads share data_cube without copying it and NumPy
+# and SciPy release the GIL inside their array kernels.
+from concurrent.futures import ThreadPoolExecutor
 
-# 11. Neighbourhood Gradient Influence
-influence_map = indicators.neighbourhood_gradient_influence(data_cube, size=size)
-plt.figure()
-plt.imshow(influence_map, cmap='plasma')
-plt.title("Neighbourhood Gradient Influence")
-plt.colorbar()
+with ThreadPoolExecutor(max_workers=6) as executor:
+    futures = {
+        "neigh_cube": executor.submit(indicators.neighbourhood_mean, data_cube, size=size),
+        "influence_map": executor.submit(indicators.neighbourhood_gradient_influence, data_cube, size=size),
+        "convergence_map": executor.submit(indicators.environmental_convergence, data_cube, size=size),
+        "polarization_map": executor.submit(indicators.neighbourhood_polarization, data_cube, size=size),
+        "persistence_map": executor.submit(indicators.local_persistence, data_cube, size=size),
+        "risk_map": executor.submit(indicators.environmental_risk, data_cube, threshold=threshold, size=size),
+    }
+    neighbourhood_results = {name: future.result() for name, future in futures.items()}
 
+# 10. Neighbourhood Mean
+neigh_mean_map = np.mean(neighbourhood_results["neigh_cube"], axis=0)
+# 11. Neighbourhood Gradient Influence
+influence_map = neighbourhood_results["influence_map"]
 # 12. Environmental Convergence
-convergence_map = indicators.environmental_convergence(data_cube, size=size)
-plt.figure()
-plt.imshow(convergence_map, cmap='coolwarm')
-plt.title("Environmental Convergence (Trend of Difference)")
-plt.colorbar()
-
+convergence_map = neighbourhood_results["convergence_map"]
 # 13. Neighbourhood Polarization
-polarization_map = indicators.neighbourhood_polarization(data_cube, size=size)
-plt.figure()
-plt.imshow(polarization_map, cmap='magma')
-plt.title("Neighbourhood Polarization")
-plt.colorbar()
-
+polarization_map = neighbourhood_results["polarization_map"]
 # 14. Local Persistence
-persistence_map = indicators.local_persistence(data_cube, size=size)
-plt.figure()
-plt.imshow(persistence_map, cmap='cividis')
-plt.title("Local Persistence")
-plt.colorbar(label='Proportion of Time Dominant')
-
+persistence_map = neighbourhood_results["persistence_map"]
 # 15. Environmental Risk
-risk_map = indicators.environmental_risk(data_cube, threshold=threshold, size=size)
-plt.figure()
-plt.imshow(risk_map, cmap='inferno')
-plt.title("Environmental Risk")
-plt.colorbar(label='Risk Index')
-
+risk_map = neighbourhood_results["risk_map"]
+
+# All six maps are drawn in a single figure
+panels = [
+    (neigh_mean_map, "Neighbourhood Mean", 'viridis', None),
+    (influence_map, "Neighbourhood Gradient Influence", 'plasma', None),
+    (convergence_map, "Environmental Convergence (Trend of Difference)", 'coolwarm', None),
+    (polarization_map, "Neighbourhood Polarization", 'magma', None),
+    (persistence_map, "Local Persistence", 'cividis', 'Proportion of Time Dominant'),
+    (risk_map, "Environmental Risk", 'inferno', 'Risk Index'),
+]
+fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+for ax, (panel_map, title, cmap, label) in zip(axes.flat, panels):
+    im = ax.imshow(panel_map, cmap=cmap)
+    ax.set_title(title)
+    fig.colorbar(im, ax=ax, label=label)
+fig.tight_layout()
 plt.show()
 
 # ------------------------------------------------------------
@@ -356,10 +371,11 @@ plt.show()
 # ------------------------------------------------------------
 
 # Simulation of two variables: (time, lat, lon)
-cube_x = np.random.rand(12, 100, 100)
-cube_y = np.random.rand(12, 100, 100)
-cube_list = [cube_x, cube_y]
-thresholds = [0.8, 0.75]
+cube_x = np.random.rand(12, 100, 100).astype(np.float32)
+cube_y = np.random.rand(12, 100, 100).astype(np.float32)
+# Stack the variables once into a contiguous (variable, time, lat, lon) array
+cube_list = np.stack([cube_x, cube_y], axis=0)
+thresholds = np.array([0.8, 0.75], dtype=np.float32)
 size = 3
 
 # ------------------------------------------------------------
@@ -31,9 +31,10 @@ var = "s"
 covmodel, covparam = load(["family_" + var, "param_" + var], path)
 print(covparam)
 
-dfh = pd.read_csv(path + "/Hard_data.txt", sep=" ", names=["x", "y", "t", "h"])
-dfs = pd.read_csv(path + "/Soft_data.txt", sep=" ", names=["x", "y", "t", "h", "s"])
-dfk = pd.read_csv(path + "/Output_mesh.txt", sep=" ", names=["x", "y", "t"])
+# All columns are numeric: a fixed dtype lets the C parser skip type inference
+dfh = pd.read_csv(path + "/Hard_data.txt", sep=" ", names=["x", "y", "t", "h"], dtype=float)
+dfs = pd.read_csv(path + "/Soft_data.txt", sep=" ", names=["x", "y", "t", "h", "s"], dtype=float)
+dfk = pd.read_csv(path + "/Output_mesh.txt", sep=" ", names=["x", "y", "t"], dtype=float)
 
 # Smoothing signals
 zh, zs, zk, dfh, dfs = bme.smoothing(dfh, dfs, dfk, nmax, dmax, path)
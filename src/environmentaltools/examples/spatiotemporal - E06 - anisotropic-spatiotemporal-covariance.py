@@ -36,11 +36,12 @@ else:
 
 path = os.path.join("..", "ProcessedData", tstr[0] + "-" + tstr[1])
 
+# All columns are numeric: a fixed dtype lets the C parser skip type inference
 dfh = pd.read_csv(
-    os.path.join(path, "Hard_data.txt"), sep=" ", names=["x", "y", "t", "h"]
+    os.path.join(path, "Hard_data.txt"), sep=" ", names=["x", "y", "t", "h"], dtype=float
 )
 dfs = pd.read_csv(
-    os.path.join(path, "Soft_data.txt"), sep=" ", names=["x", "y", "t", "h", "s"]
+    os.path.join(path, "Soft_data.txt"), sep=" ", names=["x", "y", "t", "h", "s"], dtype=float
 )
 
 slag = smax * (1 - np.log(ns + 1 - (np.arange(ns) + 1)) / np.log(ns))
@@ -31,7 +31,8 @@ from environmentaltools.graphics import temporal
 # 2. Read SIMAR data and create the dictionary for marginal fit
 # The following code reads marine wave data from SIMAR node 2041080, including significant wave height (Hm0), peak period (Tp), and mean direction (DirM). As usual, some noise is included to ensure that the input variable is continuous and not discrete, which facilitates the statistical analysis.
 
-data = read.read_pde("./src/environmentaltools/data/temporal/marginal_fit/SIMAR_2041080")
+# The parsed series is cached as a binary .npz next to the source file
+data = read.read_pde("./src/environmentaltools/data/temporal/marginal_fit/SIMAR_2041080", cache=True)
 data = analysis.add_noise_to_array(data, ["Hm0"])
 
 # Once the SIMAR data is read, it is needed to create the dictionary with the properties about the temporal fluctuation and the probability models. In this example, we will analyze the significant wave height (Hm0) using a Weibull of maxima distribution whose parameters will be expanded in time using the sinusoidal structure with 10 terms. Since marine wave data shows high variability and seasonal patterns, a Box-Cox transformation will be applied to facilitate the convergence of the optimization. This information is translated to the dictionary as follows.
@@ -71,6 +71,7 @@ from environmentaltools.temporal import analysis
 import matplotlib.pyplot as plt
 import os
 import numpy as np
+import pandas as pd
 from environmentaltools.graphics import temporal
 
 # ============================================================================
@@ -87,6 +88,11 @@ data_file = "./src/environmentaltools/data/temporal/marginal_fit_simulation/CSC_
 output_dir = "./src/environmentaltools/data/temporal/marginal_fit_simulation/"
 os.makedirs(output_dir, exist_ok=True)
 
+# Files written by this example, recorded as they are saved so the summary
+# does not need to scan the output directories
+output_files = []
+marginal_files = []
+
 print("="*70)
 print("TEMPORAL MARGINAL DISTRIBUTION FITTING ANALYSIS")
 print("="*70)
@@ -103,15 +109,17 @@ print("="*50)
 
 # Load river discharge data from Excel file
 print(f"📖 Reading data from: {data_file}")
-data = read.xlsx(data_file)
+# The sheet is cached as a binary .pkl next to the workbook
+data = read.xlsx(data_file, cache=True)
 
 # Add noise to ensure continuous distribution
 # This is important for fitting continuous probability distributions
 print("🎲 Adding noise to ensure continuous distribution...")
 data = analysis.add_noise_to_array(data, ["Qd"])
 
-# Display basic data statistics
-qd_data = data["Qd"]
+# Display basic data statistics (a contiguous float array, reused by the
+# diagnostic plots below)
+qd_data = data["Qd"].to_numpy(dtype=float)
 print(f"✅ Data loaded successfully:")
 print(f"   📊 Variable: River discharge (Qd)")
 print(f"   📏 Data points: {len(qd_data)}")
@@ -192,6 +200,7 @@ print("✅ Marginal fitting completed successfully")
 
 # The results are automatically saved as JSON file
 result_path = params["file_name"]
+marginal_files.append(result_path)
 
 print(f"💾 Results saved to: {result_path}")
 
@@ -219,28 +228,19 @@ fig, axs = plt.subplots(1, 2, figsize=(15, 6))
 axs = axs.flatten()
 
 # Plot 1: Non-stationary CDF with transformation (normalized data)
+# Plot 2: Non-stationary CDF without transformation (original data)
+# Both panels are drawn in one call that shares the empirical and model percentiles
 print("   📈 Plot 1: Non-stationary CDF (transformed data)")
-fitted_params["transform"]["plot"] = True
+print("   📈 Plot 2: Non-stationary CDF (original data)")
 temporal.nonstationary_cdf(
     data,
     "Qd",
     fitted_params,
     date_axis=True,
-    ax=axs[0],
+    ax=axs,
 )
 axs[0].set_title("Non-stationary CDF (Transformed Data)", fontsize=12, fontweight='bold')
 axs[0].grid(True, alpha=0.3)
-
-# Plot 2: Non-stationary CDF without transformation (original data)
-print("   📈 Plot 2: Non-stationary CDF (original data)")
-fitted_params["transform"]["plot"] = False
-temporal.nonstationary_cdf(
-    data,
-    "Qd",
-    fitted_params,
-    date_axis=True,
-    ax=axs[1],
-)
 axs[1].set_title("Non-stationary CDF (Original Data)", fontsize=12, fontweight='bold')
 axs[1].grid(True, alpha=0.3)
 
@@ -252,6 +252,7 @@ plt.suptitle("Marginal Distribution Fitting Results - River Discharge Analysis",
 # Save the verification plot
 plot_filename = os.path.join(output_dir, "marginal_fit_verification.png")
 plt.savefig(plot_filename, dpi=300, bbox_inches='tight', facecolor='white')
+output_files.append(os.path.basename(plot_filename))
 print(f"💾 Verification plot saved: {plot_filename}")
 
 # Display the plot
@@ -287,7 +288,7 @@ try:
             axs2[0,0].grid(True, alpha=0.3)
         
         # Histogram
-        axs2[0,1].hist(data["Qd"], bins=50, alpha=0.7, color='skyblue', edgecolor='black')
+        axs2[0,1].hist(qd_data, bins=50, alpha=0.7, color='skyblue', edgecolor='black')
         axs2[0,1].set_title("Data Distribution", fontweight='bold')
         axs2[0,1].set_xlabel("River Discharge (Qd)")
         axs2[0,1].set_ylabel("Frequency")
@@ -296,13 +297,12 @@ try:
         # Box plot by season (simplified)
         seasonal_data = []
         if 'date' in data:
-            # This is a simplified seasonal analysis
-            months = [d.month if hasattr(d, 'month') else 1 for d in data['date']]
-            for season in range(1, 5):  # 4 seasons
-                season_months = [(season-1)*3 + 1, (season-1)*3 + 2, (season-1)*3 + 3]
-                season_data = [data["Qd"][i] for i, m in enumerate(months) if m in season_months]
-                if season_data:
-                    seasonal_data.append(season_data)
+            # This is a simplified seasonal analysis: 4 seasons of 3 months each
+            season = (pd.DatetimeIndex(data['date']).month.values - 1) // 3
+            seasonal_data = [
+                values.to_numpy()
+                for _, values in pd.Series(qd_data).groupby(season)
+            ]
         
         if seasonal_data:
             axs2[1,0].boxplot(seasonal_data, labels=['Winter', 'Spring', 'Summer', 'Autumn'])
@@ -325,6 +325,7 @@ try:
         # Save diagnostic plots
         diagnostic_filename = os.path.join(output_dir, "diagnostic_plots.png")
         plt.savefig(diagnostic_filename, dpi=300, bbox_inches='tight', facecolor='white')
+        output_files.append(os.path.basename(diagnostic_filename))
         print(f"💾 Diagnostic plots saved: {diagnostic_filename}")
         
         plt.show()
@@ -352,20 +353,12 @@ print(f"🌊 Basis functions: Sinusoidal with {params['basis_function']['no_term
 print(f"🔄 Transformation: {params['transform']['method']}")
 
 # List generated files
-output_files = []
-if os.path.exists(output_dir):
-    output_files = [f for f in os.listdir(output_dir) if f.endswith('.png')]
-
-marginal_files = []
-if os.path.exists("marginalfit"):
-    marginal_files = [f for f in os.listdir("marginalfit") if f.endswith('.json')]
-
 print(f"\n📋 Generated files:")
 print(f"   📊 Plots: {len(output_files)} files in {output_dir}/")
 for file in output_files:
     print(f"      📈 {file}")
 
-print(f"   📄 Results: {len(marginal_files)} files in marginalfit/")
+print(f"   📄 Results: {len(marginal_files)} files")
 for file in marginal_files:
     print(f"      💾 {file}")
     
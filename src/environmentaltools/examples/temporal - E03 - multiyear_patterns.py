@@ -23,7 +23,6 @@ Updated: 2025-11-11
 # IMPORT REQUIRED MODULES
 # ============================================================================
 
-from datetime import datetime
 import pandas as pd
 import numpy as np
 from environmentaltools.common import read
@@ -34,15 +33,12 @@ from environmentaltools.graphics import temporal
 # DATA LOADING AND PREPROCESSING
 # ============================================================================
 
-# Define date parser for monthly data format
-monthly_date_parser = lambda x: datetime.strptime(x, "%Y-%m")
-
-# Load sunspot data with proper datetime parsing
+# Load sunspot data parsing the monthly dates ("%Y-%m") in native code
 data = pd.read_csv(
     "./src/environmentaltools/data/temporal/marginal_fit/sunspots.txt",
     index_col=0,
-    parse_dates=["Month"], 
-    date_parser=monthly_date_parser,
+    parse_dates=["Month"],
+    date_format="%Y-%m",
 )
 
 # Add noise to ensure continuous distribution for statistical fitting
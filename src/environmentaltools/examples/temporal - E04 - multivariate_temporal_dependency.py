@@ -154,8 +154,9 @@ print(f"📄 Results saved to: {params['TD']['file_name']}")
 
 print("\n📊 Loading and verifying dependency analysis results...")
 
-# Load optimal VAR model results
-df_dt = read.read_json(params["TD"]["file_name"], "td")
+# Load optimal VAR model results (the arrays are cached in a binary .npz file
+# next to the JSON, so later runs skip parsing the large document)
+df_dt = read.read_json(params["TD"]["file_name"], "td", cache=True)
 
 print(f"✅ VAR model results loaded successfully:")
 print(f"   📏 Model dimensions: {df_dt.get('order', 'N/A')}")
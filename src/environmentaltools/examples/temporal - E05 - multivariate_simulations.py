@@ -180,17 +180,18 @@ print(f"   🌹 Wind rose directional distributions")
 print(f"   📊 Marginal distribution preservation")
 print(f"   🔄 Temporal correlation structure")
 
+# One print for the whole list (large ensembles have thousands of files)
 print(f"\n💾 Generated simulation files:")
-for i in range(1, params['TS']['nosim'] + 1):
-    print(f"   📄 simulation_{i:04d}.zip")
-
-print(f"\n🔬 Applications:")
-print(f"   💨 Wind resource assessment and forecasting")
-print(f"   🏗️ Offshore engineering and wind farm design")
-print(f"   🌊 Coastal and marine structure analysis")
-print(f"   📈 Long-term climate impact studies")
-
-print("\n" + "="*70)
+print("\n".join(f"   📄 simulation_{i:04d}.zip" for i in range(1, params['TS']['nosim'] + 1)))
+
+print(
+    "\n🔬 Applications:\n"
+    "   💨 Wind resource assessment and forecasting\n"
+    "   🏗️ Offshore engineering and wind farm design\n"
+    "   🌊 Coastal and marine structure analysis\n"
+    "   📈 Long-term climate impact studies\n"
+    "\n" + "=" * 70
+)
 
 # ============================================================================
 # USAGE NOTES
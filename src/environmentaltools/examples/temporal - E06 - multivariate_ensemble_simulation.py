@@ -40,6 +40,8 @@ Updated: 2025-11-11
 # IMPORT REQUIRED MODULES
 # ============================================================================
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 from environmentaltools.graphics import plots
@@ -85,15 +87,22 @@ try:
     df_sim = read.csv("data/simulation_0035")
     print(f"✅ Simulation data loaded: {df_sim.shape}")
     
-    # Load climate model projections
+    # Load climate model projections. Only the time index and the analysed
+    # variables are parsed (the header is read first to find them), directly as
+    # float32 so every model is stored in a single float32 block
     df_obs = dict()
     for i, model in enumerate(models):
         try:
+            file_name = f"data/data_{model}.csv"
+            header = pd.read_csv(file_name, nrows=0).columns
+            columns = [var_ for var_ in vars_ if var_ in header[1:]]
+            # Positions rather than names, since the index column may be unnamed
             df_obs[model] = pd.read_csv(
-                f"data/data_{model}.csv",
+                file_name,
+                usecols=[0] + [header.get_loc(var_) for var_ in columns],
                 index_col=0,
                 parse_dates=True,
-                infer_datetime_format=True,
+                dtype=dict.fromkeys(columns, np.float32),
             )
             print(f"   ✅ {model}: {df_obs[model].shape}")
         except FileNotFoundError:
@@ -172,30 +181,53 @@ if data_loaded and len(df_obs) > 0:
         print("🔄 Computing autocorrelations...")
         
         for var_ in vars_:
-            # Initialize arrays for model ensemble
-            lags[var_] = np.zeros([len(df_obs), maxlags])
-            c_[var_] = np.zeros([len(df_obs), maxlags])
-            
-            # Compute autocorrelation for each climate model
-            model_list = list(df_obs.keys())
-            for ind_, model in enumerate(model_list):
-                if var_ in df_obs[model].columns:
-                    try:
-                        lags[var_][ind_, :], c_[var_][ind_, :] = utils.acorr(
-                            df_obs[model][var_].values, maxlags=maxlags
-                        )
-                    except Exception as e:
-                        print(f"   ⚠️ {model} {var_}: {e}")
-            
-            # Compute autocorrelation for simulation
-            if var_ in df_sim.columns:
-                try:
-                    lagsim[var_], csim_[var_] = utils.acorr(
-                        df_sim[var_].values, maxlags=maxlags
-                    )
-                    print(f"   ✅ {var_}: Autocorrelations computed")
-                except Exception as e:
-                    print(f"   ⚠️ Simulation {var_}: {e}")
+            # Initialize arrays for model ensemble (lags from -maxlags to maxlags)
+            lags[var_] = np.zeros([len(df_obs), 2 * maxlags + 1])
+            c_[var_] = np.zeros([len(df_obs), 2 * maxlags + 1])
+
+        # Compute the autocorrelation of every variable of a climate model at once.
+        # The models are independent, so they run in a thread pool (the FFTs of
+        # scipy release the GIL)
+        model_list = list(df_obs.keys())
+        model_vars = {model: list(df_obs[model].columns) for model in model_list}
+        # Every model is a single float32 block stored as (variables x time), so
+        # its transposed array is a C-contiguous view handed to the FFTs without
+        # copying (ascontiguousarray only copies if that is not the case)
+        arrays = {
+            model: np.ascontiguousarray(
+                df_obs[model].to_numpy(np.float32).T
+            )
+            for model in sorted(model_list)
+        }
+        with ThreadPoolExecutor() as executor:
+            futures = {
+                model: executor.submit(
+                    utils.acorr_batch, arrays[model], max_lags=maxlags
+                )
+                for model in arrays
+            }
+        for ind_, model in enumerate(model_list):
+            try:
+                lags_, c_model = futures[model].result()
+                for k, var_ in enumerate(model_vars[model]):
+                    lags[var_][ind_, :], c_[var_][ind_, :] = lags_, c_model[k]
+            except Exception as e:
+                print(f"   ⚠️ {model}: {e}")
+
+        # Compute autocorrelation for simulation (a single call, so the transforms
+        # themselves use every core)
+        sim_vars = [var_ for var_ in vars_ if var_ in df_sim.columns]
+        try:
+            lags_, c_sim = utils.acorr_batch(
+                np.ascontiguousarray(df_sim[sim_vars].to_numpy(np.float32).T),
+                max_lags=maxlags,
+                workers=-1,
+            )
+            for k, var_ in enumerate(sim_vars):
+                lagsim[var_], csim_[var_] = lags_, c_sim[k]
+                print(f"   ✅ {var_}: Autocorrelations computed")
+        except Exception as e:
+            print(f"   ⚠️ Simulation: {e}")
         
         # Generate ensemble autocorrelation plots
         print("🎨 Generating ensemble autocorrelation plots...")
@@ -38,18 +38,44 @@ Updated: 2025-11-11
 # ============================================================================
 
 # Standard libraries for data manipulation and visualization
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")  # Non-interactive backend: the figures are only saved
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 
 # Environmentaltools modules for MDA and reconstruction
 from environmentaltools.graphics import plots as fig
-from environmentaltools.temporal.classification import mda, reconstruction
+from environmentaltools.temporal.classification import (
+    maximum_dissimilarity_algorithm as mda,
+    reconstruction,
+)
 from environmentaltools.temporal import analysis
 from environmentaltools.common import read, save
 
 print("✅ Required modules loaded successfully")
 
+
+def add_direction_components(df, var="DirM"):
+    """Add the sine and cosine of a direction (degrees) as var_sin and var_cos.
+    Their (chord) distance follows the angular one, so 355° and 5° are close."""
+    theta = np.deg2rad(df[var].to_numpy(dtype=float))
+    return df.assign(**{f"{var}_sin": np.sin(theta), f"{var}_cos": np.cos(theta)})
+
+
+def plot_reconstruction(ax, x, y, **kwargs):
+    """Plot reconstructed against deep water values: a density image (hexbin) for
+    long series, which is drawn in time independent of their length, and
+    rasterized markers otherwise."""
+    if len(x) > 100000:
+        return ax.hexbin(x, y, gridsize=100, cmap="Blues", mincnt=1, **kwargs)
+    return ax.plot(x, y, ".", color="cyan", alpha=0.5, rasterized=True, **kwargs)
+
+
 # ============================================================================
 # CONFIGURATION AND PARAMETERS
 # ============================================================================
@@ -61,6 +87,9 @@ ncasos = 500  # Number of representative cases to select
 vars_ = ["Hm0", "Tp", "DirM"]  # Variables for multivariate analysis
 mvar = "Hm0"  # Main variable for case ordering (wave height)
 file_name = "SIMAR_2041080"  # Source dataset identifier
+# Print the statistics of the full time series (a scan of every long series);
+# the statistics of the cases are always printed
+verbose = False
 
 print(f"📊 MDA Configuration:")
 print(f"   🔢 Representative cases: {ncasos}")
@@ -79,14 +108,16 @@ try:
     data = read.PdE(f"data/{file_name}")
     
     # Preprocess: select variables and apply noise reduction for continuity
-    data = analysis.add_noise_to_array(data, vars_)[vars_]
+    # (seeded, so the same data give the same cases and the MDA cache is reused)
+    data = analysis.add_noise_to_array(data, vars_, seed=0)[vars_]
     
     print(f"✅ Dataset loaded successfully:")
     print(f"   📏 Records: {len(data):,}")
     print(f"   📅 Date range: {data.index[0]} to {data.index[-1]}")
     print(f"   🌊 Variables: {list(data.columns)}")
-    print(f"\n📊 Data summary:")
-    print(data.describe())
+    if verbose:
+        print(f"\n📊 Data summary:")
+        print(data.describe())
     
     data_loaded = True
     
@@ -105,16 +136,34 @@ print("\n🎯 Applying Maximum Dissimilarity Algorithm...")
 if data_loaded:
     try:
         # Define output file for selected cases
-        fname = f"cases/cases_{ncasos}_{file_name}.csv"
-        
-        print("🔄 MDA algorithm progress:")
-        print("   1. Starting with maximum wave height case")
-        print("   2. Iteratively selecting most dissimilar cases")
-        print("   3. Computing Euclidean distances in normalized space")
-        print("   4. Ensuring coverage of entire environmental range")
-        
-        # Execute MDA case selection
-        cases = mda(data, vars_, ncasos, mvar, fname)
+        # (binary Parquet: full precision and fast to read back below)
+        fname = f"cases/cases_{ncasos}_{file_name}.parquet"
+
+        # The MDA is deterministic: the cases are reused while the hash of the
+        # input data and configuration, stored next to them, does not change
+        digest = hashlib.sha256(np.ascontiguousarray(data[vars_].to_numpy()).tobytes())
+        digest.update(f"{vars_} {mvar} {ncasos}".encode())
+        digest = digest.hexdigest()[:16]
+        sha_path = Path(fname).with_suffix(".sha")
+        mda_cached = (
+            Path(fname).exists()
+            and sha_path.exists()
+            and sha_path.read_text() == digest
+        )
+
+        if mda_cached:
+            print(f"♻️  Input data unchanged - reusing the cases in {fname}")
+            cases = read.csv(fname)
+        else:
+            print("🔄 MDA algorithm progress:")
+            print("   1. Starting with maximum wave height case")
+            print("   2. Iteratively selecting most dissimilar cases")
+            print("   3. Computing Euclidean distances in normalized space")
+            print("   4. Ensuring coverage of entire environmental range")
+
+            # Execute MDA case selection
+            cases = mda(data, vars_, ncasos, mvar, fname)
+            sha_path.write_text(digest)
         
         print(f"\n✅ MDA completed successfully:")
         print(f"   📊 Selected {len(cases)} representative cases")
@@ -139,7 +188,9 @@ else:
 
 print("\n🎨 Generating MDA visualization...")
 
-if mda_completed:
+if mda_completed and mda_cached:
+    print("⏸️  MDA visualization skipped - cases reused from the cache")
+elif mda_completed:
     try:
         # Create MDA visualization showing case distribution
         fname_fig = f"figures/mda_{ncasos}_{file_name}"
@@ -165,7 +216,7 @@ print("\n📊 Loading transfer function cases...")
 
 try:
     # Load MDA cases from deep water location (source)
-    cases_deep = read.csv(f"cases/cases_500_{file_name}.csv", index_col=True)
+    cases_deep = read.csv(f"cases/cases_500_{file_name}.parquet")
     
     # Load corresponding cases from shallow water location (target)
     # These establish the transfer function between locations
@@ -186,7 +237,7 @@ try:
 except FileNotFoundError as e:
     print(f"⚠️ Transfer cases not found: {e}")
     print("📋 Required files:")
-    print(f"   📄 cases/cases_500_{file_name}.csv - Source MDA cases")
+    print(f"   📄 cases/cases_500_{file_name}.parquet - Source MDA cases")
     print("   📄 data/seastates_449100_4063000.csv - Target location cases")
     transfer_cases_loaded = False
 
@@ -198,20 +249,30 @@ print("\n📥 Loading time series for reconstruction...")
 
 try:
     # Load full time series from deep water location for reconstruction
+    # Only the time index and the three sea-state variables are parsed (the
+    # header is read first to find their positions, since the index column
+    # may be unnamed)
     file_name_sim = "data_CCLM4-CanESM2"
-    data_deep = pd.read_csv(f"data/{file_name_sim}.csv", index_col=0, parse_dates=True)
-    
+    header = pd.read_csv(f"data/{file_name_sim}.csv", nrows=0).columns
+    data_deep = pd.read_csv(
+        f"data/{file_name_sim}.csv",
+        index_col=0,
+        parse_dates=True,
+        usecols=[0] + [header.get_loc(var_) for var_ in ["Hm0", "Tp", "DirM"]],
+    )
+
     # Preprocess the time series data
     data_deep = data_deep[["Hm0", "Tp", "DirM"]]
-    data_deep = analysis.add_noise_to_array(data_deep, ["Hm0", "Tp", "DirM"])[["Hm0", "Tp", "DirM"]]
+    data_deep = analysis.add_noise_to_array(data_deep, ["Hm0", "Tp", "DirM"])
     
     print(f"✅ Time series loaded:")
     print(f"   📏 Records: {len(data_deep):,}")
     print(f"   📅 Period: {data_deep.index[0]} to {data_deep.index[-1]}")
     print(f"   📊 Source: {file_name_sim}")
     
-    print(f"\n📊 Time series statistics:")
-    print(data_deep.describe())
+    if verbose:
+        print(f"\n📊 Time series statistics:")
+        print(data_deep.describe())
     
     timeseries_loaded = True
     
@@ -228,12 +289,21 @@ except FileNotFoundError as e:
 print("\n🔧 Configuring data reconstruction parameters...")
 
 # Define reconstruction parameters
+# The direction is reconstructed through its sine and cosine, so values on both
+# sides of 0/360° are not averaged to 180°. The base keeps the direction itself:
+# its components lie on a circle, whose points are all on the convex hull, and
+# griddata would return NaN between the cases (the MDA already measures the
+# direction periodically)
 base_vars = ["Hm0", "Tp", "DirM"]  # Variables to use as basis for interpolation
-recons_vars = ["Hm0", "Tp", "DirM"]  # Variables to reconstruct
+recons_vars = ["Hm0", "Tp", "DirM_sin", "DirM_cos"]  # Variables to reconstruct
 
 # Test multiple interpolation methods
 methods = ["linear", "nearest", "cubic"]
 
+# Reconstructed series are saved as float32 Parquet (Zstandard); set to True to
+# write the former CSV files instead
+legacy_csv = False
+
 print(f"📊 Reconstruction configuration:")
 print(f"   🔢 Input variables: {', '.join(base_vars)}")
 print(f"   🎯 Output variables: {', '.join(recons_vars)}")
@@ -257,117 +327,128 @@ if transfer_cases_loaded and timeseries_loaded:
     
     # Get time index for reconstruction
     index = data_deep.index
+
+    # Direction components of the target cases
+    cases_shallow = add_direction_components(cases_shallow)
     
-    # Loop through interpolation methods
-    for method in methods:
-        print(f"\n{'='*60}")
-        print(f"PROCESSING: {method.upper()} INTERPOLATION")
-        print(f"{'='*60}")
-        
-        try:
-            print("🔄 Executing reconstruction...")
-            print("   📊 Using RBF interpolation with MDA transfer function")
-            print("   🌊 Transferring from deep to shallow water conditions")
-            
-            # Perform reconstruction using selected method
-            data_reconstructed = reconstruction(
-                cases_deep,        # MDA cases from source location
-                data_deep,         # Full time series to reconstruct
-                cases_shallow,     # Corresponding MDA cases at target location
-                index,             # Time index for output
-                base_vars,         # Variables to use as input
-                recons_vars,       # Variables to reconstruct
-                method=method,     # Interpolation method
-                eps=1.0,           # RBF shape parameter
-                optimize=True,     # Optimize interpolation parameters
-                optimizer="global", # Use global optimization
-                num=ncasos,        # Number of cases to use
-                scale_data=False,  # Don't normalize data
-                scaler_method="MinMaxScaler",  # Scaler type (if enabled)
-            )
+    def reconstruct(method):
+        """Reconstruct the shallow water series with one interpolation method."""
+        return reconstruction(
+            cases_deep,        # MDA cases from source location
+            data_deep,         # Full time series to reconstruct
+            cases_shallow,     # Corresponding MDA cases at target location
+            index,             # Time index for output
+            base_vars,         # Variables to use as input
+            recons_vars,       # Variables to reconstruct
+            method=method,     # Interpolation method
+            eps=1.0,           # RBF shape parameter
+            optimize=True,     # Optimize interpolation parameters
+            optimizer="global", # Use global optimization
+            num=ncasos,        # Number of cases to use
+            scale_data=False,  # Don't normalize data
+            scaler_method="MinMaxScaler",  # Scaler type (if enabled)
+        )
+
+    print("🔄 Executing reconstructions...")
+    print("   📊 Using RBF interpolation with MDA transfer function")
+    print("   🌊 Transferring from deep to shallow water conditions")
+
+    # The methods are independent (reconstruction works on copies of the inputs)
+    # and the interpolators release the GIL, so they run in a thread pool. The
+    # figures and files are produced here, in the main thread, as they finish.
+    # A single figure is reused (cleared) for every method
+    figure, axs = plt.subplots(1, 3, figsize=(12, 5))
+    with ThreadPoolExecutor(max_workers=len(methods)) as pool:
+        futures = {pool.submit(reconstruct, method): method for method in methods}
+
+        for future in as_completed(futures):
+            method = futures[future]
+            print(f"\n{'='*60}")
+            print(f"PROCESSING: {method.upper()} INTERPOLATION")
+            print(f"{'='*60}")
+
+            try:
+                data_reconstructed = future.result().astype(float)
+                # Recover the direction (degrees) from its components
+                data_reconstructed["DirM"] = np.rad2deg(
+                    np.arctan2(data_reconstructed.pop("DirM_sin"), data_reconstructed.pop("DirM_cos"))
+                ) % 360
+
+                print(f"✅ Reconstruction completed:")
+                print(f"   📏 Output records: {len(data_reconstructed):,}")
+                print(f"   📅 Coverage: {data_reconstructed.index[0]} to {data_reconstructed.index[-1]}")
+
+                if verbose:
+                    print(f"\n📊 Reconstructed data summary:")
+                    print(data_reconstructed.describe())
+
+                # Create comparison visualization
+                print("🎨 Generating comparison plots...")
             
-            print(f"✅ Reconstruction completed:")
-            print(f"   📏 Output records: {len(data_reconstructed):,}")
-            print(f"   📅 Coverage: {data_reconstructed.index[0]} to {data_reconstructed.index[-1]}")
+                # Clear the subplots of the three variables
+                for ax in axs:
+                    ax.clear()
             
-            print(f"\n📊 Reconstructed data summary:")
-            print(data_reconstructed.describe())
+                # Plot 1: Significant Wave Height (Hm0)
+                plot_reconstruction(
+                    axs[0],
+                    data_deep["Hm0"],
+                    data_reconstructed["Hm0"],
+                    label="RBF reconstruction"
+                )
+                axs[0].plot(
+                    cases_deep["Hm0"],
+                    cases_shallow["Hm0"],
+                    "+k",
+                    markersize=8,
+                    label="MDA selection"
+                )
+                axs[0].plot([0, 10], [0, 10], "k--", alpha=0.3, label="1:1 line")
+                axs[0].set_xlabel(r"Deep water $H_{m0}$ (m)")
+                axs[0].set_ylabel(r"Shallow water $H_{m0}$ (m)")
+                axs[0].legend()
+                axs[0].grid(True, alpha=0.3)
             
-            # Create comparison visualization
-            print("🎨 Generating comparison plots...")
+                # Plot 2: Peak Period (Tp)
+                plot_reconstruction(axs[1], data_deep["Tp"], data_reconstructed["Tp"])
+                axs[1].plot(cases_deep["Tp"], cases_shallow["Tp"], "+k", markersize=8)
+                axs[1].plot([0, 25], [0, 25], "k--", alpha=0.3)
+                axs[1].set_xlabel(r"Deep water $T_p$ (s)")
+                axs[1].set_ylabel(r"Shallow water $T_p$ (s)")
+                axs[1].grid(True, alpha=0.3)
             
-            # Create subplot layout for three variables
-            _, axs = plt.subplots(1, 3, figsize=(12, 5))
-            axs = axs.flatten()
+                # Plot 3: Mean Direction (DirM)
+                plot_reconstruction(axs[2], data_deep["DirM"], data_reconstructed["DirM"])
+                axs[2].plot(cases_deep["DirM"], cases_shallow["DirM"], "+k", markersize=8)
+                axs[2].plot([0, 360], [0, 360], "k--", alpha=0.3)
+                axs[2].set_xlabel(r"Deep water $\theta_m$ (°)")
+                axs[2].set_ylabel(r"Shallow water $\theta_m$ (°)")
+                axs[2].grid(True, alpha=0.3)
             
-            # Plot 1: Significant Wave Height (Hm0)
-            axs[0].plot(
-                data_deep["Hm0"],
-                data_reconstructed["Hm0"],
-                ".",
-                color="cyan",
-                alpha=0.5,
-                label="RBF reconstruction"
-            )
-            axs[0].plot(
-                cases_deep["Hm0"],
-                cases_shallow["Hm0"],
-                "+k",
-                markersize=8,
-                label="MDA selection"
-            )
-            axs[0].plot([0, 10], [0, 10], "k--", alpha=0.3, label="1:1 line")
-            axs[0].set_xlabel(r"Deep water $H_{m0}$ (m)")
-            axs[0].set_ylabel(r"Shallow water $H_{m0}$ (m)")
-            axs[0].legend()
-            axs[0].grid(True, alpha=0.3)
+                # Overall plot formatting
+                figure.suptitle(f"Reconstruction using {method.upper()} interpolation",
+                                fontsize=14, fontweight='bold')
+                figure.tight_layout()
             
-            # Plot 2: Peak Period (Tp)
-            axs[1].plot(
-                data_deep["Tp"], 
-                data_reconstructed["Tp"], 
-                ".", 
-                color="cyan",
-                alpha=0.5
-            )
-            axs[1].plot(cases_deep["Tp"], cases_shallow["Tp"], "+k", markersize=8)
-            axs[1].plot([0, 25], [0, 25], "k--", alpha=0.3)
-            axs[1].set_xlabel(r"Deep water $T_p$ (s)")
-            axs[1].set_ylabel(r"Shallow water $T_p$ (s)")
-            axs[1].grid(True, alpha=0.3)
+                # Save figure
+                fig_path = f"figures/reconstruction_{method}.png"
+                figure.savefig(fig_path, dpi=300, bbox_inches='tight')
+                print(f"📊 Figure saved: {fig_path}")
             
-            # Plot 3: Mean Direction (DirM)
-            axs[2].plot(
-                data_deep["DirM"], 
-                data_reconstructed["DirM"], 
-                ".", 
-                color="cyan",
-                alpha=0.5
-            )
-            axs[2].plot(cases_deep["DirM"], cases_shallow["DirM"], "+k", markersize=8)
-            axs[2].plot([0, 360], [0, 360], "k--", alpha=0.3)
-            axs[2].set_xlabel(r"Deep water $\theta_m$ (°)")
-            axs[2].set_ylabel(r"Shallow water $\theta_m$ (°)")
-            axs[2].grid(True, alpha=0.3)
+                # Save reconstructed data
+                output_file = f"data/SIMAR_2041080_reconstructed_449100_4063000_{method}"
+                if legacy_csv:
+                    output_file += ".csv"
+                    save.to_csv(data_reconstructed, output_file)
+                else:
+                    output_file += ".parquet"
+                    save.to_parquet(data_reconstructed.astype("float32"), output_file)
+                print(f"💾 Data saved: {output_file}")
             
-            # Overall plot formatting
-            plt.suptitle(f"Reconstruction using {method.upper()} interpolation", 
-                        fontsize=14, fontweight='bold')
-            plt.tight_layout()
-            
-            # Save figure
-            fig_path = f"figures/reconstruction_{method}.png"
-            plt.savefig(fig_path, dpi=300, bbox_inches='tight')
-            print(f"📊 Figure saved: {fig_path}")
-            plt.show()
-            
-            # Save reconstructed data
-            output_file = f"data/SIMAR_2041080_reconstructed_449100_4063000_{method}.csv"
-            save.to_csv(data_reconstructed, output_file)
-            print(f"💾 Data saved: {output_file}")
-            
-        except Exception as e:
-            print(f"❌ Reconstruction failed for {method}: {e}")
+            except Exception as e:
+                print(f"❌ Reconstruction failed for {method}: {e}")
+
+    plt.close(figure)
             
 else:
     print("⏸️  Reconstruction skipped - required data not loaded")
@@ -392,7 +473,7 @@ if data_loaded and mda_completed:
     print(f"\n✅ MDA Status: COMPLETED")
     print(f"   📊 Cases selected from {len(data):,} original records")
     print(f"   🎯 Coverage: {ncasos/len(data)*100:.2f}% of dataset")
-    print(f"   💾 Cases file: cases/cases_{ncasos}_{file_name}.csv")
+    print(f"   💾 Cases file: cases/cases_{ncasos}_{file_name}.parquet")
 else:
     print(f"\n❌ MDA Status: NOT COMPLETED")
 
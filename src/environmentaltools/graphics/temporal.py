@@ -868,6 +868,33 @@ def joint_plot(data: pd.DataFrame, varx: str, vary: str, ax=None):
     return ax
 
 
+def _histogram2d(x: np.ndarray, y: np.ndarray, bins: int = 25):
+    """Density histogram with uniform bins over the data range, as
+    ``np.histogram2d(x, y, bins, density=True)`` but binning with ``np.bincount``."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    finite = np.all(np.isfinite(x)) and np.all(np.isfinite(y))
+    if not finite or np.ptp(x) == 0 or np.ptp(y) == 0:
+        return np.histogram2d(x, y, bins=[bins, bins], density=True)
+
+    indices, edges = [], []
+    for values in (x, y):
+        edges_ = np.linspace(values.min(), values.max(), bins + 1)
+        norm = bins / (edges_[-1] - edges_[0])
+        index = ((values - edges_[0]) * norm).astype(np.intp)
+        index[index == bins] -= 1
+        # Correct the rounding of the values that lie on the edges
+        index -= values < edges_[index]
+        index += (values >= edges_[index + 1]) & (index != bins - 1)
+        indices.append(index)
+        edges.append(edges_)
+
+    H = np.bincount(indices[0] * bins + indices[1], minlength=bins * bins)
+    H = H.reshape(bins, bins) / (
+        len(x) * np.diff(edges[0])[:, np.newaxis] * np.diff(edges[1])[np.newaxis, :]
+    )
+    return H, edges[0], edges[1]
+
+
 def bivariate_ensemble_pdf(
     df_sim: pd.DataFrame, df_obs: dict, varp: list, file_name: str = None
 ):
@@ -893,9 +920,7 @@ def bivariate_ensemble_pdf(
 
     _, ax = plt.subplots(3, 3, sharex=True, sharey=True, figsize=(12, 12))
     row, column = 0, 0
-    H, x, y = np.histogram2d(
-        df_sim[varp[0]], df_sim[varp[1]], bins=[25, 25], density=True
-    )
+    H, x, y = _histogram2d(df_sim[varp[0]], df_sim[varp[1]])
     x, y = (x[:-1] + x[1:]) / 2, (y[:-1] + y[1:]) / 2
     y, x = np.meshgrid(y, x)
     levels = np.linspace(np.max(H) / 8, np.max(H), 8)
@@ -909,9 +934,7 @@ def bivariate_ensemble_pdf(
     column += 2
 
     for key in df_obs.keys():
-        Ho, xo, yo = np.histogram2d(
-            df_obs[key][varp[0]], df_obs[key][varp[1]], bins=[25, 25], density=True
-        )
+        Ho, xo, yo = _histogram2d(df_obs[key][varp[0]], df_obs[key][varp[1]])
         xo, yo = (xo[:-1] + xo[1:]) / 2, (yo[:-1] + yo[1:]) / 2
         yo, xo = np.meshgrid(yo, xo)
         ax[row, column].contourf(xo, yo, Ho, alpha=0.25, levels=np.append(0, levels))
@@ -1057,6 +1080,7 @@ def nonstationary_cdf(
     date_axis: bool = False,
     pemp: list = None,
     emp: bool = True,
+    dtype=np.float32,
 ):
     """Plots the time variation of given percentiles of data and theoretical function if provided
 
@@ -1066,7 +1090,8 @@ def nonstationary_cdf(
         * param (dict, optional): the parameters of the the theoretical model if they are also plotted.
         * daysWindowsLength (int, optional): period of windows length for making the non-stationary empirical distribution function. Defaults to 14 days.
         * equal_windows (bool): use the windows for the ecdf of total data and timestep
-        * ax: matplotlib.ax
+        * ax: matplotlib.ax, or a pair of axes to draw the transformed data on the first
+          and the original data on the second, sharing the computed percentiles
         * log: logarhitmic scale
         * file_name (string, optional): name of the file to save the plot or None to see plots on the screen. Defaults to None.
         * label: string with the label
@@ -1077,9 +1102,11 @@ def nonstationary_cdf(
         * date_axis: create a secondary axis with time
         * pemp: list with percentiles to be plotted
         * emp (bool, optional): if True plot the empirical nonst distribution
+        * dtype (optional): floating type of the time grid and the basis functions used
+          to evaluate the model. Defaults to np.float32, np.float64 for full precision
 
     Returns:
-        * ax (matplotlib.axis): axis for the plot or None
+        * ax (matplotlib.axis): axis for the plot, or the list of axes if a pair was given
     """
 
     if not isinstance(data, pd.DataFrame):
@@ -1099,7 +1126,7 @@ def nonstationary_cdf(
     )
 
     dt = 366
-    n = np.linspace(0, 1, dt)
+    n = np.linspace(0, 1, dt, dtype=dtype)
     if emp:
         xp, pemp = utils.nonstationary_ecdf(
             data,
@@ -1109,44 +1136,8 @@ def nonstationary_cdf(
             pemp=pemp,
         )
 
-    _, ax = handle_axis(ax)
-
-    ax.set_prop_cycle("color", [plt.cm.winter(i) for i in np.linspace(0, 1, len(pemp))])
-    if emp:
-        col_per = list()
-
-        if len(xp.index.unique()) > 60:
-            marker, ms, markeredgewidth = ".", 8, 1.5
-        else:
-            marker, ms, markeredgewidth = "+", 4, 1.5
-
-        for j, i in enumerate(pemp):
-            if isinstance(param, dict):
-                if param["transform"]["plot"]:
-                    xp[i], _ = core.transform(xp[[i]], param)
-                    xp[i] -= param["transform"]["min"]
-                    if "scale" in param:
-                        xp[i] = xp[i] / param["scale"]
-            if log:
-                p = ax.semilogy(
-                    xp[i],
-                    marker=marker,
-                    ms=ms,
-                    markeredgewidth=markeredgewidth,
-                    lw=0,
-                    label=str(i),
-                )
-            else:
-                p = ax.plot(
-                    xp[i],
-                    marker=marker,
-                    ms=ms,
-                    markeredgewidth=markeredgewidth,
-                    lw=0,
-                    label=str(i),
-                )
-            col_per.append(p[0].get_color())
-
+    # Quantiles of the probability model, computed once for every axis
+    model = {}
     if isinstance(param, dict):
         if param["status"] == "Distribution models fitted succesfully":
             param = utils.string_to_function(param, None)
@@ -1155,66 +1146,80 @@ def nonstationary_cdf(
                 df = pd.DataFrame(np.ones(dt) * pemp[i], index=n, columns=["prob"])
                 df["n"] = n
                 if (param["non_stat_analysis"] == True) | (param["no_fun"] > 1):
-                    res = core.ppf(df, param)
+                    model[i] = core.ppf(df, param)
                 else:
-                    res = pd.DataFrame(
+                    model[i] = pd.DataFrame(
                         param["fun"][0].ppf(df["prob"], *param["par"]),
                         index=df.index,
                         columns=[variable],
                     )
 
-                # Transformed timeserie
-                if (not param["transform"]["plot"]) & param["transform"]["make"]:
-                    if "scale" in param:
-                        res[param["var"]] = res[param["var"]] * param["scale"]
+    if isinstance(ax, (list, tuple, np.ndarray)):
+        # Transformed (first axis) and original (second axis) data in one pass
+        axes, plots = list(ax), [True, False]
+    else:
+        _, ax = handle_axis(ax)
+        axes = [ax]
+        plots = [isinstance(param, dict) and param["transform"]["plot"]]
 
-                    res[param["var"]] = res[param["var"]] + param["transform"]["min"]
-                    res[param["var"]] = core.inverse_transform(
-                        res[[param["var"]]], param
-                    )
-                elif ("scale" in param) & (not param["transform"]["plot"]):
-                    res[param["var"]] = res[param["var"]] * param["scale"]
+    for ax, plot_transformed in zip(axes, plots):
+        ax.set_prop_cycle("color", [plt.cm.winter(i) for i in np.linspace(0, 1, len(pemp))])
+        if emp:
+            col_per = list()
+            xp_ = xp.copy()
+
+            if len(xp.index.unique()) > 60:
+                marker, ms, markeredgewidth = ".", 8, 1.5
+            else:
+                marker, ms, markeredgewidth = "+", 4, 1.5
 
+            for j, i in enumerate(pemp):
+                if isinstance(param, dict):
+                    if plot_transformed:
+                        xp_[i], _ = core.transform(xp_[[i]], param)
+                        xp_[i] -= param["transform"]["min"]
+                        if "scale" in param:
+                            xp_[i] = xp_[i] / param["scale"]
                 if log:
-                    if emp:
-                        ax.semilogy(
-                            res[param["var"]].index,
-                            res[param["var"]].values,
-                            color=col_per[i],
-                            ls=lst,
-                            lw=2,
-                            label=str(j),
-                        )
-                    else:
-                        ax.plot(
-                            res[param["var"]].index.values,
-                            res[param["var"]].values,
-                            ls=lst,
-                            lw=2,
-                            label=str(j),
-                        )
+                    p = ax.semilogy(
+                        xp_[i],
+                        marker=marker,
+                        ms=ms,
+                        markeredgewidth=markeredgewidth,
+                        lw=0,
+                        label=str(i),
+                    )
                 else:
-                    if param["type"] == "circular":
-                        if emp:
-                            ax.plot(
-                                res[param["var"]].index,
-                                np.rad2deg(res[param["var"]].values),
-                                color=col_per[i],
-                                ls=lst,
-                                lw=2,
-                                label=str(j),
-                            )
-                        else:
-                            ax.plot(
-                                res[param["var"]].index,
-                                np.rad2deg(res[param["var"]].values),
-                                ls=lst,
-                                lw=2,
-                                label=str(j),
-                            )
-                    else:
+                    p = ax.plot(
+                        xp_[i],
+                        marker=marker,
+                        ms=ms,
+                        markeredgewidth=markeredgewidth,
+                        lw=0,
+                        label=str(i),
+                    )
+                col_per.append(p[0].get_color())
+
+        if isinstance(param, dict):
+            if param["status"] == "Distribution models fitted succesfully":
+                for i, j in enumerate(pemp):
+                    res = model[i].copy()
+
+                    # Transformed timeserie
+                    if (not plot_transformed) & param["transform"]["make"]:
+                        if "scale" in param:
+                            res[param["var"]] = res[param["var"]] * param["scale"]
+
+                        res[param["var"]] = res[param["var"]] + param["transform"]["min"]
+                        res[param["var"]] = core.inverse_transform(
+                            res[[param["var"]]], param
+                        )
+                    elif ("scale" in param) & (not plot_transformed):
+                        res[param["var"]] = res[param["var"]] * param["scale"]
+
+                    if log:
                         if emp:
-                            ax.plot(
+                            ax.semilogy(
                                 res[param["var"]].index,
                                 res[param["var"]].values,
                                 color=col_per[i],
@@ -1224,147 +1229,184 @@ def nonstationary_cdf(
                             )
                         else:
                             ax.plot(
-                                res[param["var"]].index,
+                                res[param["var"]].index.values,
                                 res[param["var"]].values,
                                 ls=lst,
                                 lw=2,
                                 label=str(j),
                             )
-        else:
-            raise ValueError(
-                "Model was not fit successfully. Look at the marginal fit."
-            )
+                    else:
+                        if param["type"] == "circular":
+                            if emp:
+                                ax.plot(
+                                    res[param["var"]].index,
+                                    np.rad2deg(res[param["var"]].values),
+                                    color=col_per[i],
+                                    ls=lst,
+                                    lw=2,
+                                    label=str(j),
+                                )
+                            else:
+                                ax.plot(
+                                    res[param["var"]].index,
+                                    np.rad2deg(res[param["var"]].values),
+                                    ls=lst,
+                                    lw=2,
+                                    label=str(j),
+                                )
+                        else:
+                            if emp:
+                                ax.plot(
+                                    res[param["var"]].index,
+                                    res[param["var"]].values,
+                                    color=col_per[i],
+                                    ls=lst,
+                                    lw=2,
+                                    label=str(j),
+                                )
+                            else:
+                                ax.plot(
+                                    res[param["var"]].index,
+                                    res[param["var"]].values,
+                                    ls=lst,
+                                    lw=2,
+                                    label=str(j),
+                                )
+            else:
+                raise ValueError(
+                    "Model was not fit successfully. Look at the marginal fit."
+                )
 
-    ax.grid()
+        ax.grid()
 
-    box = ax.get_position()
-    if legend:
-        # Shrink current axis
-        if param:
-            if legend_loc == "bottom":
-                ax.set_position([box.x0, box.y0, box.width, box.height])
-                legend = ax.legend(
-                    loc="center left",
-                    bbox_to_anchor=(-0.2, 0.0),
-                    ncol=len(pemp),
-                    title="Percentiles",
-                )
-                if param["type"] == "circular":
-                    ax.set_yticks([0, 90, 180, 270, 360])
+        box = ax.get_position()
+        if legend:
+            # Shrink current axis
+            if param:
+                if legend_loc == "bottom":
+                    ax.set_position([box.x0, box.y0, box.width, box.height])
+                    legend = ax.legend(
+                        loc="center left",
+                        bbox_to_anchor=(-0.2, 0.0),
+                        ncol=len(pemp),
+                        title="Percentiles",
+                    )
+                    if param["type"] == "circular":
+                        ax.set_yticks([0, 90, 180, 270, 360])
+                else:
+                    ax.set_position([box.x0, box.y0, box.width * 0.6, box.height])
+                    # Put a legend to the right of the current axis
+                    legend = ax.legend(
+                        loc="center left",
+                        bbox_to_anchor=(1, 0.5),
+                        ncol=2,
+                        title="Percentiles",
+                    )
+                    if param["type"] == "circular":
+                        ax.set_yticks([0, 90, 180, 270, 360])
             else:
-                ax.set_position([box.x0, box.y0, box.width * 0.6, box.height])
-                # Put a legend to the right of the current axis
+                ax.set_position([box.x0, box.y0, box.width * 0.8, box.height])
                 legend = ax.legend(
-                    loc="center left",
-                    bbox_to_anchor=(1, 0.5),
-                    ncol=2,
-                    title="Percentiles",
+                    loc="center left", bbox_to_anchor=(1, 0.5), ncol=1, title="Percentiles"
                 )
-                if param["type"] == "circular":
-                    ax.set_yticks([0, 90, 180, 270, 360])
-        else:
-            ax.set_position([box.x0, box.y0, box.width * 0.8, box.height])
-            legend = ax.legend(
-                loc="center left", bbox_to_anchor=(1, 0.5), ncol=1, title="Percentiles"
-            )
-
-    if isinstance(title, str):
-        ax.set_title(title, color="k", fontweight="bold")
-
-    if not label:
-        label = labels(variable)
 
-    if log:
-        label = "log " + label
-    ax.set_ylabel(label)
-    ax.set_xlabel("Normalized period")
-    if date_axis:
-        ax2 = ax.twiny()
-        # Move twinned axis ticks and label from top to bottom
-        ax2.xaxis.set_ticks_position("bottom")
-        ax2.xaxis.set_label_position("bottom")
+        if isinstance(title, str):
+            ax.set_title(title, color="k", fontweight="bold")
 
-        # Offset the twin axis below the host
-        ax2.spines["bottom"].set_position(("axes", -0.15))
-
-        # Turn on the frame for the twin axis, but then hide all
-        # but the bottom spine
-        ax2.set_frame_on(True)
-        ax2.patch.set_visible(False)
-
-        for sp in ax2.spines.values():
-            sp.set_visible(False)
-        ax2.spines["bottom"].set_visible(True)
-
-        ax2.set_xticks(
-            np.array(
-                [
-                    0.6 / 13,
-                    1.5 / 13,
-                    2.5 / 13,
-                    3.5 / 13,
-                    4.5 / 13,
-                    5.5 / 13,
-                    6.5 / 13,
-                    7.5 / 13,
-                    8.5 / 13,
-                    9.5 / 13,
-                    10.5 / 13,
-                    11.5 / 13,
-                    12.4 / 13,
-                ]
-            ),
-            minor=False,
-        )
-        # 16 is a slight approximation since months differ in number of days.
-        # ax2.xaxis.set_minor_locator(np.array([1/13, 2/13, 3/13, 4/13, 5/13, 6/13, 7/13, 8/13, 9/13, 10/13, 11/13, 12/13]))
-        # ax2.xaxis.set_major_formatter(ticker.NullFormatter())
-
-        # Hide major tick labels
-        ax2.set_xticklabels("")
-
-        # Customize minor tick labels
-        ax2.set_xticks(
-            np.array(
-                [
-                    1 / 13,
-                    2 / 13,
-                    3 / 13,
-                    4 / 13,
-                    5 / 13,
-                    6 / 13,
-                    7 / 13,
-                    8 / 13,
-                    9 / 13,
-                    10 / 13,
-                    11 / 13,
-                    12 / 13,
-                ]
-            ),
-            minor=True,
-        )
-        ax2.set_xticklabels(
-            ["J", "F", "M", "A", "M", "J", "J", "A", "S", "O", "N", "D"], minor=True
-        )
-        ax2.tick_params(
-            axis="x",  # changes apply to the x-axis
-            which="minor",  # both major and minor ticks are affected
-            bottom=False,  # ticks along the bottom edge are off
-            top=False,  # ticks along the top edge are off
-            labelbottom=True,
-        )
+        ylabel = label if label else labels(variable)
+        if log:
+            ylabel = "log " + ylabel
+        ax.set_ylabel(ylabel)
+        ax.set_xlabel("Normalized period")
+        if date_axis:
+            ax2 = ax.twiny()
+            # Move twinned axis ticks and label from top to bottom
+            ax2.xaxis.set_ticks_position("bottom")
+            ax2.xaxis.set_label_position("bottom")
+
+            # Offset the twin axis below the host
+            ax2.spines["bottom"].set_position(("axes", -0.15))
+
+            # Turn on the frame for the twin axis, but then hide all
+            # but the bottom spine
+            ax2.set_frame_on(True)
+            ax2.patch.set_visible(False)
+
+            for sp in ax2.spines.values():
+                sp.set_visible(False)
+            ax2.spines["bottom"].set_visible(True)
+
+            ax2.set_xticks(
+                np.array(
+                    [
+                        0.6 / 13,
+                        1.5 / 13,
+                        2.5 / 13,
+                        3.5 / 13,
+                        4.5 / 13,
+                        5.5 / 13,
+                        6.5 / 13,
+                        7.5 / 13,
+                        8.5 / 13,
+                        9.5 / 13,
+                        10.5 / 13,
+                        11.5 / 13,
+                        12.4 / 13,
+                    ]
+                ),
+                minor=False,
+            )
+            # 16 is a slight approximation since months differ in number of days.
+            # ax2.xaxis.set_minor_locator(np.array([1/13, 2/13, 3/13, 4/13, 5/13, 6/13, 7/13, 8/13, 9/13, 10/13, 11/13, 12/13]))
+            # ax2.xaxis.set_major_formatter(ticker.NullFormatter())
+
+            # Hide major tick labels
+            ax2.set_xticklabels("")
+
+            # Customize minor tick labels
+            ax2.set_xticks(
+                np.array(
+                    [
+                        1 / 13,
+                        2 / 13,
+                        3 / 13,
+                        4 / 13,
+                        5 / 13,
+                        6 / 13,
+                        7 / 13,
+                        8 / 13,
+                        9 / 13,
+                        10 / 13,
+                        11 / 13,
+                        12 / 13,
+                    ]
+                ),
+                minor=True,
+            )
+            ax2.set_xticklabels(
+                ["J", "F", "M", "A", "M", "J", "J", "A", "S", "O", "N", "D"], minor=True
+            )
+            ax2.tick_params(
+                axis="x",  # changes apply to the x-axis
+                which="minor",  # both major and minor ticks are affected
+                bottom=False,  # ticks along the bottom edge are off
+                top=False,  # ticks along the top edge are off
+                labelbottom=True,
+            )
 
-        ax2.set_xlabel(r"Normal Year")
-        ax.set_position(
-            [box.x0, box.y0 + box.height * 0.1, box.width * 0.6, box.height * 0.9]
-        )
-    for axis in ["top", "bottom", "left", "right"]:
-        ax.spines[axis].set_linewidth(2)
-    ax.xaxis.set_tick_params(width=2)
-    ax.yaxis.set_tick_params(width=2)
+            ax2.set_xlabel(r"Normal Year")
+            ax.set_position(
+                [box.x0, box.y0 + box.height * 0.1, box.width * 0.6, box.height * 0.9]
+            )
+        for axis in ["top", "bottom", "left", "right"]:
+            ax.spines[axis].set_linewidth(2)
+        ax.xaxis.set_tick_params(width=2)
+        ax.yaxis.set_tick_params(width=2)
 
     show(file_name)
 
+    if len(axes) > 1:
+        return axes
     return ax
 
 
@@ -2074,6 +2116,7 @@ def heatmap(
     file_name: str = None,
     ax=None,
     minmax=False,
+    max_cells: int = 20000,
 ):
     """
     Create a heatmap from a numpy array and two lists of labels.
@@ -2084,9 +2127,25 @@ def heatmap(
         * type_ (str): type of variable to be plotted. B stands for the parameter
             matrix and Q for the covariance matrix
         * file_name: name of the oputput file
+        * max_cells (int): matrices with more cells are block-averaged to about
+            this size and drawn without cell labels, annotations and grid. Defaults
+            to 20000
     """
     _, ax = handle_axis(ax)
 
+    data = np.asarray(data)
+    detailed = data.size <= max_cells
+    if not detailed:
+        # Block-average every axis to at most sqrt(max_cells) cells
+        nmax = int(np.sqrt(max_cells))
+        fr, fc = int(np.ceil(data.shape[0] / nmax)), int(np.ceil(data.shape[1] / nmax))
+        nr, nc = -(-data.shape[0] // fr), -(-data.shape[1] // fc)
+        # The trailing rows and columns are padded with NaN, so the last blocks
+        # average only the cells of the matrix
+        padded = np.full((nr * fr, nc * fc), np.nan)
+        padded[: data.shape[0], : data.shape[1]] = data
+        data = np.nanmean(padded.reshape(nr, fr, nc, fc), axis=(1, 3))
+
     # Plot the heatmap
     if minmax == "minimax":
         im = ax.imshow(data, cmap=cmap, vmin=np.min(data), vmax=np.max(data))
@@ -2097,14 +2156,20 @@ def heatmap(
     else:
         im = ax.imshow(data, cmap=cmap)
 
+    if not detailed:
+        im.set_interpolation("nearest")
+        ax.set_aspect("auto")
+        show(file_name)
+        return
+
     # We want to show all ticks ...
-    ax.set_xticks(np.arange(np.asarray(data).shape[1]))
-    ax.set_yticks(np.arange(np.asarray(data).shape[0]))
+    ax.set_xticks(np.arange(data.shape[1]))
+    ax.set_yticks(np.arange(data.shape[0]))
     # ... and label them with the respective list entries.
 
     if type_ == "B":
         column_labels, j = ["mean"], 0
-        for i in range(np.asarray(data).shape[1] - 1):
+        for i in range(data.shape[1] - 1):
             if not i % len(param["vars"]):
                 j += 1
             column_labels.append(
@@ -2130,8 +2195,8 @@ def heatmap(
     for edge, spine in ax.spines.items():
         spine.set_visible(False)
 
-    ax.set_xticks(np.arange(np.asarray(data).shape[1] + 1) - 0.5, minor=True)
-    ax.set_yticks(np.arange(np.asarray(data).shape[0] + 1) - 0.5, minor=True)
+    ax.set_xticks(np.arange(data.shape[1] + 1) - 0.5, minor=True)
+    ax.set_yticks(np.arange(data.shape[0] + 1) - 0.5, minor=True)
     ax.grid(which="minor", color="w", linestyle="-", linewidth=3)
     ax.tick_params(which="minor", bottom=False, left=False)
 
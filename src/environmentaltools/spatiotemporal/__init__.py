@@ -26,6 +26,7 @@ Main Components
     - Mean exceedance values (mew, wmew)
     - Mean difference exceedance (medw, wmdw)
     - Area-weighted indicators (aean)
+    - All six indicators from a single sort of the data (threshold_indicators)
     - Single-point moment extraction (one_point)
 
 **Multi-Criteria Decision Analysis**
@@ -103,6 +104,7 @@ from environmentaltools.spatiotemporal.indicators import (
     mean_exceedance_over_exceedance_area,
     mean_excess_over_exceedance_area,
     exceedance_to_nonexceedance_ratio,
+    threshold_indicators,
     # compute_all_indicators_and_plot,
     # Advanced spatiotemporal indicators
     mean_presence_boundary,
@@ -177,6 +179,7 @@ __all__ = [
     'mean_exceedance_over_exceedance_area',
     'mean_excess_over_exceedance_area',
     'exceedance_to_nonexceedance_ratio',
+    'threshold_indicators',
     # 'compute_all_indicators_and_plot',
     # Advanced spatiotemporal indicators
     'mean_presence_boundary',
@@ -20,9 +20,168 @@ References
 
 import numpy as np
 from skimage import measure
-from scipy.ndimage import uniform_filter
+from scipy.ndimage import correlate1d, uniform_filter
 from environmentaltools.spatiotemporal import utils
 
+# Central-difference stencil, equivalent to utils.spatial_gradient before scaling
+_CENTRAL_DIFFERENCE = np.array([-1.0, 0.0, 1.0])
+
+# Up to this number of thresholds, counting the exceedances with one vectorized
+# comparison per threshold is cheaper than sorting the data (about 15-20 times
+# the cost of a comparison pass)
+_DIRECT_COUNT_MAX_THRESHOLDS = 16
+
+def _thresholds(thresholds, maximum):
+    """
+    Build the thresholds of the indicators: the given ones, or 100 equally
+    spaced values from 0 to the maximum of the data.
+    """
+    if thresholds is None:
+        return np.linspace(0, maximum, 100)
+    return np.asarray(thresholds)
+
+
+def _search_thresholds(thresholds, dtype):
+    """
+    Thresholds to compare with values of a narrower floating-point dtype (e.g.
+    float32 data and float64 thresholds).
+
+    Each threshold is rounded up to the smallest value of that dtype not below
+    it, so ``value >= threshold`` gives the same result as before while the data
+    is compared in its own precision, without an upcast copy.
+    """
+    if not np.issubdtype(dtype, np.floating) or np.can_cast(thresholds.dtype, dtype):
+        return thresholds
+    with np.errstate(over="ignore", invalid="ignore"):
+        rounded = thresholds.astype(dtype)
+        below = rounded < thresholds
+    rounded[below] = np.nextafter(rounded[below], dtype.type(np.inf))
+    return rounded
+
+
+def _exceedance_counts(data, thresholds):
+    """
+    Sort the data once and count the values exceeding (>=) each threshold.
+
+    The values exceeding a threshold are those after its insertion point in the
+    sorted data. NaN values are sorted last and never exceed a threshold, so
+    they are dropped from the returned sorted values. Without thresholds, the
+    default ones take the maximum from the last sorted value (NaN if the data
+    has any, like ``np.max``) instead of scanning the data again.
+    """
+    # Binning the data on the (default, uniform) thresholds with np.histogram or
+    # np.bincount is not faster: NumPy's vectorized sort takes less time than
+    # one uniform histogram pass, and the bins need rounding corrections at
+    # the thresholds to reproduce the >= comparison exactly
+    sorted_data = np.sort(data, axis=None)
+    thresholds = _thresholds(thresholds, sorted_data[-1])
+    n_valid = sorted_data.size - np.count_nonzero(np.isnan(sorted_data))
+    sorted_data = sorted_data[:n_valid]
+    n_exceeding = n_valid - np.searchsorted(
+        sorted_data, _search_thresholds(thresholds, sorted_data.dtype), side="left"
+    )
+    return thresholds, sorted_data, n_exceeding
+
+
+def _count_exceedances(data, thresholds):
+    """
+    Count the values exceeding (>=) each threshold.
+
+    A few given thresholds are counted directly, with one vectorized comparison
+    over the data each (NaN never compares true); more, or the default ones,
+    use a single sort.
+    """
+    if thresholds is not None and len(thresholds) <= _DIRECT_COUNT_MAX_THRESHOLDS:
+        thresholds = np.asarray(thresholds)
+        values = np.ravel(data)
+        search_thresholds = _search_thresholds(thresholds, values.dtype)
+        return thresholds, np.array(
+            [np.count_nonzero(values >= threshold) for threshold in search_thresholds],
+            dtype=np.intp,
+        )
+    thresholds, _, n_exceeding = _exceedance_counts(data, thresholds)
+    return thresholds, n_exceeding
+
+
+def _exceedance_sums(sorted_data, n_exceeding):
+    """
+    Sum of the values exceeding each threshold, from the sorted data.
+
+    The sums of the k largest values are accumulated from the top, so the sum
+    of a few large values is not the difference of two large totals.
+    """
+    # Only the leading zero is not overwritten by the cumulative sum
+    tail_sums = np.empty(len(sorted_data) + 1)
+    tail_sums[0] = 0.0
+    np.cumsum(sorted_data[::-1], dtype=np.float64, out=tail_sums[1:])
+    return tail_sums[n_exceeding]
+
+
+def threshold_indicators(data, thresholds=None):
+    """
+    Compute the six threshold-based indicators from a single sort of the data.
+
+    Fused version of :func:`fractional_exceedance_area`,
+    :func:`mean_exceedance_over_total_area`, :func:`mean_excess_over_total_area`,
+    :func:`mean_exceedance_over_exceedance_area`,
+    :func:`mean_excess_over_exceedance_area` and
+    :func:`exceedance_to_nonexceedance_ratio`: the number and the sum of the
+    values exceeding every threshold are obtained once, and the indicators are
+    derived from them without scanning the data again.
+
+    Parameters
+    ----------
+    data : array_like
+        1D array of spatial data values to analyze.
+    thresholds : array_like, optional
+        Array of threshold values to evaluate. If None, generates 100 equally
+        spaced thresholds from 0 to the maximum data value.
+
+    Returns
+    -------
+    thresholds : np.ndarray
+        Array of threshold values used in the analysis.
+    indicators : dict
+        Values of the indicators for each threshold, with keys "RAEH", "MEW",
+        "MEDW", "WMEW", "WMDW" and "AEAN". The conditional means are NaN where
+        no value exceeds the threshold, and AEAN is inf where all do.
+
+    Notes
+    -----
+    Every indicator function sorts the data on each call, so several
+    indicators of the same data are cheaper to obtain from this function.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> data = np.random.gamma(2, 2, 1000)
+    >>> thresholds, indicators = threshold_indicators(data)
+    >>> raeh = indicators["RAEH"]
+    """
+    data = np.asarray(data)
+    n_points = len(data)
+
+    thresholds, sorted_data, n_exceeding = _exceedance_counts(data, thresholds)
+    sum_exceeding = _exceedance_sums(sorted_data, n_exceeding)
+    excess = sum_exceeding - np.where(n_exceeding > 0, thresholds, 0) * n_exceeding
+
+    exceedance_fractions = n_exceeding / n_points
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        conditional_means = np.where(n_exceeding > 0, sum_exceeding / n_exceeding, np.nan)
+        area_ratios = exceedance_fractions / (1.0 - exceedance_fractions)
+
+    indicators = {
+        "RAEH": exceedance_fractions,
+        "MEW": sum_exceeding / n_points,
+        "MEDW": excess / n_points,
+        "WMEW": conditional_means,
+        "WMDW": conditional_means - thresholds,
+        "AEAN": area_ratios,
+    }
+    return thresholds, indicators
+
+
 def fractional_exceedance_area(data, thresholds=None):
     """
     Compute fractional area exceeding threshold values.
@@ -68,14 +227,8 @@ def fractional_exceedance_area(data, thresholds=None):
     data = np.asarray(data)
     n_points = len(data)
     
-    if thresholds is None:
-        thresholds = np.linspace(0, np.max(data), 100)
-    else:
-        thresholds = np.asarray(thresholds)
-    
-    exceedance_fractions = np.zeros(len(thresholds))
-    for i, threshold in enumerate(thresholds):
-        exceedance_fractions[i] = np.sum(data >= threshold) / n_points
+    thresholds, n_exceeding = _count_exceedances(data, thresholds)
+    exceedance_fractions = n_exceeding.astype(np.float64) / n_points
 
     return thresholds, exceedance_fractions
 
@@ -123,14 +276,8 @@ def mean_exceedance_over_total_area(data, thresholds=None):
     data = np.asarray(data)
     n_points = len(data)
     
-    if thresholds is None:
-        thresholds = np.linspace(0, np.max(data), 100)
-    else:
-        thresholds = np.asarray(thresholds)
-    
-    mean_exceedances = np.zeros(len(thresholds))
-    for i, threshold in enumerate(thresholds):
-        mean_exceedances[i] = np.sum(data[data >= threshold]) / n_points
+    thresholds, sorted_data, n_exceeding = _exceedance_counts(data, thresholds)
+    mean_exceedances = _exceedance_sums(sorted_data, n_exceeding) / n_points
 
     return thresholds, mean_exceedances
 
@@ -178,14 +325,11 @@ def mean_excess_over_total_area(data, thresholds=None):
     data = np.asarray(data)
     n_points = len(data)
     
-    if thresholds is None:
-        thresholds = np.linspace(0, np.max(data), 100)
-    else:
-        thresholds = np.asarray(thresholds)
-    
-    mean_excess = np.zeros(len(thresholds))
-    for i, threshold in enumerate(thresholds):
-        mean_excess[i] = np.sum(data[data >= threshold] - threshold) / n_points
+    thresholds, sorted_data, n_exceeding = _exceedance_counts(data, thresholds)
+    sum_exceeding = _exceedance_sums(sorted_data, n_exceeding)
+    # Thresholds without exceedances (including NaN ones) have no excess
+    excess = sum_exceeding - np.where(n_exceeding > 0, thresholds, 0) * n_exceeding
+    mean_excess = excess / n_points
 
     return thresholds, mean_excess
 
@@ -232,18 +376,10 @@ def mean_exceedance_over_exceedance_area(data, thresholds=None):
     """
     data = np.asarray(data)
     
-    if thresholds is None:
-        thresholds = np.linspace(0, np.max(data), 100)
-    else:
-        thresholds = np.asarray(thresholds)
-    
-    conditional_means = np.zeros(len(thresholds))
-    for i, threshold in enumerate(thresholds):
-        exceeding_values = data[data >= threshold]
-        if len(exceeding_values) > 0:
-            conditional_means[i] = np.mean(exceeding_values)
-        else:
-            conditional_means[i] = np.nan
+    thresholds, sorted_data, n_exceeding = _exceedance_counts(data, thresholds)
+    sum_exceeding = _exceedance_sums(sorted_data, n_exceeding)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        conditional_means = np.where(n_exceeding > 0, sum_exceeding / n_exceeding, np.nan)
 
     return thresholds, conditional_means
 
@@ -291,18 +427,12 @@ def mean_excess_over_exceedance_area(data, thresholds=None):
     """
     data = np.asarray(data)
     
-    if thresholds is None:
-        thresholds = np.linspace(0, np.max(data), 100)
-    else:
-        thresholds = np.asarray(thresholds)
-    
-    conditional_excess = np.zeros(len(thresholds))
-    for i, threshold in enumerate(thresholds):
-        exceeding_values = data[data >= threshold]
-        if len(exceeding_values) > 0:
-            conditional_excess[i] = np.mean(exceeding_values - threshold)
-        else:
-            conditional_excess[i] = np.nan
+    thresholds, sorted_data, n_exceeding = _exceedance_counts(data, thresholds)
+    sum_exceeding = _exceedance_sums(sorted_data, n_exceeding)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        conditional_excess = np.where(
+            n_exceeding > 0, sum_exceeding / n_exceeding - thresholds, np.nan
+        )
 
     return thresholds, conditional_excess
 
@@ -357,18 +487,11 @@ def exceedance_to_nonexceedance_ratio(data, thresholds=None):
     data = np.asarray(data)
     n_points = len(data)
     
-    if thresholds is None:
-        thresholds = np.linspace(0, np.max(data), 100)
-    else:
-        thresholds = np.asarray(thresholds)
-    
-    area_ratios = np.zeros(len(thresholds))
-    for i, threshold in enumerate(thresholds):
-        exceedance_fraction = np.sum(data >= threshold) / n_points
-        if exceedance_fraction < 1.0:
-            area_ratios[i] = exceedance_fraction / (1.0 - exceedance_fraction)
-        else:
-            area_ratios[i] = np.inf
+    thresholds, n_exceeding = _count_exceedances(data, thresholds)
+    exceedance_fractions = n_exceeding / n_points
+    # The division gives inf where all the points exceed the threshold
+    with np.errstate(divide="ignore"):
+        area_ratios = exceedance_fractions / (1.0 - exceedance_fractions)
 
     return thresholds, area_ratios
 
@@ -418,20 +541,14 @@ def exceedance_to_nonexceedance_ratio(data, thresholds=None):
 #     """
 #     # Define indicator labels
 #     labels = ["RAEH", "MEW", "MEDW", "WMEW", "WMDW"]
-    
-#     # Initialize storage for thresholds and indicator values
-#     thresholds = [None] * len(labels)
-#     indicator_values = [None] * len(labels)
 
 #     # Extract mean values (second column) from moments
 #     data = moments[:, 1]
 
-#     # Compute all indicators
-#     thresholds[0], indicator_values[0] = fractional_exceedance_area(data)
-#     thresholds[1], indicator_values[1] = mean_exceedance_over_total_area(data)
-#     thresholds[2], indicator_values[2] = mean_excess_over_total_area(data)
-#     thresholds[3], indicator_values[3] = mean_exceedance_over_exceedance_area(data)
-#     thresholds[4], indicator_values[4] = mean_excess_over_exceedance_area(data)
+#     # Compute all indicators from a single sort of the data
+#     thresholds_, indicators = threshold_indicators(data)
+#     thresholds = [thresholds_] * len(labels)
+#     indicator_values = [indicators[label] for label in labels]
 
 #     # Create visualization
 #     figures.indicators(thresholds, indicator_values, labels)
@@ -439,6 +556,30 @@ def exceedance_to_nonexceedance_ratio(data, thresholds=None):
 #     return
 
 
+def _boundary_contours(mask):
+    """
+    Extract the 0.5-level contours of a binary mask.
+
+    Marching squares only runs over the bounding box of the True cells, padded
+    by one cell, so the float copy and the segment search scale with the
+    affected region instead of the whole raster. Cells outside the box are all
+    False and hold no contour, hence the result matches running
+    ``measure.find_contours`` on the full mask.
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return []
+    cols = np.flatnonzero(mask.any(axis=0))
+
+    row_start, row_end = max(rows[0] - 1, 0), min(rows[-1] + 2, mask.shape[0])
+    col_start, col_end = max(cols[0] - 1, 0), min(cols[-1] + 2, mask.shape[1])
+
+    window = mask[row_start:row_end, col_start:col_end].astype(float)
+    contours = measure.find_contours(window, level=0.5)
+    offset = np.array([row_start, col_start], dtype=float)
+    return [contour + offset for contour in contours]
+
+
 def mean_presence_boundary(data_cube, threshold=None):
     """
     Calculate spatial boundary where temporal mean exceeds a presence threshold.
@@ -500,7 +641,7 @@ def mean_presence_boundary(data_cube, threshold=None):
     presence_mask = mean_map >= threshold
     
     # Extract contours
-    contours = measure.find_contours(presence_mask.astype(float), level=0.5)
+    contours = _boundary_contours(presence_mask)
     
     return contours, mean_map
 
@@ -550,11 +691,50 @@ def maximum_influence_extent(data_cube, percentile=95):
     mask = extreme_map >= threshold
     
     # Extract contours
-    contours = measure.find_contours(mask.astype(float), level=0.5)
+    contours = _boundary_contours(mask)
     
     return contours, extreme_map
 
 
+def _exceedance_count(data_cube, threshold):
+    """
+    Count threshold exceedances per cell one time slice at a time.
+
+    The comparison is written into a single reusable (lat, lon) buffer and
+    accumulated into the counts, so no boolean (time, lat, lon) temporary is
+    allocated. ``threshold`` may be a scalar or a (lat, lon) array.
+    """
+    threshold = np.asarray(threshold)
+    counts = np.zeros(data_cube.shape[1:], dtype=np.intp)
+    exceeds = np.empty(data_cube.shape[1:], dtype=bool)
+    for data_slice in data_cube:
+        np.greater(data_slice, threshold, out=exceeds)
+        counts += exceeds
+    return counts
+
+
+def _joint_exceedance_count(cube_list, thresholds):
+    """
+    Count time steps where every variable exceeds its threshold.
+
+    Works one time slice at a time: each variable is compared into a (lat, lon)
+    buffer that is ANDed into the joint mask, and the joint mask is accumulated
+    into the counts. Only three (lat, lon) buffers are allocated regardless of
+    the number of variables or time steps.
+    """
+    shape = cube_list[0].shape[1:]
+    counts = np.zeros(shape, dtype=np.intp)
+    joint = np.empty(shape, dtype=bool)
+    exceeds = np.empty(shape, dtype=bool)
+    for t in range(len(cube_list[0])):
+        np.greater(cube_list[0][t], thresholds[0], out=joint)
+        for cube, th in zip(cube_list[1:], thresholds[1:]):
+            np.greater(cube[t], th, out=exceeds)
+            joint &= exceeds
+        counts += joint
+    return counts
+
+
 def threshold_exceedance_frequency(data_cube, threshold):
     """
     Calculate frequency of threshold exceedance for each spatial cell.
@@ -592,13 +772,7 @@ def threshold_exceedance_frequency(data_cube, threshold):
     >>> freq_map = threshold_exceedance_frequency(data_cube, threshold=3.0)
     >>> print(f"Max exceedances: {freq_map.max()}")
     """
-    if isinstance(threshold, (int, float)):
-        exceedances = data_cube > threshold
-    else:
-        # Variable threshold per cell
-        exceedances = data_cube > threshold[np.newaxis, :, :]
-    
-    freq_map = np.sum(exceedances, axis=0)
+    freq_map = _exceedance_count(data_cube, threshold)
     return freq_map
 
 
@@ -641,12 +815,7 @@ def permanently_affected_zone(data_cube, threshold, persistence_ratio=0.8):
     >>> mask, freq = permanently_affected_zone(data_cube, threshold=2.0, persistence_ratio=0.75)
     >>> print(f"Permanently affected area: {mask.sum()} cells")
     """
-    if isinstance(threshold, (int, float)):
-        exceedances = data_cube > threshold
-    else:
-        exceedances = data_cube > threshold[np.newaxis, :, :]
-    
-    freq_map = np.sum(exceedances, axis=0) / data_cube.shape[0]
+    freq_map = _exceedance_count(data_cube, threshold) / data_cube.shape[0]
     mask = freq_map >= persistence_ratio
     return mask, freq_map
 
@@ -663,13 +832,15 @@ def mean_representative_value(data_cube, time_window=None):
     ----------
     data_cube : np.ndarray
         3D array with shape (time, lat, lon) containing spatiotemporal data.
-    time_window : tuple of int, optional
-        Time indices to use (start, end). If None, uses the entire time period.
+    time_window : tuple of int or list of tuple, optional
+        Time indices to use (start, end). A list of (start, end) tuples
+        evaluates several windows at once. If None, uses the entire time period.
 
     Returns
     -------
     mean_map : np.ndarray
-        2D map of representative mean values for each spatial cell.
+        2D map of representative mean values for each spatial cell. When
+        several windows are given, a 3D array with shape (window, lat, lon).
 
     Notes
     -----
@@ -677,6 +848,10 @@ def mean_representative_value(data_cube, time_window=None):
     is used for computing means. This is useful for analyzing seasonal patterns
     or specific time periods of interest.
 
+    For several windows the temporal cumulative sum is computed once and each
+    window mean is obtained from the difference of two partial sums, so the
+    cost per window does not depend on the window length.
+
     Examples
     --------
     >>> import numpy as np
@@ -685,14 +860,30 @@ def mean_representative_value(data_cube, time_window=None):
     >>> mean_all = mean_representative_value(data_cube)
     >>> # Summer months (June-August, assuming daily data starting Jan 1)
     >>> mean_summer = mean_representative_value(data_cube, time_window=(150, 243))
+    >>> # Several windows sharing a single pass over the cube
+    >>> seasons = mean_representative_value(data_cube, time_window=[(0, 90), (90, 181)])
     """
-    if time_window:
+    if not time_window:
+        return np.mean(data_cube, axis=0)
+
+    if np.ndim(time_window) == 1:
         start, end = time_window
-        data_slice = data_cube[start:end]
-    else:
-        data_slice = data_cube
-    
-    mean_map = np.mean(data_slice, axis=0)
+        return np.mean(data_cube[start:end], axis=0)
+
+    n_times = data_cube.shape[0]
+    prefix = np.empty((n_times + 1,) + data_cube.shape[1:])
+    prefix[0] = 0.0
+    np.cumsum(data_cube, axis=0, out=prefix[1:])
+
+    # Partial sums are kept in double precision to avoid cancellation, while the
+    # result keeps the floating-point precision of the input
+    mean_map = np.empty(
+        (len(time_window),) + data_cube.shape[1:],
+        dtype=np.result_type(data_cube.dtype, np.float32),
+    )
+    for k, (start, end) in enumerate(time_window):
+        start, end, _ = slice(start, end).indices(n_times)
+        mean_map[k] = (prefix[end] - prefix[start]) / (end - start)
     return mean_map
 
 
@@ -782,13 +973,19 @@ def spatial_change_rate(data_cube, dx=1, dy=1):
     >>> data_cube = np.random.random((50, 20, 20))
     >>> rate_map = spatial_change_rate(data_cube, dx=0.1, dy=0.1)
     """
-    gradients = []
-    for t in range(data_cube.shape[0]):
-        grad_x, grad_y = utils.spatial_gradient(data_cube[t], dx=dx, dy=dy)
-        magnitude = np.sqrt(grad_x**2 + grad_y**2)
-        gradients.append(magnitude)
-
-    rate_map = np.mean(gradients, axis=0)
+    dtype = np.result_type(data_cube.dtype, np.float32)
+    grad_x = np.empty(data_cube.shape[1:], dtype=dtype)
+    grad_y = np.empty(data_cube.shape[1:], dtype=dtype)
+    rate_map = np.zeros(data_cube.shape[1:], dtype=dtype)
+
+    for data_slice in data_cube:
+        correlate1d(data_slice, _CENTRAL_DIFFERENCE, axis=1, mode='wrap', output=grad_x)
+        correlate1d(data_slice, _CENTRAL_DIFFERENCE, axis=0, mode='wrap', output=grad_y)
+        grad_x /= 2 * dx
+        grad_y /= 2 * dy
+        rate_map += np.hypot(grad_x, grad_y, out=grad_x)
+
+    rate_map /= data_cube.shape[0]
     return rate_map
 
 
@@ -833,15 +1030,15 @@ def functional_area_loss(data_cube, threshold, t_start, t_end):
     mask_end = data_cube[t_end] >= threshold
     
     loss_map = np.logical_and(mask_start, ~mask_end)
-    area_start = np.sum(mask_start)
-    area_end = np.sum(mask_end)
+    area_start = np.count_nonzero(mask_start)
+    area_end = np.count_nonzero(mask_end)
     
     return loss_map.astype(int), area_start, area_end
 
 
 from skimage import measure
 
-def critical_boundary_retreat(data_cube, threshold, t_start, t_end):
+def critical_boundary_retreat(data_cube, threshold, t_start, t_end, packed=False):
     """
     Calculate critical boundary retreat between two time points.
     
@@ -857,10 +1054,14 @@ def critical_boundary_retreat(data_cube, threshold, t_start, t_end):
         Critical threshold defining the boundary.
     t_start, t_end : int
         Time indices to compare.
+    packed : bool, optional
+        If True, each set of contours is returned as a ``(coords, offsets)``
+        tuple from :func:`utils.pack_contours` instead of a list of arrays.
+        Default is False.
 
     Returns
     -------
-    contours_start, contours_end : list
+    contours_start, contours_end : list or tuple
         Contour coordinates at start and end times.
     retreat_mask : np.ndarray
         Binary map showing retreat areas (1 = retreat occurred).
@@ -881,8 +1082,11 @@ def critical_boundary_retreat(data_cube, threshold, t_start, t_end):
     mask_start = data_cube[t_start] >= threshold
     mask_end = data_cube[t_end] >= threshold
     
-    contours_start = measure.find_contours(mask_start.astype(float), level=0.5)
-    contours_end = measure.find_contours(mask_end.astype(float), level=0.5)
+    contours_start = _boundary_contours(mask_start)
+    contours_end = _boundary_contours(mask_end)
+    if packed:
+        contours_start = utils.pack_contours(contours_start)
+        contours_end = utils.pack_contours(contours_end)
     
     retreat_mask = np.logical_and(mask_start, ~mask_end)
     return contours_start, contours_end, retreat_mask.astype(int)
@@ -1153,20 +1357,15 @@ def directional_influence(data_cube, dx=1, dy=1):
     >>> data_cube = np.random.random((50, 25, 25))
     >>> angles, magnitudes = directional_influence(data_cube, dx=0.1, dy=0.1)
     """
-    grad_x_list = []
-    grad_y_list = []
-    
-    for t in range(data_cube.shape[0]):
-        grad_x, grad_y = utils.spatial_gradient(data_cube[t], dx=dx, dy=dy)
-        grad_x_list.append(grad_x)
-        grad_y_list.append(grad_y)
-    
-    mean_grad_x = np.mean(grad_x_list, axis=0)
-    mean_grad_y = np.mean(grad_y_list, axis=0)
-    
+    # The finite-difference gradient is linear, so the temporal mean of the
+    # gradients equals the gradient of the temporal mean map
+    mean_grad_x, mean_grad_y = utils.spatial_gradient(
+        np.mean(data_cube, axis=0), dx=dx, dy=dy
+    )
+
     angle_map = np.arctan2(mean_grad_y, mean_grad_x)
-    magnitude_map = np.sqrt(mean_grad_x**2 + mean_grad_y**2)
-    
+    magnitude_map = np.hypot(mean_grad_x, mean_grad_y)
+
     return angle_map, magnitude_map
 
 
@@ -1180,8 +1379,9 @@ def multivariate_neighbourhood_synergy(cube_list, size=3):
 
     Parameters
     ----------
-    cube_list : list of np.ndarray
-        List of 3D arrays (time, lat, lon), one per variable.
+    cube_list : list of np.ndarray or np.ndarray
+        List of 3D arrays (time, lat, lon), one per variable, or a single 4D
+        array with shape (variable, time, lat, lon).
     size : int, optional
         Neighborhood size. Default is 3.
 
@@ -1204,17 +1404,14 @@ def multivariate_neighbourhood_synergy(cube_list, size=3):
     >>> synergy = multivariate_neighbourhood_synergy([cube1, cube2], size=3)
     """
     
-    neigh_cubes = [neighbourhood_mean(cube, size=size) for cube in cube_list]
-    mean_maps = [np.mean(cube, axis=0) for cube in neigh_cubes]
-    
-    stacked = np.stack(mean_maps, axis=-1)  # (lat, lon, variables)
-    synergy_map = np.zeros(stacked.shape[:2])
-    
-    for i in range(stacked.shape[0]):
-        for j in range(stacked.shape[1]):
-            vec = stacked[i, j, :]
-            synergy_map[i, j] = np.std(vec) / (np.mean(vec) + 1e-6)  # inverse coefficient of variation
-    
+    # The neighbourhood filter is linear, so filtering the temporal means gives
+    # the temporal means of the filtered cubes at a fraction of the cost
+    mean_maps = np.stack([np.mean(cube, axis=0) for cube in cube_list])  # (variables, lat, lon)
+    mean_maps = uniform_filter(mean_maps, size=(1, size, size), mode='reflect')
+
+    # Coefficient of variation across variables, for all cells at once
+    synergy_map = np.std(mean_maps, axis=0) / (np.mean(mean_maps, axis=0) + 1e-6)
+
     return 1 - synergy_map  # higher synergy = lower dispersion
 
 
@@ -1250,15 +1447,17 @@ def spatiotemporal_coupling(cube_x, cube_y):
     >>> cube_y = np.random.random((100, 20, 20))
     >>> coupling = spatiotemporal_coupling(cube_x, cube_y)
     """
-    coupling_map = np.zeros(cube_x.shape[1:])
-    for i in range(cube_x.shape[1]):
-        for j in range(cube_x.shape[2]):
-            x = cube_x[:, i, j]
-            y = cube_y[:, i, j]
-            if np.std(x) > 0 and np.std(y) > 0:
-                coupling_map[i, j] = np.corrcoef(x, y)[0, 1]
-            else:
-                coupling_map[i, j] = 0
+    anomaly_x = cube_x - np.mean(cube_x, axis=0)
+    anomaly_y = cube_y - np.mean(cube_y, axis=0)
+
+    covariance = np.einsum('tij,tij->ij', anomaly_x, anomaly_y)
+    variance_x = np.einsum('tij,tij->ij', anomaly_x, anomaly_x)
+    variance_y = np.einsum('tij,tij->ij', anomaly_y, anomaly_y)
+    denominator = np.sqrt(variance_x * variance_y)
+
+    # Cells where either variable is constant in time are set to 0
+    coupling_map = np.zeros(cube_x.shape[1:], dtype=denominator.dtype)
+    np.divide(covariance, denominator, out=coupling_map, where=denominator > 0)
     return coupling_map
 
 
@@ -1272,10 +1471,11 @@ def multivariate_threshold_exceedance(cube_list, thresholds):
 
     Parameters
     ----------
-    cube_list : list of np.ndarray
-        List of 3D arrays (time, lat, lon), one per variable.
-    thresholds : list of float
-        List of threshold values, one per variable.
+    cube_list : list of np.ndarray or np.ndarray
+        List of 3D arrays (time, lat, lon), one per variable, or a single 4D
+        array with shape (variable, time, lat, lon).
+    thresholds : list of float or np.ndarray
+        Threshold values, one per variable.
 
     Returns
     -------
@@ -1295,10 +1495,7 @@ def multivariate_threshold_exceedance(cube_list, thresholds):
     >>> cube2 = np.random.gamma(2, 1, (50, 15, 15))
     >>> freq_map = multivariate_threshold_exceedance([cube1, cube2], [3.0, 2.5])
     """
-    exceedance = np.ones_like(cube_list[0], dtype=bool)
-    for cube, th in zip(cube_list, thresholds):
-        exceedance &= cube > th
-    freq_map = np.mean(exceedance, axis=0)
+    freq_map = _joint_exceedance_count(cube_list, thresholds) / len(cube_list[0])
     return freq_map
 
 
@@ -1353,10 +1550,11 @@ def multivariate_persistence(cube_list, thresholds):
 
     Parameters
     ----------
-    cube_list : list of np.ndarray
-        List of 3D arrays (time, lat, lon), one per variable.
-    thresholds : list of float
-        List of threshold values, one per variable.
+    cube_list : list of np.ndarray or np.ndarray
+        List of 3D arrays (time, lat, lon), one per variable, or a single 4D
+        array with shape (variable, time, lat, lon).
+    thresholds : list of float or np.ndarray
+        Threshold values, one per variable.
 
     Returns
     -------
@@ -1376,10 +1574,7 @@ def multivariate_persistence(cube_list, thresholds):
     >>> cube2 = np.random.gamma(2, 1, (365, 20, 20))
     >>> persistence = multivariate_persistence([cube1, cube2], [2.0, 3.0])
     """
-    condition = np.ones_like(cube_list[0], dtype=bool)
-    for cube, th in zip(cube_list, thresholds):
-        condition &= cube > th
-    persistence_map = np.mean(condition, axis=0)
+    persistence_map = _joint_exceedance_count(cube_list, thresholds) / len(cube_list[0])
     return persistence_map
 
 
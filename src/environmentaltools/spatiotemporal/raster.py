@@ -66,6 +66,8 @@ multiple simulation scenarios and analysis indices for comprehensive
 environmental assessment.
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import xarray as xr
@@ -193,6 +195,35 @@ def calculate_temporal_differences(info):
     return results
 
 
+def _find_files(path, suffixes):
+    """
+    List the files below a directory by suffix, in a single walk.
+
+    The directories are visited top-down, and the files of each one in listing
+    order, as ``Path.rglob`` does, so the pairing of the NetCDF and level files
+    by position is preserved.
+
+    Parameters
+    ----------
+    path : Path
+        Directory to search.
+    suffixes : tuple of str
+        File suffixes to collect (e.g. ``(".nc", ".csv")``).
+
+    Returns
+    -------
+    dict
+        Paths (str) of the files with each suffix.
+    """
+    files = {suffix: [] for suffix in suffixes}
+    for root, _, names in os.walk(path):
+        for name in names:
+            for suffix in suffixes:
+                if name.endswith(suffix):
+                    files[suffix].append(os.path.join(root, name))
+    return files
+
+
 def check_inputs(info):
     """
     Validate and prepare input configuration for marine spatial analysis processing.
@@ -288,8 +319,9 @@ def check_inputs(info):
     if not info["project"]["input_path"].exists():
         raise FileNotFoundError(f"Input datacube path does not exist: {info['project']['input_path']}")
 
-    # Obtain netcdf files
-    info["datacube_filenames"] = [str(file) for file in info["project"]["input_path"].rglob("*.nc")]
+    # Obtain netcdf and level files in a single walk of the input directory
+    input_files = _find_files(info["project"]["input_path"], (".nc", ".csv"))
+    info["datacube_filenames"] = input_files[".nc"]
     
     # Obtain only the files for the number of simulations
     if len(info["datacube_filenames"]) < info["project"]["no_sims"]:
@@ -298,7 +330,7 @@ def check_inputs(info):
     info["datacube_filenames"] = info["datacube_filenames"][:info["project"]["no_sims"]]
 
     # Obtain level files
-    info["level_filenames"] = [str(file) for file in info["project"]["input_path"].rglob("*.csv")]
+    info["level_filenames"] = input_files[".csv"]
 
     # Obtain only the files for the number of simulations
     if len(info["level_filenames"]) < info["project"]["no_sims"]:
@@ -309,34 +341,34 @@ def check_inputs(info):
     # Verify date consistency between NetCDF and CSV files
     # This ensures that all dates in the NetCDF time dimension have corresponding data in the CSV
     # It also ensure that variables are in the level files
+    # The level files are parsed once here and kept in info["levels"], which
+    # post_treatment and analysis reuse instead of reading them again
+    info["levels"] = []
     for j, filename in enumerate(info["level_filenames"]):
         levels = pd.read_csv(
                         filename,
                         sep=",",
                         index_col=0,
                     )
+        info["levels"].append(levels)
         
-        # Get time metadata from NetCDF file
+        # Get time and mesh metadata from NetCDF file
         with xr.open_dataset(info["datacube_filenames"][j]) as ds:
             netcdf_dates = pd.to_datetime(ds.time.values)
+            nx, ny = ds.sizes["x"], ds.sizes["y"]
         
         # Convert CSV index to datetime for comparison
         csv_dates = pd.to_datetime(levels.index)
         
-        # Check that all NetCDF dates are present in CSV
-        missing_dates = []
-        for date in netcdf_dates:
-            if date not in csv_dates:
-                missing_dates.append(date)
+        # Check that all NetCDF dates are present in CSV (one hashed lookup
+        # of all the dates instead of a membership test per date)
+        missing_dates = netcdf_dates[~netcdf_dates.isin(csv_dates)].tolist()
         
         if missing_dates:
             raise ValueError(f"NetCDF file {info['datacube_filenames'][j]} contains dates not found in CSV file {filename}: {missing_dates}")
         
         # Optional: Check for extra dates in CSV (informational only)
-        extra_dates = []
-        for date in csv_dates:
-            if date not in netcdf_dates:
-                extra_dates.append(date)
+        extra_dates = csv_dates[~csv_dates.isin(netcdf_dates)].tolist()
         
         if extra_dates:
             logger.warning(f"CSV file {filename} contains {len(extra_dates)} extra dates not in NetCDF: {extra_dates[:5]}{'...' if len(extra_dates) > 5 else ''}")
@@ -393,11 +425,8 @@ def check_inputs(info):
 
     # TODO: if horizon_times and return_periods are both specified, modify input files accordingly
 
-    # Check mesh size to alert about memory usage
-    # Get coordinates metadata from NetCDF file
-    with xr.open_dataset(info["datacube_filenames"][j]) as ds:
-        x_coords, y_coords = ds.x.values, ds.y.values
-    nx, ny = x_coords.size, y_coords.size
+    # Check mesh size to alert about memory usage, with the sizes read from
+    # the last NetCDF file during the date verification
     total_points = nx * ny
     if total_points > 10**7:  # 10 million points
         logger.warning(
@@ -421,6 +450,16 @@ def check_inputs(info):
     return
 
 
+def _read_levels(info, sim):
+    """
+    Return the threshold levels of a simulation: the table parsed by
+    check_inputs if available, else the CSV file read again.
+    """
+    if "levels" in info:
+        return info["levels"][sim]
+    return pd.read_csv(info["level_filenames"][sim], sep=",", index_col=0)
+
+
 def post_treatment(info):
     """
     Perform post-treatment preprocessing for spatiotemporal raster analysis.
@@ -475,11 +514,7 @@ def post_treatment(info):
     # Process each simulation to find absolute min/max values
     for sim in range(info["project"]["no_sims"]):
         # Load threshold levels data for current simulation
-        data = pd.read_csv(
-            info['level_filenames'][sim],
-            sep=",",
-            index_col=0
-        )[info["project"]["variables"]]
+        data = _read_levels(info, sim)[info["project"]["variables"]]
     
         # Calculate min and max values from this simulation's data
         sim_min = data.min().min()  # Absolute minimum across all columns and rows
@@ -532,7 +567,7 @@ def binary_matrix(data_cube, levels, info):
     Returns
     -------
     numpy.ndarray
-        Binary mask array with the same shape as data_cube, where:
+        Binary mask array (uint8) with the same shape as data_cube, where:
         - 1 (True): Values below the threshold level
         - 0 (False): Values above or equal to the threshold level
 
@@ -547,20 +582,55 @@ def binary_matrix(data_cube, levels, info):
     The mask creation follows the pattern:
     mask[t, y, x] = data_cube[t, y, x] < levels[t, variable]
     """
-    # Initialize binary mask array with same shape as data cube
-    bin_mask = np.zeros_like(data_cube)
-    
+    # Initialize binary mask array with same shape as data cube (one byte per
+    # cell instead of the float of the data)
+    bin_mask = np.zeros(data_cube.shape, dtype=np.uint8)
+
+    # Pull the threshold levels once as an array instead of a label lookup
+    # per time step
+    level_values = levels[info["project"]["variables"][0]].to_numpy()
+
     # Create binary mask for each time step based on threshold levels
     for k, date in enumerate(levels.index):
-        # Create mask where data values are below the threshold level
-        mask = data_cube.sel(time=date) < levels.loc[date, info["project"]["variables"][0]]
-
-        # Store the mask in the binary mask array
-        bin_mask[k, :, :] = mask.values
+        # Write the mask where data values are below the threshold level
+        # straight into its slice of the binary mask array
+        np.less(
+            data_cube.sel(time=date).values,
+            level_values[k],
+            out=bin_mask[k].view(bool),
+        )
 
     return bin_mask
 
 
+def _process_simulation(info, sim_no, output_filename):
+    """
+    Compute and save the binary matrix of one simulation.
+
+    Module-level function, so that it can run in a worker process.
+    """
+    # Extract the specified environmental variable from the NetCDF file
+    data_cube = xr.open_dataset(info["datacube_filenames"][sim_no])[info["project"]["variables"][0]]
+    coords = data_cube.coords
+
+    # Load threshold levels from CSV file for current simulation
+    levels = _read_levels(info, sim_no)
+
+    # Generate binary mask matrix based on threshold comparison
+    bin_mask = binary_matrix(data_cube, levels, info)
+
+    # Save binary matrix to NetCDF format with metadata
+    save_matrix_to_netcdf(
+        bin_mask,
+        coords,
+        data_cube.time,  # Use time coordinate from data_cube
+        info,
+        sim_no,
+        output_filename,
+    )
+    return output_filename
+
+
 def analysis(info=None):
     """
     Execute the complete spatiotemporal raster analysis workflow.
@@ -593,6 +663,14 @@ def analysis(info=None):
     The function processes multiple simulations and analysis indices as specified
     in the configuration, creating separate output files for each combination.
 
+    The binary matrices of the simulations are computed in
+    ``info["parameters"]["n_workers"]`` worker processes (1 by default).
+
+    Percentile statistics across simulations are computed lazily, one time step
+    at a time. Setting ``info["parameters"]["tile_size"]`` additionally splits
+    each time step into square spatial tiles of that many cells, bounding the
+    peak memory for large data cubes.
+
     Examples
     --------
     >>> from pathlib import Path
@@ -615,7 +693,11 @@ def analysis(info=None):
         # Initialize result list for this index
         result[index] = []
         
-        # Process each simulation for the current index
+        # Process each simulation for the current index. The simulations are
+        # independent, so they can run in several worker processes (set with
+        # info["parameters"]["n_workers"]; processes rather than threads, since
+        # the NetCDF library is not thread-safe)
+        pending = []
         for sim_no in range(info["project"]["no_sims"]):
             # Generate output filename for current simulation and index
             output_filename = (
@@ -626,37 +708,22 @@ def analysis(info=None):
             # Skip processing if output file already exists
             if output_filename.exists():
                 logger.info(f"Output file {output_filename} already exists. Skipping simulation {sim_no + 1}.")
-                continue
             else:
                 logger.info(f"Processing simulation {sim_no + 1} for index {index}.")
-                
-                # Load spatiotemporal data cube for current simulation
-                file_path = info["datacube_filenames"][sim_no]
-
-                # Extract the specified environmental variable from NetCDF file
-                data_cube = xr.open_dataset(file_path)[info["project"]["variables"][0]]
-                coords = data_cube.coords
-
-                # Load threshold levels from CSV file for current simulation
-                levels = pd.read_csv(
-                    info['level_filenames'][sim_no],
-                    sep=",",
-                    index_col=0,
-                )
-
-                # Generate binary mask matrix based on threshold comparison
-                bin_mask = binary_matrix(data_cube, levels, info)
-
-                # Save binary matrix to NetCDF format with metadata
-                save_matrix_to_netcdf(
-                    bin_mask,
-                    coords,
-                    data_cube.time,  # Use time coordinate from data_cube
-                    info,
-                    sim_no,
-                    output_filename,
-                )
-                logger.info(f"Saving {output_filename}")
+                pending.append((sim_no, output_filename))
+
+        n_workers = min(info.get("parameters", {}).get("n_workers", 1), len(pending))
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = [
+                    executor.submit(_process_simulation, info, sim_no, output_filename)
+                    for sim_no, output_filename in pending
+                ]
+                for future in futures:
+                    logger.info(f"Saving {future.result()}")
+        else:
+            for sim_no, output_filename in pending:
+                logger.info(f"Saving {_process_simulation(info, sim_no, output_filename)}")
         
         # post_treatment(info)
     
@@ -676,7 +743,16 @@ def analysis(info=None):
                 )
                 for sim_no in range(info["project"]["no_sims"])
             ]
-            data_cubes_stack = xr.open_mfdataset(nc_paths, concat_dim='simulation', combine='nested')
+            # Procesar el stack por teselas: cada chunk contiene todas las
+            # simulaciones de un único instante (y, opcionalmente, de una
+            # ventana espacial), de modo que la memoria queda acotada por la tesela
+            tile_size = info.get("parameters", {}).get("tile_size")
+            chunks = {"time": 1}
+            if tile_size:
+                chunks.update({"y": tile_size, "x": tile_size})
+            data_cubes_stack = xr.open_mfdataset(
+                nc_paths, concat_dim='simulation', combine='nested', chunks=chunks
+            ).chunk({"simulation": -1})
             indicator_func = getattr(indicators, idx)
             percentiles_result = {}
             for p in percentiles:
@@ -16,6 +16,7 @@ The module handles:
 Dependencies:
     - numpy: Array operations and mathematical functions
     - pandas: Data manipulation and analysis
+    - xarray: NetCDF output of the simulation matrices
     - geopandas: Geospatial data operations
     - rasterio: Raster data I/O and processing
     - matplotlib: Plotting and visualization
@@ -27,16 +28,42 @@ Author: Marinetools Development Team
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from scipy.interpolate import LinearNDInterpolator
+import xarray as xr
+from scipy.interpolate import LinearNDInterpolator, RegularGridInterpolator
+from scipy.spatial import Delaunay
 
 # Debug mode: set DEBUG_MODE=True to enable visualizations
 DEBUG_MODE = os.getenv("DEBUG_MODE", "False").lower() in ("true", "1", "yes")
 
+# Approximate number of points per side drawn in the debug previews
+_DEBUG_PREVIEW_SIZE = 512
+
+# Number of cells of the DEM compared at a time when searching the band, so
+# that the intermediate masks stay in cache
+_BAND_BLOCK_SIZE = 1 << 18
+
+# Triangulation of the last band points interpolated by refinement, reused by
+# the next calls on the same points (e.g. several variables or target grids)
+# (stored as one (points, triangulation) pair, so that threads never see the
+# points of one call with the triangulation of another)
+_TRIANGULATION_CACHE = {"entry": None}
+
+
+def _grid_edges(values):
+    """
+    Values on the outer rows and columns of a 2D grid.
+    """
+    return np.concatenate(
+        (values[0, :], values[-1, :], values[:, 0], values[:, -1])
+    )
+
 
 def calculate_grid_angle_and_create_rotated_mesh(xx, yy, grid_size):
     """
@@ -69,6 +96,11 @@ def calculate_grid_angle_and_create_rotated_mesh(xx, yy, grid_size):
     The function automatically detects if the DEM coordinates are 1D or 2D and
     calculates the appropriate rotation angle. A memory usage warning is issued
     if the resulting mesh would be very large (> 10 million points).
+
+    The bounds are taken from the outer rows and columns of the grid, which
+    hold the extremes of any grid whose coordinates vary monotonically along
+    its rows or its columns (regular or rotated DEMs), without scanning the
+    interior points.
     """
     # Calculate the angle of the DEM grid
     # Use corners to calculate the main orientation
@@ -83,16 +115,32 @@ def calculate_grid_angle_and_create_rotated_mesh(xx, yy, grid_size):
     dx2 = x_dem[-1, 0] - x_dem[0, 0]
     dy2 = y_dem[-1, 0] - y_dem[0, 0]
 
+    # Bounds of xx, yy, found on the outer rows and columns of the grid
+    x_edges, y_edges = _grid_edges(x_dem), _grid_edges(y_dem)
+    x_min, x_max = np.min(x_edges), np.max(x_edges)
+    y_min, y_max = np.min(y_edges), np.max(y_edges)
+
+    # The mesh only depends on these values, so it is built once for each
+    # footprint and copied on later calls
+    X_rotated, Y_rotated, angle = _rotated_mesh(
+        *(float(value) for value in (dx1, dy1, dx2, dy2, x_min, x_max, y_min, y_max)),
+        grid_size,
+    )
+    return X_rotated.copy(), Y_rotated.copy(), angle
+
+
+@lru_cache(maxsize=4)
+def _rotated_mesh(dx1, dy1, dx2, dy2, x_min, x_max, y_min, y_max, grid_size):
+    """
+    Rotated mesh of calculate_grid_angle_and_create_rotated_mesh from the edge
+    vectors and the bounds of the DEM grid (memoized).
+    """
     # Calculate rotation angle (use the longer vector)
-    if np.sqrt(dx1**2 + dy1**2) > np.sqrt(dx2**2 + dy2**2):
+    if dx1 * dx1 + dy1 * dy1 > dx2 * dx2 + dy2 * dy2:
         angle = np.arctan2(dy1, dx1)  # horizontal axis angle
     else:
         angle = np.arctan2(dx2, dy2) - np.pi / 2  # corrected vertical axis angle
 
-    # Bounds of xx, yy
-    x_min, x_max = np.min(xx), np.max(xx)
-    y_min, y_max = np.min(yy), np.max(yy)
-
     # Domain center
     x_center = (x_min + x_max) / 2
     y_center = (y_min + y_max) / 2
@@ -105,19 +153,47 @@ def calculate_grid_angle_and_create_rotated_mesh(xx, yy, grid_size):
     nx = int(width / grid_size) + 1
     ny = int(height / grid_size) + 1
 
-    # Create regular mesh in local system (without rotation)
-    x_local = np.linspace(-width / 2, width / 2, nx)
-    y_local = np.linspace(-height / 2, height / 2, ny)
-    X_local, Y_local = np.meshgrid(x_local, y_local)
+    # Create regular mesh in local system (without rotation), as an open grid:
+    # a column of y and a row of x that broadcast to the full grid
+    y_local, x_local = np.ogrid[
+        -height / 2 : height / 2 : ny * 1j, -width / 2 : width / 2 : nx * 1j
+    ]
 
-    # Apply rotation
+    # Apply rotation, building each full grid once and shifting it in place
     cos_a, sin_a = np.cos(angle), np.sin(angle)
-    X_rotated = cos_a * X_local - sin_a * Y_local + x_center
-    Y_rotated = sin_a * X_local + cos_a * Y_local + y_center
+    X_rotated = cos_a * x_local - sin_a * y_local
+    X_rotated += x_center
+    Y_rotated = sin_a * x_local + cos_a * y_local
+    Y_rotated += y_center
 
     return X_rotated, Y_rotated, angle
 
 
+def _band_rows_and_columns(values, level_min, level_max):
+    """
+    Rows and columns of a 2D array with values strictly between two levels.
+
+    The array is scanned in blocks of rows, reusing two small boolean buffers,
+    so the full-size comparison masks are never built.
+    """
+    n_rows, n_cols = values.shape
+    rows = np.empty(n_rows, dtype=bool)
+    columns = np.zeros(n_cols, dtype=bool)
+
+    block = max(1, _BAND_BLOCK_SIZE // max(n_cols, 1))
+    below = np.empty((min(block, n_rows), n_cols), dtype=bool)
+    above = np.empty_like(below)
+    for start in range(0, n_rows, block):
+        chunk = values[start : start + block]
+        n = len(chunk)
+        np.less(chunk, level_max, out=below[:n])
+        np.greater(chunk, level_min, out=above[:n])
+        np.logical_and(below[:n], above[:n], out=below[:n])
+        np.any(below[:n], axis=1, out=rows[start : start + n])
+        columns |= np.any(below[:n], axis=0)
+    return rows, columns
+
+
 def band(data_cube, levels):
     """
     Create a band mask for data_cube within specified depth/elevation levels.
@@ -142,42 +218,50 @@ def band(data_cube, levels):
 
     Notes
     -----
-    In debug mode (DEBUG_MODE=True), displays a visualization of the band.
+    In debug mode (DEBUG_MODE=True), displays a downsampled visualization of the
+    band.
     The function extends the initial mask along the specified orientation to
     create a continuous band across the domain.
     TODO: Optimize band extension to avoid holes in complex geometries.
     """
-    # Define level bounds and create initial mask
-    z_ = np.where((data_cube < levels.max()) & (data_cube > levels.min()), 1, 0)
+    # Define level bounds
+    level_min, level_max = levels.min(), levels.max()
+    values = np.asarray(data_cube)
+
+    x_coords, y_coords = np.asarray(data_cube["x"]), np.asarray(data_cube["y"])
 
     # Debug mode: show band visualization
     if DEBUG_MODE:
+        import matplotlib.pyplot as plt
+
+        # Downsampled preview of the points inside the levels
+        step = max(1, max(values.shape) // _DEBUG_PREVIEW_SIZE)
+        preview = values[::step, ::step]
+        z_ = (preview < level_max) & (preview > level_min)
         plt.figure()
-        plt.contourf(data_cube["x"], data_cube["y"], z_, levels=2, cmap="RdBu", alpha=0.5)
+        plt.pcolormesh(
+            x_coords[::step, ::step],
+            y_coords[::step, ::step],
+            z_.astype(int),
+            shading="nearest",
+            cmap="RdBu",
+            alpha=0.5,
+        )
         plt.axis("equal")
         plt.title("Debug: Band Visualization")
         plt.show()
 
-    # Create extended mask
-    mask = np.zeros_like(z_)
-    len_x, len_y = 0, 0
-    # Extend mask horizontally
-    for i in range(data_cube["y"].shape[0]):
-        if np.any(z_[i, :] == 1):
-            mask[i, :] = 1
-            len_y += 1
-
-    # Filter mask vertically
-    for i in range(data_cube["y"].shape[1]):
-        if np.any(z_[:, i] == 1):
-            indexes = np.where(z_[:, i] == 1)[0]
-            mask[indexes, i] = 1
-            len_x += 1
-
-    # Convert to boolean mask and extract coordinates
-    band_ = mask == 1
-    xx = data_cube["x"][band_]
-    yy = data_cube["y"][band_]
+    # Extend the mask horizontally: every row with points inside the levels is
+    # kept whole, which also covers the points of each column inside them
+    rows, columns = _band_rows_and_columns(values, level_min, level_max)
+    len_y = np.count_nonzero(rows)
+    len_x = np.count_nonzero(columns)
+
+    # Boolean mask and coordinates of the band, taken as whole rows instead of
+    # gathering them through the full-size mask
+    band_ = np.repeat(rows[:, np.newaxis], values.shape[1], axis=1)
+    xx = x_coords[rows]
+    yy = y_coords[rows]
 
     # Reshape coordinates
     xx = np.reshape(xx, (len_x, len_y))
@@ -187,12 +271,153 @@ def band(data_cube, levels):
     return band_, {"X": xx, "Y": yy}
 
 
+def _band_rows(x, band_):
+    """
+    Rows of the band when it is made of whole rows of a 2D DEM, else None.
+    """
+    if np.ndim(x) != 2 or np.shape(x) != np.shape(band_):
+        return None
+
+    rows = np.any(band_, axis=1)
+    if not rows.any():
+        return None
+    if not np.array_equal(band_, np.repeat(rows[:, np.newaxis], band_.shape[1], axis=1)):
+        return None
+    return rows
+
+
+def _band_grid_axes(x, y, rows):
+    """
+    1D (y, x) axes of the band rows of an axis-aligned rectilinear DEM.
+
+    Returns None if the coordinates are not an axis-aligned grid with strictly
+    monotonic axes.
+    """
+    if not (np.all(x == x[:1, :]) and np.all(y == y[:, :1])):
+        return None
+
+    x_axis, y_axis = x[0, :], y[rows, 0]
+    for axis in (x_axis, y_axis):
+        steps = np.diff(axis)
+        if not (np.all(steps > 0) or np.all(steps < 0)):
+            return None
+    return y_axis, x_axis
+
+
+def _axis_window(axis, low, high):
+    """
+    Slice of a strictly monotonic axis covering the values from low to high,
+    plus one more value on each side, so that every cell that can hold a point
+    in that range is included.
+
+    Returns the whole axis if the range is not finite or the slice would have
+    fewer than two values.
+    """
+    if not (np.isfinite(low) and np.isfinite(high)):
+        return slice(None)
+
+    ascending = axis[-1] > axis[0]
+    values = axis if ascending else axis[::-1]
+    start = max(np.searchsorted(values, low, side="right") - 1, 0)
+    stop = min(np.searchsorted(values, high, side="left") + 1, len(values))
+    if not ascending:
+        start, stop = len(values) - stop, len(values) - start
+    if stop - start < 2:
+        return slice(None)
+    return slice(start, stop)
+
+
+def _rotated_grid_frame(x, y):
+    """
+    Affine frame of a regular DEM grid, possibly rotated.
+
+    Returns the origin (coordinates of cell [0, 0]) and the inverse of the
+    matrix whose columns are the column and row steps, which maps coordinates
+    relative to the origin to fractional (column, row) indices. Returns None if
+    the coordinates are not a regular grid.
+    """
+    n_rows, n_cols = x.shape
+    if n_rows < 2 or n_cols < 2:
+        return None
+
+    origin = np.array([x[0, 0], y[0, 0]])
+    steps = np.array(
+        [
+            [x[0, 1] - x[0, 0], x[1, 0] - x[0, 0]],
+            [y[0, 1] - y[0, 0], y[1, 0] - y[0, 0]],
+        ]
+    )
+    scale = np.max(np.abs(steps))
+    if scale == 0 or abs(np.linalg.det(steps)) < 1e-12 * scale**2:
+        return None
+
+    row_index, col_index = np.ogrid[:n_rows, :n_cols]
+    tolerance = 1e-6 * scale
+    for k, values in enumerate((x, y)):
+        expected = origin[k] + col_index * steps[k, 0] + row_index * steps[k, 1]
+        if not np.allclose(values, expected, rtol=0, atol=tolerance):
+            return None
+    return origin, np.linalg.inv(steps)
+
+
+def _bilinear_sample(z, row_index, col_index):
+    """
+    Bilinear interpolation of a 2D array at fractional (row, column) indices.
+
+    Points outside the array are NaN.
+    """
+    n_rows, n_cols = z.shape
+    inside = (
+        (row_index >= 0) & (row_index <= n_rows - 1)
+        & (col_index >= 0) & (col_index <= n_cols - 1)
+    )
+    row_index = np.where(inside, row_index, 0)
+    col_index = np.where(inside, col_index, 0)
+
+    # Lower corner of the cell of each point (the last row or column uses the
+    # previous cell, with weight 1 on its far side)
+    i0 = np.clip(np.floor(row_index).astype(np.intp), 0, max(n_rows - 2, 0))
+    j0 = np.clip(np.floor(col_index).astype(np.intp), 0, max(n_cols - 2, 0))
+    i1 = np.minimum(i0 + 1, n_rows - 1)
+    j1 = np.minimum(j0 + 1, n_cols - 1)
+    t = row_index - i0
+    u = col_index - j0
+
+    values = (
+        (1 - t) * ((1 - u) * z[i0, j0] + u * z[i0, j1])
+        + t * ((1 - u) * z[i1, j0] + u * z[i1, j1])
+    )
+    return np.where(inside, values, np.nan)
+
+
+def _triangulation(points):
+    """
+    Delaunay triangulation of the points, reusing the previous one when the
+    points are the same.
+
+    The points are compared by value, which is linear in their number, while
+    the triangulation is O(N log N) with a much larger constant.
+    """
+    entry = _TRIANGULATION_CACHE["entry"]
+    if entry is not None and np.array_equal(entry[0], points):
+        return entry[1]
+
+    triangulation = Delaunay(points)
+    _TRIANGULATION_CACHE["entry"] = (points, triangulation)
+    return triangulation
+
+
 def refinement(da_dem, band_, coords):
     """
     Perform spatial interpolation to refine elevation data on a new coordinate grid.
 
-    Uses LinearNDInterpolator to interpolate elevation values from the DEM data
-    within the band area to new coordinate positions specified in coords.
+    Interpolates elevation values from the DEM data within the band area to new
+    coordinate positions specified in coords. When the band is made of whole
+    rows (as built by :func:`band`) of a regular DEM, the values are sampled
+    bilinearly: with RegularGridInterpolator on an axis-aligned grid, or on
+    the fractional indices of the points in a rotated grid. Otherwise they are
+    interpolated linearly on a Delaunay triangulation of the band points with
+    LinearNDInterpolator.
 
     Parameters
     ----------
@@ -212,22 +437,62 @@ def refinement(da_dem, band_, coords):
     -----
     In debug mode (DEBUG_MODE=True), displays a visualization comparing the original
     DEM points with the new interpolation grid points. The interpolation uses only
-    the points within the band mask to avoid extrapolation beyond the data bounds.
+    the points within the band mask to avoid extrapolation beyond the data bounds
+    (NaN is returned outside them). On a regular grid, no triangulation is
+    needed and each point is located directly on the axes.
     """
-    X, Y = coords["X"], coords["Y"]
+    X, Y = np.asarray(coords["X"]), np.asarray(coords["Y"])
+    x, y, z = np.asarray(da_dem["x"]), np.asarray(da_dem["y"]), np.asarray(da_dem["z"])
+    band_ = np.asarray(band_)
 
     # Debug mode: show band visualization
     if DEBUG_MODE:
+        import matplotlib.pyplot as plt
+
+        # Downsampled preview of both sets of points
+        step = max(1, x.size // _DEBUG_PREVIEW_SIZE**2)
         plt.figure()
-        plt.plot(da_dem["x"].flatten(), da_dem["y"].flatten(), "ob", markersize=1)
-        plt.plot(X.flatten(), Y.flatten(), "xr", markersize=1)
+        plt.plot(x.ravel()[::step], y.ravel()[::step], "ob", markersize=1)
+        step = max(1, X.size // _DEBUG_PREVIEW_SIZE**2)
+        plt.plot(X.ravel()[::step], Y.ravel()[::step], "xr", markersize=1)
         plt.title("Debug: DEM points (blue) vs Interpolation grid (red)")
         plt.show()
 
-    # Create interpolator using only band points
+    rows = _band_rows(x, band_)
+    if rows is not None:
+        # Sample an axis-aligned grid directly on the axes of the band rows,
+        # restricted to the window of the axes around the target points
+        row_numbers = np.flatnonzero(rows)
+        grid_axes = _band_grid_axes(x, y, rows)
+        if grid_axes is not None:
+            y_axis, x_axis = grid_axes
+            y_window = _axis_window(y_axis, np.nanmin(Y), np.nanmax(Y))
+            x_window = _axis_window(x_axis, np.nanmin(X), np.nanmax(X))
+            interp = RegularGridInterpolator(
+                (y_axis[y_window], x_axis[x_window]),
+                z[row_numbers[y_window], x_window],
+                bounds_error=False,
+                fill_value=np.nan,
+            )
+            return interp((Y, X))
+
+        # Sample a rotated regular grid on the (contiguous) band rows, with the
+        # target points mapped to fractional indices of the grid
+        frame = _rotated_grid_frame(x, y)
+        first_row, last_row = row_numbers[0], row_numbers[-1]
+        if frame is not None and last_row - first_row + 1 == len(row_numbers):
+            origin, inverse = frame
+            dx, dy = X - origin[0], Y - origin[1]
+            col_index = inverse[0, 0] * dx + inverse[0, 1] * dy
+            row_index = inverse[1, 0] * dx + inverse[1, 1] * dy - first_row
+            return _bilinear_sample(z[first_row : last_row + 1], row_index, col_index)
+
+    # Create interpolator using only band points, given as an (N, 2) array
+    # (boolean indexing already returns flat copies), on their cached
+    # triangulation
     interp = LinearNDInterpolator(
-        list(zip(da_dem["x"][band_].flatten(), da_dem["y"][band_].flatten())),
-        da_dem["z"][band_].flatten(),
+        _triangulation(np.column_stack((x[band_], y[band_]))),
+        z[band_],
     )
 
     # Interpolate to new coordinates
@@ -235,6 +500,34 @@ def refinement(da_dem, band_, coords):
     return Z
 
 
+def refine_many(da_dem, bands, coords_list, n_workers=None):
+    """
+    Run :func:`refinement` for several bands and target grids of the same DEM.
+
+    The calls run in a thread pool: the triangulation and the interpolation
+    are done in SciPy/NumPy code that releases the GIL, and threads share the
+    DEM instead of copying it to worker processes.
+
+    Parameters
+    ----------
+    da_dem : dict
+        DEM data containing 'x', 'y', and 'z' arrays.
+    bands : list of np.ndarray
+        Boolean band masks, one per call.
+    coords_list : list of dict
+        Target coordinates ('X' and 'Y' arrays), one per call.
+    n_workers : int, optional
+        Number of threads. Defaults to the ThreadPoolExecutor default.
+
+    Returns
+    -------
+    list of np.ndarray
+        Interpolated values for each band and target grid, in order.
+    """
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(refinement, repeat(da_dem), bands, coords_list))
+
+
 
 def spatial_gradient(array_2d, dx=1, dy=1):
     """
@@ -252,15 +545,79 @@ def spatial_gradient(array_2d, dx=1, dy=1):
     return grad_x, grad_y
 
 
+def pack_contours(contours):
+    """
+    Pack a list of contour arrays into a single contiguous coordinate buffer.
+
+    Parameters
+    ----------
+    contours : list of np.ndarray
+        Contours as returned by ``skimage.measure.find_contours``, each with
+        shape (n_points, 2).
+
+    Returns
+    -------
+    coords : np.ndarray
+        Array with shape (total_points, 2) holding all contours one after another.
+    offsets : np.ndarray
+        Integer array with shape (n_contours + 1,). Contour ``i`` is
+        ``coords[offsets[i]:offsets[i + 1]]``.
+    """
+    lengths = [len(contour) for contour in contours]
+    offsets = np.zeros(len(contours) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    if contours:
+        coords = np.concatenate(contours, axis=0)
+    else:
+        coords = np.empty((0, 2))
+    return coords, offsets
+
+
+def _netcdf_compression():
+    """
+    Return the NetCDF4 compression encoding: Zstandard if the netCDF4 library
+    was built with it, else zlib.
+    """
+    try:
+        import netCDF4
+    except ImportError:
+        return {"zlib": True, "complevel": 2}
+    if getattr(netCDF4, "__has_zstandard_support__", False):
+        return {"compression": "zstd", "complevel": 1}
+    return {"zlib": True, "complevel": 2}
+
+
 def save_matrix_to_netcdf(data, coordinates, time, info, sim_no, filename):
-    import xarray as xr
-    import numpy as np
+    """
+    Save the matrix of one simulation to a compressed NetCDF4 file.
+
+    Parameters
+    ----------
+    data : np.ndarray or xarray.DataArray
+        Matrix with dimensions (time, y, x), or (y, x) for a single time step.
+        Binary masks are stored as they are (uint8); floating-point values
+        (e.g. probabilities) are stored in single precision.
+    coordinates : dict or xarray coordinates
+        Coordinates with 'x' and 'y' (or 'X' and 'Y') arrays.
+    time : array-like
+        Time coordinate of the matrix.
+    info : dict
+        Configuration dictionary with the project name.
+    sim_no : int
+        Simulation number (0-based).
+    filename : str or Path
+        Output NetCDF file.
 
-    # Ensure data is a numpy array
+    Notes
+    -----
+    The variable is written as "prob", in chunks of one time step.
+    """
+    # Ensure data is a numpy array (without copying it)
     if hasattr(data, 'values'):
         data_array = data.values
     else:
-        data_array = np.array(data)
+        data_array = np.asarray(data)
     
     # Handle different coordinate structures
     if isinstance(coordinates, dict):
@@ -320,11 +677,22 @@ def save_matrix_to_netcdf(data, coordinates, time, info, sim_no, filename):
         },
     )
 
-    # Save to NetCDF4 with compression
+    # Save to NetCDF4 with compression, one chunk per date so that a single
+    # mask can be read back without decompressing the whole simulation
     ds.to_netcdf(
         filename,
         format="NETCDF4",
         engine="netcdf4",
-        encoding={"prob": {"zlib": True, "complevel": 2}},
+        encoding={
+            "prob": {
+                **_netcdf_compression(),
+                "chunksizes": (1, y_dim, x_dim),
+                **(
+                    {"dtype": "float32"}
+                    if np.issubdtype(data_array.dtype, np.floating)
+                    else {}
+                ),
+            }
+        },
     )
     return
@@ -20,6 +20,7 @@ from .analysis import (
     dependencies,
     check_dependencies_params,
     fit_var_model,
+    var_bic,
     varfit_OLS,
     ensemble_dt,
     iso_indicators,
@@ -107,6 +108,7 @@ __all__ = [
     "dependencies",
     "check_dependencies_params",
     "fit_var_model",
+    "var_bic",
     "varfit_OLS",
     "ensemble_dt",
     "iso_indicators",
@@ -5,6 +5,7 @@ import time
 import numpy as np
 import pandas as pd
 import scipy.stats as st
+from scipy.linalg import cho_factor, cho_solve
 from statsmodels.tsa.ar_model import AutoReg as AR
 from statsmodels.tsa.vector_ar.var_model import VAR
 from loguru import logger
@@ -107,7 +108,8 @@ def fit_marginal_distribution(df: pd.DataFrame, parameters: dict, verbose: bool
             Parameters for scipy.optimize.minimize:
             
             - 'method' : str
-                e.g., "SLSQP"
+                e.g., "SLSQP" (default) or "L-BFGS-B", which uses the
+                analytical gradient for single Fourier-expanded models
             - 'maxiter' : float
                 Maximum iterations
             - 'ftol' : float
@@ -898,7 +900,11 @@ def check_marginal_params(param: dict):
 
 
 def add_noise_to_array(
-    data: pd.DataFrame, variables: list, remove: bool = False, filter_: str = None
+    data: pd.DataFrame,
+    variables: list,
+    remove: bool = False,
+    filter_: str = None,
+    seed: int = None,
 ):
     """Adds small random noise to the selected variable(s) in a time series for better estimations.
 
@@ -907,6 +913,8 @@ def add_noise_to_array(
         variable (list): Variable(s) to apply noise to.
         remove (bool): If True, rows filtered by `filter_` are removed from the output.
         filter_ (str, optional): Query string to filter the DataFrame before adding noise.
+        seed (int, optional): Seed of the random generator, for reproducible noise.
+            Defaults to None (NumPy's global random state).
 
     Returns:
         pd.DataFrame: DataFrame with noise added to the selected variable(s).
@@ -914,29 +922,42 @@ def add_noise_to_array(
     if isinstance(data, pd.Series):
         data = data.to_frame()
 
-    df_out = data.copy()
+    # Remove duplicate values (the boolean selection already returns a copy)
+    if data.index.is_unique:
+        df_out = data.copy()
+    else:
+        df_out = data[~data.index.duplicated(keep="first")]
 
-    # Remove duplicate values
-    df_out = df_out[~df_out.index.duplicated(keep="first")]
+    # Draw the uniform noise of every variable in a single call. Without a seed
+    # the global state is used, so np.random.seed keeps the noise reproducible
+    if seed is None:
+        uniform_noise = np.random.random((len(df_out), len(variables)))
+    else:
+        rng = np.random.default_rng(seed)
+        uniform_noise = rng.random((len(df_out), len(variables)))
 
     # Multi-variable path (original loop)
-    for var_ in variables:
-        # Only operate on non-NaN values in the filtered subset
-        idx_valid = df_out[var_].dropna().index
-        if len(idx_valid) == 0:
+    for k, var_ in enumerate(variables):
+        # Work on the underlying array: positional masks instead of label lookups
+        values = df_out[var_].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        if not valid.any():
             raise ValueError(
                 f"Input time series for variable '{var_}' is empty after filtering."
             )
-        unique_vals = np.sort(df_out.loc[idx_valid, var_].unique())
+        unique_vals = np.unique(values[valid])
         if len(unique_vals) > 1:
-            increments = st.mode(np.diff(unique_vals))[0]
+            # Most frequent step (the smallest one in case of ties, as st.mode)
+            steps, counts = np.unique(np.diff(unique_vals), return_counts=True)
+            increments = steps[np.argmax(counts)]
         else:
             increments = 1e-6  # fallback small noise if all values are identical
-        noise = np.random.rand(len(idx_valid)) * increments
 
-        # More robust assignment to avoid broadcasting issues
-        values_with_noise = df_out.loc[idx_valid, var_].values + noise
-        df_out.loc[idx_valid, var_] = values_with_noise
+        # NaN rows stay NaN and are removed below. The scaled noise is the only
+        # new array: the values are added to it in place
+        noise = uniform_noise[:, k] * increments
+        noise += values
+        df_out[var_] = noise
 
     # Eliminar todos los NaNs
     df_out = df_out.dropna()
@@ -1449,7 +1470,7 @@ def dependencies(df: pd.DataFrame, param: dict):
         if any(cdf_[var_] >= 1 - 1e-6):
             logger.info(
                 "Casting {} probs of {} next to one (F({}) > 1-1e-6).".format(
-                    str(np.sum(cdf_[var_] >= 1 - 1e-6)), var_, var_
+                    str(np.count_nonzero(cdf_[var_] >= 1 - 1e-6)), var_, var_
                 )
             )
             cdf_.loc[cdf_[var_] >= 1 - 1e-6, var_] = 1 - 1e-6
@@ -1457,7 +1478,7 @@ def dependencies(df: pd.DataFrame, param: dict):
         if any(cdf_[var_] <= 1e-6):
             logger.info(
                 "Casting {} probs of {} next to zero (F({}) < 1e-6).".format(
-                    str(np.sum(cdf_[var_] <= 1e-6)), var_, var_
+                    str(np.count_nonzero(cdf_[var_] <= 1e-6)), var_, var_
                 )
             )
             cdf_.loc[cdf_[var_] <= 1e-6, var_] = 1e-6
@@ -1597,43 +1618,43 @@ def fit_var_model(data: np.ndarray, order: int):
     data_ = data.values.T
     [dim, t] = np.shape(data_)
     t = t - order
-    bic, r2adj = np.zeros(order), []
 
-    par_dt = [list() for i in range(order)]
-    for p in range(1, order + 1):
-        # Create the matrix of input data for p-order
-        y = data_[:, order:]
-        z0 = np.zeros([p * dim, t])
-        for i in range(1, p + 1):
-            z0[(i - 1) * dim : i * dim, :] = data_[:, order - i : -i]
-        z = np.vstack((np.ones(t), z0))
-        # Estimated the parameters using the ordinary least squared error analysis
-        par_dt[p - 1], bic[p - 1], r2a = varfit_OLS(y, z)
-        r2adj.append(r2a)
-        if dim == 1:
-            # Use values only to avoid datetime index issues
-            model = AR(data.iloc[:, 0].values, lags=p)
-            res = model.fit()
-        else:
-            # Use values only to avoid datetime index issues
-            model = VAR(data.values)
-            res = model.fit(maxlags=p)
-        # print(res.summary())
-
-        # Computed using statmodels
-        par_dt[p - 1]["B"] = res.params.T
-        par_dt[p - 1]["U"] = y - np.dot(res.params.T, z)
-        # Estimate de covariance matrix
-        par_dt[p - 1]["Q"] = np.cov(par_dt[p - 1]["U"])
-        bic[p - 1] = res.bic
-        # lag_order = res.k_ar
+    # The BIC of every order is obtained from the moment matrices of the largest
+    # one; the full fit is only done for the selected order
+    bic = var_bic(data_, order)
+    id_ = np.argmin(bic)
+    p = id_ + 1
+
+    # Create the matrix of input data for p-order
+    y = data_[:, order:]
+    z0 = np.zeros([p * dim, t])
+    for i in range(1, p + 1):
+        z0[(i - 1) * dim : i * dim, :] = data_[:, order - i : -i]
+    z = np.vstack((np.ones(t), z0))
+    # Estimated the parameters using the ordinary least squared error analysis
+    par_dt, _, r2adj = varfit_OLS(y, z)
+    if dim == 1:
+        # Use values only to avoid datetime index issues
+        model = AR(data.iloc[:, 0].values, lags=p)
+        res = model.fit()
+    else:
+        # Use values only to avoid datetime index issues
+        model = VAR(data.values)
+        res = model.fit(maxlags=p)
+    # print(res.summary())
+
+    # Computed using statmodels
+    par_dt["B"] = res.params.T
+    par_dt["U"] = y - np.dot(res.params.T, z)
+    # Estimate de covariance matrix
+    par_dt["Q"] = np.cov(par_dt["U"])
+    bic[id_] = res.bic
+    # lag_order = res.k_ar
 
     # Select the minimum BIC and return the parameter associated to it
-    id_ = np.argmin(bic)
-    par_dt = par_dt[id_]
     par_dt["id"] = int(id_)
     par_dt["bic"] = [float(bicValue) for bicValue in bic]
-    par_dt["R2adj"] = r2adj[par_dt["id"]]
+    par_dt["R2adj"] = r2adj
     logger.info(
         "Minimum BIC ("
         + str(par_dt["bic"][par_dt["id"]])
@@ -1652,6 +1673,100 @@ def fit_var_model(data: np.ndarray, order: int):
     return par_dt
 
 
+def var_bic(data: np.ndarray, order: int):
+    """Computes the BIC of the AR/VAR(p) models for p = 1, ..., order.
+
+    Every p-order model is fitted by ordinary least squares over its own sample
+    (from the p-th observation on) with a constant term, as statsmodels does, so
+    the values are equal to the BIC given by AutoReg/VAR. The moment matrices
+    are computed once over the sample of the largest order and every p-order
+    model adds the few observations that are only in its sample.
+
+    Args:
+        * data (np.ndarray): normalize data with its probability model (dim x time)
+        * order (int): maximum order (p) of the VAR model
+
+    Returns:
+        * bic (np.ndarray): the BIC of the models of order 1 to order
+    """
+    dim, nobs_ = np.shape(data)
+    x = data.T
+
+    # Moment matrices over the common sample of the largest order, from the lagged
+    # cross-products of the series (the matrix of lagged regressors is not built)
+    k_max = 1 + order * dim
+    moments = _lagged_moments(x, order)
+    zz, zy = np.empty([k_max, k_max]), np.empty([k_max, dim])
+    zz[0, 0] = nobs_ - order
+    cumsum = np.vstack((np.zeros(dim), np.cumsum(x, axis=0)))
+    lags = np.arange(1, order + 1)
+    zz[0, 1:] = (cumsum[nobs_ - lags] - cumsum[order - lags]).ravel()
+    zz[1:, 0] = zz[0, 1:]
+    zz[1:, 1:] = moments[1:, 1:].transpose(0, 2, 1, 3).reshape(k_max - 1, k_max - 1)
+    zy[0] = cumsum[nobs_] - cumsum[order]
+    zy[1:] = moments[1:, 0].reshape(k_max - 1, dim)
+    yy = moments[0, 0]
+
+    # Regressors of the first time steps, only in the sample of the lower orders
+    z = np.full([order, k_max], np.nan)
+    z[:, 0] = 1
+    for i in range(1, order):
+        z[i:, 1 + (i - 1) * dim : 1 + i * dim] = x[: order - i]
+
+    bic = np.zeros(order)
+    for p in range(1, order + 1):
+        k = 1 + p * dim
+        z_p, x_p = z[p:order, :k], x[p:order]
+        zz_p = zz[:k, :k] + np.dot(z_p.T, z_p)
+        zy_p = zy[:k] + np.dot(z_p.T, x_p)
+        ssr = yy + np.dot(x_p.T, x_p) - np.dot(zy_p.T, cho_solve(cho_factor(zz_p), zy_p))
+
+        nobs = nobs_ - p
+        if dim == 1:
+            llf = -nobs / 2 * (np.log(2 * np.pi) + np.log(ssr[0, 0] / nobs) + 1)
+            bic[p - 1] = -2 * llf + np.log(nobs) * (k + 1)
+        else:
+            bic[p - 1] = np.linalg.slogdet(ssr / nobs)[1] + np.log(nobs) / nobs * (
+                p * dim**2 + dim
+            )
+
+    return bic
+
+
+def _lagged_moments(x: np.ndarray, order: int):
+    """Computes the sums of x(t-i) x(t-j)^T over t = order, ..., nobs - 1 for all the
+    lags i, j = 0, ..., order
+
+    Every sum is the cross-product of the whole series at lag j - i minus the few
+    products at its head and tail that are out of the sample, so the cost is
+    linear in the number of lags instead of quadratic.
+
+    Args:
+        * x (np.ndarray): the data (time x dim)
+        * order (int): maximum lag
+
+    Returns:
+        * moments (np.ndarray): the sums (order + 1 x order + 1 x dim x dim)
+    """
+    nobs, dim = x.shape
+    moments = np.empty([order + 1, order + 1, dim, dim])
+    for lag in range(order + 1):
+        full = np.dot(x[lag:].T, x[: nobs - lag])
+        # Cumulative products x(s) x(s - lag)^T of the first time steps (s < order)
+        # and of the last ones (s >= nobs - order), from the end
+        s = np.arange(lag, order)
+        head = np.zeros([order - lag + 1, dim, dim])
+        head[1:] = np.cumsum(x[s, :, np.newaxis] * x[s - lag, np.newaxis, :], axis=0)
+        s = np.arange(nobs - 1, nobs - order + lag - 1, -1)
+        tail = np.zeros([order - lag + 1, dim, dim])
+        tail[1:] = np.cumsum(x[s, :, np.newaxis] * x[s - lag, np.newaxis, :], axis=0)
+        i = np.arange(order - lag + 1)
+        moments[i, i + lag] = full - head[order - lag - i] - tail[i]
+        moments[i + lag, i] = np.swapaxes(moments[i, i + lag], 1, 2)
+
+    return moments
+
+
 def varfit_OLS(y, z):
     """Estimates the parameters of VAR using the RMSE described in Lutkepohl (ecs. 3.2.1 and 3.2.10)
 
@@ -1668,8 +1783,9 @@ def varfit_OLS(y, z):
     df = dict()
     m1, m2 = np.dot(y, z.T), np.dot(z, z.T)
 
-    # Estimate the parameters
-    df["B"] = np.dot(m1, np.linalg.inv(m2))
+    # Estimate the parameters. ZZ' is symmetric positive definite, so the normal
+    # equations are solved by Cholesky instead of inverting it
+    df["B"] = cho_solve(cho_factor(m2), m1.T).T
 
     nel, df["dim"] = np.shape(df["B"].T)
     df["U"] = y - np.dot(df["B"], z)
@@ -1,8 +1,10 @@
 import numpy as np
 import pandas as pd
-from environmentaltools.common import utils
-from scipy.interpolate import Rbf, griddata
+from environmentaltools.common import save, utils
+from scipy.interpolate import Rbf, RBFInterpolator, griddata
+from scipy.spatial import cKDTree
 from sklearn import preprocessing
+from sklearn.cluster import kmeans_plusplus
 from sklearn.discriminant_analysis import QuadraticDiscriminantAnalysis
 from sklearn.ensemble import AdaBoostClassifier, RandomForestClassifier
 from sklearn.gaussian_process import GaussianProcessClassifier, GaussianProcessRegressor
@@ -13,6 +15,17 @@ from sklearn.neural_network import MLPClassifier
 from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier
 
+# Names of the legacy Rbf functions in RBFInterpolator
+_RBF_KERNELS = {
+    "multiquadric": "multiquadric",
+    "inverse": "inverse_multiquadric",
+    "gaussian": "gaussian",
+    "linear": "linear",
+    "cubic": "cubic",
+    "quintic": "quintic",
+    "thin_plate": "thin_plate_spline",
+}
+
 
 def class_storm_seasons(df_vars_ciclos, type_: str = "WSSF"):
     """Splits the data into seasons.
@@ -99,7 +112,9 @@ def classification(cases, cases_sha, data, method, notrain):
 
 
 
-def maximum_dissimilarity_algorithm(data, variables, n_cases, mvar, file_name="cases"):
+def maximum_dissimilarity_algorithm(
+    data, variables, n_cases, mvar, file_name="cases", dtype=np.float64, approximate=False
+):
     """
     Implements the Maximum Dissimilarity Algorithm (Camus et al. 2011).
 
@@ -108,73 +123,137 @@ def maximum_dissimilarity_algorithm(data, variables, n_cases, mvar, file_name="c
         variables (list): Names of variables to use for dissimilarity.
         n_cases (int): Number of representative cases to select.
         mvar (str): Name of the main variable which determines the first subset.
-        file_name (str): Name of the file to save. Defaults to 'cases'.
+        file_name (str): Name of the file to save. Names ending in '.parquet' are
+            saved in binary Parquet (full precision), else CSV. Defaults to 'cases'.
+        dtype (np.dtype): Precision of the distances. np.float32 halves the memory
+            traffic of every iteration, but rounding may change some of the
+            selected cases. Defaults to np.float64.
+        approximate (bool): If True, the cases are drawn with the k-means++ seeding
+            (every case with probability proportional to its squared distance to
+            the cases already chosen) instead of taking the farthest one. The
+            selection is spread out but random: it covers the extremes less than
+            the exact MDA and does not start from the maximum of mvar.
+            Defaults to False.
 
     Returns:
         pd.DataFrame: The representative values of the variables.
     """
 
-    datan = normalize(data, variables)
+    # Only the variables used by the algorithm are normalized (and copied)
+    datan = normalize(data[list(dict.fromkeys(variables + [mvar]))], variables)
     n = datan.shape[0]
     ind_ = []
 
-    # Convert to numpy array for efficiency
-    X = datan[variables].values
+    # Store every variable as a contiguous row, so the distances from one point
+    # to all others are accumulated over contiguous arrays in place. The squared
+    # distances are used: they give the same ordering without the square root
+    columns = np.ascontiguousarray(datan[variables].to_numpy(dtype=float).T)
     # If there are circular variables, adjust them
-    is_circ = [v.lower().startswith('d') for v in variables]
-    if any(is_circ):
-        for j, circ in enumerate(is_circ):
-            if circ:
-                X[:, j] = np.mod(X[:, j], 2)
-
-    # Helper function to compute distances from one point to all others using vectorized operations
-    def compute_distances_to_all(point_idx):
-        """Compute distances from point_idx to all other points using vectorized operations."""
-        distances = np.zeros(n)
-        point_data = X[point_idx]
-        
-        for k, is_circular in enumerate(is_circ):
-            if is_circular:
-                diff = np.abs(X[:, k] - point_data[k])
-                distances += np.minimum(diff, 2 - diff) ** 2
+    is_circ = np.array([v.lower().startswith('d') for v in variables])
+    for j in np.flatnonzero(is_circ):
+        np.mod(columns[j], 2, out=columns[j])
+    columns = columns.astype(dtype, copy=False)
+    if approximate:
+        ind_ = list(datan.index[_kmeans_plusplus_positions(columns, is_circ, n_cases)])
+    else:
+        distances, buffer, wrapped = (np.empty(n, dtype=dtype) for _ in range(3))
+
+        def compute_distances(point_idx, idx=None):
+            """Compute squared distances from point_idx to all other points (or to the
+            points idx)."""
+            if idx is None:
+                cols, m = columns, n
             else:
-                distances += (X[:, k] - point_data[k]) ** 2
-        
-        distances = np.sqrt(distances)
-        distances[point_idx] = -np.inf  # to avoid self-selection
-        return distances
-
-    # Iterative selection
-    # First point: maximum of the main variable
-    first_idx = datan.loc[:, mvar].idxmax()
-    ind_.append(first_idx)
-    sel_pos = [datan.index.get_loc(first_idx)]
-
-    # Initialize vector of minimum distances
-    min_dist = compute_distances_to_all(sel_pos[0])
-
-    for _ in range(1, n_cases):
-        next_pos = np.argmax(min_dist)
-        ind_.append(datan.index[next_pos])
-        sel_pos.append(next_pos)
-        
-        # Compute distances from the new point to all others
-        new_distances = compute_distances_to_all(next_pos)
-        
-        # Update minimum distances
-        min_dist = np.minimum(min_dist, new_distances)
-        
-        # Mark selected points as unavailable
-        for pos in sel_pos:
-            min_dist[pos] = -np.inf
+                cols, m = columns[:, idx], len(idx)
+            # The first variable is written straight into the output, the others are
+            # added to it
+            for k, (column, is_circular) in enumerate(zip(cols, is_circ)):
+                out = distances[:m] if k == 0 else buffer[:m]
+                np.subtract(column, columns[k, point_idx], out=out)
+                if is_circular:
+                    np.abs(out, out=out)
+                    np.subtract(2, out, out=wrapped[:m])
+                    np.minimum(out, wrapped[:m], out=out)
+                np.square(out, out=out)
+                if k:
+                    np.add(distances[:m], out, out=distances[:m])
+
+            return distances[:m]
+
+        # Iterative selection
+        # First point: maximum of the main variable
+        first_idx = datan.loc[:, mvar].idxmax()
+        ind_.append(first_idx)
+        sel_pos = [datan.index.get_loc(first_idx)]
+
+        # Initialize vector of minimum distances
+        min_dist = compute_distances(sel_pos[0]).copy()
+        min_dist[sel_pos[0]] = -np.inf  # to avoid self-selection
+
+        # The radius is widened to cover the rounding of the distances
+        tree, margin = None, 1 + 100 * np.finfo(dtype).eps
+        for _ in range(1, n_cases):
+            next_pos = np.argmax(min_dist)
+            radius = min_dist[next_pos]
+            ind_.append(datan.index[next_pos])
+            sel_pos.append(next_pos)
+
+            # Update the minimum distances in place with the distances to the new
+            # point. Selected points keep -inf (their own distance is set to -inf and
+            # the minimum never increases), so they are not selected again.
+            # The new point has the largest minimum distance, so only the points
+            # closer to it than that radius can change. Once they are few, they are
+            # found with a k-d tree (periodic along the circular variables) instead
+            # of computing the distances to all the points
+            if tree is None:
+                np.minimum(min_dist, compute_distances(next_pos), out=min_dist)
+                if np.count_nonzero(distances <= radius) < n // 64:
+                    # The tree requires the periodic coordinates in [0, 2)
+                    tree_data = columns.T.astype(float)
+                    tree_data[:, is_circ] %= 2
+                    tree = cKDTree(tree_data, boxsize=np.where(is_circ, 2.0, 0.0))
+            else:
+                idx = tree.query_ball_point(
+                    tree_data[next_pos], np.sqrt(radius) * margin, return_sorted=False
+                )
+                idx = np.asarray(idx, dtype=np.intp)
+                min_dist[idx] = np.minimum(min_dist[idx], compute_distances(next_pos, idx))
+            min_dist[next_pos] = -np.inf
 
 
     cases = data.loc[ind_, :].copy()
     cases.insert(0, 'id', range(1, len(cases) + 1))
-    cases.to_csv(file_name, index=False)
+    if str(file_name).endswith(".parquet"):
+        save.to_parquet(cases.reset_index(drop=True), file_name)
+    else:
+        cases.to_csv(file_name, index=False)
     return cases
 
 
+def _kmeans_plusplus_positions(columns, is_circ, n_cases):
+    """Positions of n_cases points drawn with the k-means++ seeding.
+
+    Args:
+        columns (np.ndarray): Normalized variables, one per row (variables x n).
+        is_circ (np.ndarray): Mask of the circular variables, in [0, 2).
+        n_cases (int): Number of points to draw.
+
+    Returns:
+        np.ndarray: Positions of the selected points.
+    """
+    # The circular variables are placed on a circle of circumference 2, so the
+    # (chord) distances match the periodic ones for close points
+    coords = []
+    for column, is_circular in zip(columns.astype(float), is_circ):
+        if is_circular:
+            coords.extend([np.cos(np.pi * column) / np.pi, np.sin(np.pi * column) / np.pi])
+        else:
+            coords.append(column)
+
+    _, positions = kmeans_plusplus(np.column_stack(coords), n_clusters=n_cases, random_state=0, n_local_trials=1)
+    return positions
+
+
 def reconstruction(
     cases_deep,
     data_deep,
@@ -188,7 +267,9 @@ def reconstruction(
     optimizer="local",
     eps=1.0,
     scale_data=False,
-    scaler_method="StandardScaler"):
+    scaler_method="StandardScaler",
+    neighbors=None,
+    gpu=False):
     """
     Reconstructs deep water variables from shallow water data using regression methods.
 
@@ -208,6 +289,10 @@ def reconstruction(
         optimize (bool, optional): Whether to optimize RBF epsilon. Defaults to True.
         scale_data (bool, optional): If False, data will not be scaled. Defaults to True.
         scaler_method (str, optional): Scaling method for normalization. Defaults to 'StandardScaler'.
+        neighbors (int, optional): If given, the RBF methods are solved locally with
+            this number of nearest cases (RBFInterpolator). Defaults to None.
+        gpu (bool, optional): If True and CuPy is installed, the RBFInterpolator of
+            the neighbors path runs on the GPU. Defaults to False.
 
     Returns:
         pd.DataFrame: Reconstructed deep water data with variables in recons_vars
@@ -223,10 +308,9 @@ def reconstruction(
         ... )
     """
 
-    # Extract base variables from all sets
-    base_train = cases_deep[base_vars].copy()  # Representative cases (training)
-    base_pred = data_deep[base_vars].copy()    # Data to reconstruct (prediction)
-    target_train = cases_shallow[recons_vars].copy()  # Variables to reconstruct (training)
+    # Extract base variables from all sets (selecting the columns already copies)
+    base_train = cases_deep[base_vars]  # Representative cases (training)
+    base_pred = data_deep[base_vars]    # Data to reconstruct (prediction)
 
     # Adjust num to 80% of training data size if None or out of bounds
     n_train = base_train.shape[0]
@@ -242,22 +326,27 @@ def reconstruction(
         base_train_norm, _ = utils.scaler(base_train, scale=base_scaler, method=scaler_method)
         base_pred_norm, _ = utils.scaler(base_pred, scale=base_scaler, method=scaler_method)
     else:
-        base_train_norm = target_train.values if hasattr(target_train, 'values') else target_train
-        base_train_norm = base_train.values if hasattr(base_train, 'values') else base_train
-        base_pred_norm = base_pred.values if hasattr(base_pred, 'values') else base_pred
+        # Contiguous float arrays, extracted once for all the target variables
+        base_train_norm = np.ascontiguousarray(base_train.to_numpy(dtype=float))
+        base_pred_norm = np.ascontiguousarray(base_pred.to_numpy(dtype=float))
 
     # Initialize output DataFrame
     data_reconstructed = pd.DataFrame(index=index, columns=recons_vars)
 
-    # Reconstruir cada variable objetivo de forma independiente
+    # The griddata methods reconstruct all the target variables in one call, which
+    # triangulates the base points once; the other methods fit one variable at a time
+    if method in ["linear", "nearest", "cubic"]:
+        groups = [list(recons_vars)]
+    else:
+        groups = [[target_var] for target_var in recons_vars]
 
-    for target_var in recons_vars:
+    for targets in groups:
         # Asegurar que target_train sea DataFrame (2D) para evitar errores en sklearn
-        target_col = cases_shallow[[target_var]].copy() if target_var in cases_shallow else pd.DataFrame(cases_shallow[target_var].copy())
+        target_col = cases_shallow[targets]
         if scale_data:
             target_train_norm, target_scaler = utils.scaler(target_col, method=scaler_method)
         else:
-            target_train_norm = target_col.values if hasattr(target_col, 'values') else target_col
+            target_train_norm = np.ascontiguousarray(target_col.to_numpy(dtype=float))
 
         # Regresión en espacio normalizado o no
         target_pred_norm = regression(
@@ -270,25 +359,29 @@ def reconstruction(
             optimize=optimize,
             optimizer=optimizer,
             eps=eps,
+            neighbors=neighbors,
+            gpu=gpu,
         )
+        target_pred_norm = np.reshape(target_pred_norm, (-1, len(targets)))
 
         # Desnormalizar predicciones si corresponde
         if scale_data:
             target_pred, _ = utils.scaler(
-                target_pred_norm.reshape(-1, 1),
+                target_pred_norm,
                 transform=False,
                 scale=target_scaler,
                 method=scaler_method,
             )
-            data_reconstructed[target_var] = target_pred.flatten()
+            data_reconstructed[targets] = target_pred
         else:
-            data_reconstructed[target_var] = target_pred_norm.flatten()
+            data_reconstructed[targets] = target_pred_norm
 
     return data_reconstructed
 
 
 def regression(
-    base_train, target_train, base_pred, method="rbf-multiquadric", num=100, smooth=1, optimize=True, eps=1, optimizer="local"
+    base_train, target_train, base_pred, method="rbf-multiquadric", num=100, smooth=1, optimize=True, eps=1, optimizer="local",
+    neighbors=None, gpu=False,
 ):
     """Performs regression using various interpolation and machine learning methods.
     
@@ -323,6 +416,16 @@ def regression(
         Manual epsilon parameter for RBF (used if optimize=False). Defaults to 1.
     optimizer : str, optional
         Optimization method ('local' or other). Defaults to 'local'.
+    neighbors : int, optional
+        If given, the RBF is evaluated with scipy's RBFInterpolator solving a local
+        system with this number of nearest training points around every
+        prediction point, instead of the global system of the legacy Rbf. The
+        shape parameter is converted (RBFInterpolator uses 1 / eps). Defaults to
+        None.
+    gpu : bool, optional
+        If True and CuPy is installed, the RBFInterpolator (neighbors given) is
+        built and evaluated on the GPU, by chunks of 100000 prediction points.
+        Defaults to False.
     
     Returns
     -------
@@ -400,11 +503,32 @@ def regression(
             else:
                 epsilon = eps
 
-            coords = [base_train[:, i] for i in range(base_train.shape[1])]
-            coords.append(target_train)
-            rbf_ = Rbf(*coords, function=rbf_function, smooth=smooth, epsilon=epsilon)
-            pred_coords = [base_pred[:, i] for i in range(base_pred.shape[1])]
-            predictions = rbf_(*pred_coords)
+            if neighbors is None:
+                coords = [base_train[:, i] for i in range(base_train.shape[1])]
+                coords.append(target_train)
+                rbf_ = Rbf(*coords, function=rbf_function, smooth=smooth, epsilon=epsilon)
+                # Evaluated by chunks of prediction points (from squared distances
+                # for the multiquadric, inverse and gaussian kernels)
+                predictions = utils.rbf_evaluate(rbf_, base_pred)
+            else:
+                interpolator, xp = _rbf_backend(gpu)
+                rbf_ = interpolator(
+                    xp.asarray(base_train),
+                    xp.asarray(target_train),
+                    neighbors=min(neighbors, base_train.shape[0]),
+                    smoothing=smooth,
+                    kernel=_RBF_KERNELS[rbf_function],
+                    epsilon=1 / epsilon,
+                )
+                to_numpy = getattr(xp, "asnumpy", np.asarray)
+                # At least one (possibly empty) chunk, so that no prediction
+                # points give an empty array
+                predictions = np.concatenate(
+                    [
+                        to_numpy(rbf_(xp.asarray(base_pred[i : i + 100000])))
+                        for i in range(0, max(len(base_pred), 1), 100000)
+                    ]
+                )
             
         # Method 3: Gaussian Process methods
         elif method.startswith("gp-"):
@@ -437,8 +561,25 @@ def regression(
         except:
             # Último recurso: devolver la media
             print("Warning: Linear interpolation also failed, returning mean values")
-            return np.full(len(base_pred), np.mean(target_train))
+            return np.full(
+                (len(base_pred),) + np.shape(target_train)[1:],
+                np.mean(target_train, axis=0),
+            )
+
+
 
+def _rbf_backend(gpu=False):
+    """Return (RBFInterpolator, array module): CuPy's if gpu is True and cupy is
+    installed, else SciPy's and NumPy."""
+    if gpu:
+        try:
+            import cupy
+            from cupyx.scipy.interpolate import RBFInterpolator as CupyRBFInterpolator
+        except ImportError:
+            print("Warning: cupy is not installed, the RBF is evaluated on the CPU")
+        else:
+            return CupyRBFInterpolator, cupy
+    return RBFInterpolator, np
 
 
 def normalize(data, variables, circular=False):
@@ -455,10 +596,16 @@ def normalize(data, variables, circular=False):
     for i in variables:
         if i.startswith("Dir"):
             circular = True
-        
+
+        # Normalize a copy of the column in place
+        values = data[i].to_numpy(dtype=float, copy=True)
         if circular:
-            datan[i] = np.deg2rad(data[i]) / np.pi
+            np.deg2rad(values, out=values)
+            values /= np.pi
         else:
-            datan[i] = (data[i] - data[i].min()) / (data[i].max() - data[i].min())
+            min_, max_ = np.nanmin(values), np.nanmax(values)
+            values -= min_
+            values /= max_ - min_
+        datan[i] = values
 
     return datan
\ No newline at end of file
@@ -6,8 +6,15 @@ import pandas as pd
 import scipy.stats as st
 from loguru import logger
 from environmentaltools.common import utils, read, save
+from scipy import special
 from scipy.integrate import quad
-from scipy.optimize import differential_evolution, dual_annealing, minimize, shgo
+from scipy.optimize import (
+    differential_evolution,
+    dual_annealing,
+    minimize,
+    minimize_scalar,
+    shgo,
+)
 from sklearn import preprocessing
 
 warnings.filterwarnings("ignore")
@@ -703,6 +710,18 @@ def fourier_expansion(data: pd.DataFrame, par: list, param: dict):
                 nllf[imode] = 1e10
                 par[imode] = param["par"]
 
+        # ------------------------------------------------------------------------------
+        # The Fourier basis of every mode is the leading block of the basis of the
+        # largest mode, so it is computed once for all the fits
+        # ------------------------------------------------------------------------------
+        t_expans = None
+        if param["basis_function"]["method"] in [
+            "trigonometric",
+            "sinusoidal",
+            "modified",
+        ]:
+            t_expans = params_t_expansion(np.max(mode), param, data["n"])
+
         # ------------------------------------------------------------------------------
         # Expand in Fourier Series and fit the parameters
         # ------------------------------------------------------------------------------
@@ -715,11 +734,11 @@ def fourier_expansion(data: pd.DataFrame, par: list, param: dict):
             logger.info("Mode " + str(imode) + " non-stationary")
             if ind_mode == 0:
                 par[imode], nllf[imode] = fit(
-                    data, param, par0[imode], imode, nllf[imode]
+                    data, param, par0[imode], imode, nllf[imode], t_expans
                 )
             else:
                 par[imode], nllf[imode] = fit(
-                    data, param, par0[imode], imode, nllf[comp_]
+                    data, param, par0[imode], imode, nllf[comp_], t_expans
                 )
     else:
         mode = [tuple(param["initial_parameters"]["mode"])]
@@ -972,7 +991,14 @@ def matching_lower_bound(par: dict):
 #     return constraints_
 
 
-def fit(df_: pd.DataFrame, param_: dict, par0: list, mode_: list, ref: int):
+def fit(
+    df_: pd.DataFrame,
+    param_: dict,
+    par0: list,
+    mode_: list,
+    ref: int,
+    t_expans_: np.ndarray = None,
+):
     """Fits the data to the given probability model
 
     Args:
@@ -981,6 +1007,8 @@ def fit(df_: pd.DataFrame, param_: dict, par0: list, mode_: list, ref: int):
         * par0 (list): the guess parameters of the probability model
         * mode (list): components of the current mode
         * ref (int): log-likelihood value of the reference order
+        * t_expans_ (np.ndarray, optional): Fourier basis of the same or a larger mode.
+          Computed from the mode if not given
 
     Returns:
         * res['x'] (list): the fit parameters
@@ -1001,7 +1029,10 @@ def fit(df_: pd.DataFrame, param_: dict, par0: list, mode_: list, ref: int):
 
     global df, param, mode, t_expans
     df, param, mode = df_, param_, mode_
-    t_expans = params_t_expansion(mode, param, df["n"])
+    if t_expans_ is None:
+        t_expans = params_t_expansion(mode, param, df["n"])
+    else:
+        t_expans = t_expans_
 
     # ----------------------------------------------------------------------------------
     # For assuring that local minimum of previous optimizations not be accepted during
@@ -1049,6 +1080,34 @@ def fit(df_: pd.DataFrame, param_: dict, par0: list, mode_: list, ref: int):
                     "maxiter": param["optimization"]["maxiter"],
                 },
             )
+        elif param["optimization"]["method"] == "L-BFGS-B":
+            # The ftol of L-BFGS-B is relative to the NLLF, the one of SLSQP absolute
+            nllf0 = negative_log_likelihood(par0, df, mode, param, t_expans)
+            options = {
+                "ftol": param["optimization"]["ftol"] / np.maximum(np.abs(nllf0), 1),
+                "maxiter": int(param["optimization"]["maxiter"]),
+            }
+            if _single_model_fit(param):
+                # Analytical gradient through the basis
+                res[j] = minimize(
+                    _single_model_nllf_jac,
+                    par0,
+                    args=(df[param["var"]].to_numpy(), mode, param, t_expans),
+                    jac=True,
+                    bounds=bnds,
+                    method="L-BFGS-B",
+                    options=options,
+                )
+            else:
+                options["eps"] = param["optimization"]["eps"]
+                res[j] = minimize(
+                    negative_log_likelihood,
+                    par0,
+                    args=(df, mode, param, t_expans),
+                    bounds=bnds,
+                    method="L-BFGS-B",
+                    options=options,
+                )
         elif param["optimization"]["method"] == "dual_annealing":
             res[j] = dual_annealing(
                 negative_log_likelihood,
@@ -1078,6 +1137,10 @@ def fit(df_: pd.DataFrame, param_: dict, par0: list, mode_: list, ref: int):
         elif res[j]["message"] == "Iteration limit reached":
             nllf_ = res[j]["fun"]
             fixed = res[j]["x"]
+        elif "TOTAL NO. OF" in res[j]["message"]:
+            # Iteration or evaluation limit of L-BFGS-B
+            nllf_ = res[j]["fun"]
+            fixed = res[j]["x"]
         elif res[j]["message"] == "Positive directional derivative for linesearch":
             nllf_ = res[j]["fun"]
             fixed = res[j]["x"]
@@ -1195,6 +1258,15 @@ def negative_log_likelihood(par, df, imod, param, t_expans):
     ...     method='L-BFGS-B'
     ... )
     """
+    if _single_model_fit(param):
+        return _single_model_nllf(
+            np.asarray(par, dtype=float),
+            df[param["var"]].to_numpy(),
+            imod,
+            param,
+            t_expans,
+        )
+
     # ----------------------------------------------------------------------------------
     # Obtaining the parameters
     # ----------------------------------------------------------------------------------
@@ -1553,6 +1625,172 @@ def negative_log_likelihood(par, df, imod, param, t_expans):
     return nllf
 
 
+def _single_model_fit(param: dict):
+    """Checks whether the fit is a single probability model with a Fourier basis
+
+    Args:
+        * param (dict): the parameters of the analysis
+
+    Returns:
+        * bool: True if the plain-array NLLF can be used
+    """
+    return (
+        (param["no_fun"] == 1)
+        & (not param["reduction"])
+        & (not param["constraints"])
+        & (param["basis_function"]["method"] in ["trigonometric", "sinusoidal", "modified"])
+    )
+
+
+def _single_model_nllf(par, x, imod, param, t_expans):
+    """Computes the NLLF of a single Fourier-expanded probability model
+
+    Same result as the general path of negative_log_likelihood for one probability
+    model, but the parameters are expanded on plain arrays so that no DataFrame is
+    copied at each evaluation of the optimizer.
+
+    Args:
+        * par (np.ndarray): the parameters of the probability model
+        * x (np.ndarray): the values of the variable
+        * imod (list): combination of modes for fitting
+        * param (dict): the parameters of the analysis
+        * t_expans (np.ndarray): the variability of the modes
+
+    Returns:
+        * nllf (float): the value of the negative log-likelihood function
+    """
+    if np.isnan(par).any():
+        return 1e10
+
+    pars_fourier = 1
+    if param["basis_function"]["method"] in ["trigonometric", "modified"]:
+        pars_fourier = 2
+    no_terms = imod[0] * pars_fourier
+    basis = t_expans[0:no_terms, :]
+
+    # Each parameter is a constant plus its Fourier terms
+    args = [
+        par[k * (no_terms + 1)] + par[k * (no_terms + 1) + 1 : (k + 1) * (no_terms + 1)] @ basis
+        for k in range(int(param["no_param"][0]))
+    ]
+    lpdf = param["fun"][0].logpdf(x, *args)
+
+    if np.isnan(lpdf).any() | np.isinf(lpdf).any() | (lpdf.size == 1):
+        return 1e10
+    return -np.sum(lpdf * param["weighted"]["values"])
+
+
+def _single_model_nllf_jac(par, x, imod, param, t_expans):
+    """Computes the NLLF of a single Fourier-expanded model and its gradient
+
+    Every parameter of the probability model is linear in its coefficients through
+    the basis, so the gradient is the basis times the derivative of the log-pdf with
+    respect to the parameter at each sample. Closed-form derivatives are used for
+    the models in _LOGPDF_GRADIENTS, and centered differences on the parameters
+    (not on the coefficients) otherwise.
+
+    Args:
+        * par (np.ndarray): the parameters of the probability model
+        * x (np.ndarray): the values of the variable
+        * imod (list): combination of modes for fitting
+        * param (dict): the parameters of the analysis
+        * t_expans (np.ndarray): the variability of the modes
+
+    Returns:
+        * nllf (float): the value of the negative log-likelihood function
+        * jac (np.ndarray): the gradient of the nllf with respect to par
+    """
+    jac = np.zeros(len(par))
+    if np.isnan(par).any():
+        return 1e10, jac
+
+    pars_fourier = 1
+    if param["basis_function"]["method"] in ["trigonometric", "modified"]:
+        pars_fourier = 2
+    no_terms = imod[0] * pars_fourier
+    basis = t_expans[0:no_terms, :]
+
+    args = [
+        par[k * (no_terms + 1)] + par[k * (no_terms + 1) + 1 : (k + 1) * (no_terms + 1)] @ basis
+        for k in range(int(param["no_param"][0]))
+    ]
+    lpdf = param["fun"][0].logpdf(x, *args)
+    if np.isnan(lpdf).any() | np.isinf(lpdf).any() | (lpdf.size == 1):
+        return 1e10, jac
+
+    if param["fun"][0].name in _LOGPDF_GRADIENTS:
+        dlpdf = _LOGPDF_GRADIENTS[param["fun"][0].name](x, *args)
+    else:
+        dlpdf = []
+        for k, arg in enumerate(args):
+            h = 1e-6 * np.maximum(1, np.abs(arg))
+            args_up, args_down = list(args), list(args)
+            args_up[k], args_down[k] = arg + h, arg - h
+            dlpdf.append(
+                (param["fun"][0].logpdf(x, *args_up) - param["fun"][0].logpdf(x, *args_down))
+                / (2 * h)
+            )
+
+    weights = param["weighted"]["values"]
+    for k, dlpdf_k in enumerate(dlpdf):
+        dnllf = -dlpdf_k * weights
+        jac[k * (no_terms + 1)] = np.sum(dnllf)
+        jac[k * (no_terms + 1) + 1 : (k + 1) * (no_terms + 1)] = basis @ dnllf
+    return -np.sum(lpdf * weights), jac
+
+
+def _norm_logpdf_gradient(x, loc, scale):
+    """Derivatives of the normal log-pdf with respect to loc and scale"""
+    z = (x - loc) / scale
+    return [z / scale, (z**2 - 1) / scale]
+
+
+def _lognorm_logpdf_gradient(x, s, loc, scale):
+    """Derivatives of the lognormal log-pdf with respect to s, loc and scale"""
+    y = x - loc
+    u = np.log(y / scale)
+    return [u**2 / s**3 - 1 / s, (u / s**2 + 1) / y, u / (s**2 * scale)]
+
+
+def _weibull_logpdf_gradient(z, c):
+    """Derivatives of the Weibull log-pdf with respect to c and the reduced variable
+
+    Args:
+        * z (np.ndarray): the reduced variable, positive in the support
+        * c (np.ndarray): the shape parameter
+
+    Returns:
+        * dc, dz (np.ndarray): the derivatives with respect to c and z
+    """
+    zc = z**c
+    dc = 1 / c + np.log(z) * (1 - zc)
+    dz = (c - 1) / z - c * zc / z
+    return dc, dz
+
+
+def _weibull_min_logpdf_gradient(x, c, loc, scale):
+    """Derivatives of the weibull_min log-pdf with respect to c, loc and scale"""
+    z = (x - loc) / scale
+    dc, dz = _weibull_logpdf_gradient(z, c)
+    return [dc, -dz / scale, -(dz * z + 1) / scale]
+
+
+def _weibull_max_logpdf_gradient(x, c, loc, scale):
+    """Derivatives of the weibull_max log-pdf with respect to c, loc and scale"""
+    z = (loc - x) / scale
+    dc, dz = _weibull_logpdf_gradient(z, c)
+    return [dc, dz / scale, -(dz * z + 1) / scale]
+
+
+# Closed-form derivatives of the log-pdf with respect to the scipy parameters
+_LOGPDF_GRADIENTS = {
+    "norm": _norm_logpdf_gradient,
+    "lognorm": _lognorm_logpdf_gradient,
+    "weibull_min": _weibull_min_logpdf_gradient,
+    "weibull_max": _weibull_max_logpdf_gradient,
+}
+
+
 def get_params(df: pd.DataFrame, param: dict, par: list, imod: list, t_expans):
     """Gets the parameters of the probability models for fitting
 
@@ -2501,6 +2739,24 @@ def transform(data: pd.DataFrame, params: dict):
     if not isinstance(data, pd.DataFrame):
         data = data.to_frame()
 
+    if params["transform"]["method"] == "box-cox":
+        values = data.values[:, 0].astype(float)
+        if "lambda" not in params["transform"].keys():
+            # Compute lambda of transformation by MLE bounded to [-2, 2]
+            params["transform"]["lambda"] = float(
+                st.boxcox_normmax(
+                    values[~np.isnan(values)],
+                    method="mle",
+                    optimizer=_boxcox_bounded_optimizer,
+                )
+            )
+        # Closed form with the stored lambda, so later calls do not refit it
+        data = pd.DataFrame(
+            {data.columns[0]: special.boxcox(values, params["transform"]["lambda"])},
+            index=data.index,
+        )
+        return data, params
+
     if "lambda" in params["transform"].keys():
         # Use the lambda of a previous transformation if it is given
         powertransform = preprocessing.PowerTransformer(
@@ -2523,6 +2779,18 @@ def transform(data: pd.DataFrame, params: dict):
     return data, params
 
 
+def _boxcox_bounded_optimizer(fun):
+    """Minimizes the Box-Cox log-likelihood for lambda within [-2, 2]
+
+    Args:
+        * fun (callable): the objective function given by scipy.stats.boxcox_normmax
+
+    Returns:
+        * res (OptimizeResult): the result of the bounded scalar minimization
+    """
+    return minimize_scalar(fun, bounds=(-2, 2), method="bounded")
+
+
 def inverse_transform(data: pd.DataFrame, params: dict, ensemble: bool = False):
     """Reverse power transformation to original data scale.
     
@@ -2573,6 +2841,18 @@ def inverse_transform(data: pd.DataFrame, params: dict, ensemble: bool = False):
     >>> data_original = inverse_transform(data_ensemble, params, ensemble=True)
     """
 
+    if ensemble:
+        method, lambda_ = params["method_ensemble"], params["lambda_ensemble"]
+    else:
+        method, lambda_ = params["transform"]["method"], params["transform"]["lambda"]
+
+    if method == "box-cox":
+        # Closed-form inverse with the stored lambda
+        return pd.DataFrame(
+            {data.columns[0]: special.inv_boxcox(data.values[:, 0].astype(float), lambda_)},
+            index=data.index,
+        )
+
     if ensemble:
         powertransform = preprocessing.PowerTransformer(
             params["method_ensemble"], standardize=False
@@ -2736,38 +3016,33 @@ def params_t_expansion(mod: int, param: dict, nper: pd.DataFrame):
         * t_expans (np.ndarray): the variability of every mode
     """
 
-    if param["basis_function"]["method"] == "trigonometric":
-        t_expans = np.zeros([np.max(mod) * 2, len(nper)])
-        for i in range(0, np.max(mod)):
-            n = (
-                nper
-                * np.max(param["basis_function"]["periods"])
-                / param["basis_function"]["periods"][i]
-            )
-            t_expans[2 * i, :] = np.cos(2 * np.pi * n.T)
-            t_expans[2 * i + 1, :] = np.sin(2 * np.pi * n.T)
-    elif param["basis_function"]["method"] == "modified":
-        t_expans = np.zeros([np.max(mod) * 2, len(nper)])
-        for i in range(0, np.max(mod)):
-            per_ = (
-                np.max(param["basis_function"]["periods"])
-                / param["basis_function"]["periods"][i]
-            )
-            n = (
-                nper
-                * np.max(param["basis_function"]["periods"])
-                / param["basis_function"]["periods"][i]
-            )
-
-            t_expans[2 * i, :] = np.cos(np.pi * (n.T - 1))
-            t_expans[2 * i + 1, :] = np.sin(
-                2 * np.pi * n.T - per_ * np.pi - np.pi * nper + 0.5 * np.pi
+    if param["basis_function"]["method"] in ["trigonometric", "modified"]:
+        # Build every mode at once: rows are (cos, sin) pairs of each period. A
+        # float32 time grid keeps the basis in float32
+        nper_ = np.asarray(nper)
+        if nper_.dtype != np.float32:
+            nper_ = nper_.astype(float)
+        per_ = (
+            np.max(param["basis_function"]["periods"])
+            / np.asarray(param["basis_function"]["periods"][: np.max(mod)], dtype=nper_.dtype)
+        )
+        n = np.outer(per_, nper_)
+        t_expans = np.empty([np.max(mod) * 2, len(nper_)], dtype=nper_.dtype)
+        if param["basis_function"]["method"] == "trigonometric":
+            np.cos(2 * np.pi * n, out=t_expans[0::2])
+            np.sin(2 * np.pi * n, out=t_expans[1::2])
+        else:
+            np.cos(np.pi * (n - 1), out=t_expans[0::2])
+            np.sin(
+                2 * np.pi * n - np.pi * (per_[:, None] + nper_ - 0.5),
+                out=t_expans[1::2],
             )
     elif param["basis_function"]["method"] == "sinusoidal":
-        t_expans = np.zeros([np.max(mod), len(nper)])
-        for i in range(0, np.max(mod)):
-            n = (i + 1) * (nper + 1)
-            t_expans[i, :] = np.sin(np.pi * n.T)
+        nper_ = np.asarray(nper)
+        if nper_.dtype != np.float32:
+            nper_ = nper_.astype(float)
+        n = np.outer(np.arange(1, np.max(mod) + 1, dtype=nper_.dtype), nper_ + 1)
+        t_expans = np.sin(np.pi * n)
 
     elif param["basis_function"]["method"] == "chebyshev":
         nper = 2 * (nper - 0.5)
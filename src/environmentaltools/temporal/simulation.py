@@ -1,4 +1,5 @@
 ﻿import warnings
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
 import matplotlib.dates as mdates
@@ -72,7 +73,8 @@ def simulation(
         Time series of storm events
     seed : int, optional
         A value to create a non-random simulation (mainly for debugging actions).
-        Default is a random integer.
+        Every realization uses its own seed derived from it. Default is a random
+        integer.
     include : bool, optional
         Include some deterministic time series given by the user. Default is False.
 
@@ -81,6 +83,17 @@ def simulation(
     None
         Saves files with simulated time series
 
+    Notes
+    -----
+    The realizations run one after another in the current process by default.
+    Set param["TS"]["workers"] above 1 (e.g. ``os.cpu_count()``) to run up to
+    that number of them in parallel processes; scripts doing so should call
+    this function under ``if __name__ == "__main__":``.
+
+    The simulated values are saved in double precision by default. Set
+    param["TS"]["dtype"] to "float32" to save them in single precision, which
+    halves the size of the files.
+
     Examples
     --------
     >>> params = {"Hs": {... see environmentaltools.temporal.analysis.fit_marginal_distribution},
@@ -88,361 +101,419 @@ def simulation(
     ...           "TS": {}}
 
     """
-    np.random.seed(seed)
-
     # Check the parameters
     param = check_parameters(param)
 
-    # Start the simulation algorithm
-    for nosim in range(param["TS"]["nosim"]):
-        logger.info(
-            "Simulation no. %s of %s"
-            % (str(nosim + 1).zfill(4), str(param["TS"]["nosim"]).zfill(4))
-        )
-
-        # Make storms simulation (Lira et al, 2019)
-        if param["TS"]["events"]:
-            # Initializa storm duration and calms dictionary
-            durs_by_seasons = {
-                i: {"storms": [], "calms": []} for i in param["TS"]["season"]
-            }
-            index = {}
-
-            # Fill storm and calm durations using Copula parameters
-            for season in param["TS"]["season"].keys():
-                cop = Copula(
-                    dur_storm_calms.loc[
-                        dur_storm_calms["season"] == season, "dur_storm"
-                    ].values[:],
-                    dur_storm_calms.loc[
-                        dur_storm_calms["season"] == season, "dur_calms"
-                    ].values[:],
-                    param["TS"]["family"],
+    # Every realization draws from its own seed, so the simulations do not depend
+    # on the number of processes
+    seeds = [
+        int(child.generate_state(1)[0])
+        for child in np.random.SeedSequence(seed).spawn(param["TS"]["nosim"])
+    ]
+
+    # The realizations are independent, so they run in parallel processes
+    workers = min(param["TS"]["workers"], param["TS"]["nosim"])
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _simulate_one,
+                    nosim,
+                    seeds[nosim],
+                    param,
+                    tidalConstituents,
+                    dur_storm_calms,
+                    include,
                 )
-                # cop.theta, cop.tau = param["TS"]["season"][season]
-                cop.generate_xy(n=10000)
-                (
-                    durs_by_seasons[season]["storms"],
-                    durs_by_seasons[season]["calms"],
-                ) = (
-                    cop.X1,
-                    cop.Y1,
-                )
-                index[season] = 0
-                # Remove outlayers
-                if any(durs_by_seasons[season]["storms"] < 0):
-                    indexs = np.where(durs_by_seasons[season]["storms"] > 0)
-                    durs_by_seasons[season]["storms"] = durs_by_seasons[season][
-                        "storms"
-                    ][indexs]
-                    durs_by_seasons[season]["calms"] = durs_by_seasons[season]["calms"][
-                        indexs
-                    ]
-                    warnings.warn(
-                        "Some storms duration at {} are negative. Removed from events database. Please, check the copula parameters.".format(
-                            season
-                        )
-                    )
-                # Remove outlayers
-                if any(durs_by_seasons[season]["calms"] < 0):
-                    indexs = np.where(durs_by_seasons[season]["calms"] > 0)
-                    durs_by_seasons[season]["storms"] = durs_by_seasons[season][
-                        "storms"
-                    ][indexs]
-                    durs_by_seasons[season]["calms"] = durs_by_seasons[season]["calms"][
-                        indexs
-                    ]
-                    warnings.warn(
-                        "Some calms duration at {} are negative. Removed from eventsdatabase. Please, check the copula parameters.".format(
-                            season
-                        )
-                    )
-
-            ini, end = (
-                datetime.strptime(param["TS"]["start"], "%Y/%m/%d %H:%M:%S"),
-                datetime.strptime(param["TS"]["end"], "%Y/%m/%d %H:%M:%S"),
+                for nosim in range(param["TS"]["nosim"])
+            ]
+            for future in futures:
+                future.result()
+    else:
+        for nosim in range(param["TS"]["nosim"]):
+            _simulate_one(
+                nosim, seeds[nosim], param, tidalConstituents, dur_storm_calms, include
             )
-            df = pd.DataFrame()
 
-            calms, storms = [], []
-            season = class_seasons(ini, type_=param["TS"]["class_type"])
-            calms.append(durs_by_seasons[season]["calms"][0])
-            ini = ini + timedelta(hours=durs_by_seasons[season]["calms"][0])
-
-            # Start the simulation
-            while ini < end:
-                # Look for season and retrieve the durations
-                season = class_seasons(ini, type_=param["TS"]["class_type"])
-                dstorm, dcalm = (
-                    durs_by_seasons[season]["storms"][index[season]],
-                    durs_by_seasons[season]["calms"][index[season]],
-                )
-                calms.append(dcalm)
-                storms.append(dstorm)
-
-                # Locate the start/end of the i-storm
-                if "D" in param["TS"]["freq"]:
-                    timedelta_storm = timedelta(days=dstorm)
-                    end_i = ini + timedelta(days=dstorm + dcalm)
-                    if param["TS"]["freq"] == "D":
-                        factor = 1
-                    else:
-                        factor = int(param["TS"]["freq"].split("D")[0])
-                elif "H" in param["TS"]["freq"]:
-                    timedelta_storm = timedelta(hours=dstorm)
-                    end_i = ini + timedelta(hours=dstorm + dcalm)
-                    if param["TS"]["freq"] == "H":
-                        factor = 1
-                    else:
-                        factor = int(param["TS"]["freq"].split("H")[0])
-
-                # Initialize the normalize simulation for the i-storm
-                df_zsim = pd.DataFrame(
-                    -1,
-                    index=pd.date_range(
-                        start=ini,
-                        end=ini + timedelta_storm,
-                        freq=param["TS"]["freq"],
-                    ),
-                    columns=param["TS"]["vars"],
-                )
+    return
 
-                # Generate the i-storm
-                zsim = var_simulation(param["TD"], int(dstorm / factor) + 1, "normal")
-                df_zsim.loc[:, param["TS"]["vars"]] = zsim
-                df = pd.concat([df, df_zsim])
-
-                index[season] = index[season] + 1
-                ini = end_i
-
-            # Create the normalized date
-            df["n"] = (
-                (df.index.dayofyear + df.index.hour / 24.0 - 1)
-                / pd.to_datetime(
-                    {"year": df.index.year, "month": 12, "day": 31, "hour": 23}
-                ).dt.dayofyear
-            ).values
-
-            # Return the value at time t and the parameters associated
-            for ind_, var_ in enumerate(param["TS"]["vars"]):
-                # Read the NS parameters of the PMs
-                if param["TS"]["ensemble"]:
-                    for model in param["TS"]["models"]:
-                        param[var_] = utils.string_to_function(param[var_], model)
-                else:
-                    param = utils.string_to_function(param, var_)
 
-                # Compute the inverse Gaussian for the "var_"
-                if param["TS"]["conditional"] & (param["TS"]["mvar"] == var_):
-                    # If it is the main variable of the analysis, compute the
-                    # conditional probability reached the threshold
-                    df_var = pd.DataFrame(
-                        np.ones(len(df["n"])) * param["TS"]["threshold"],
-                        index=df.index,
-                        columns=["data"],
-                    )
-                    df_var[var_] = df[var_].values
-                    df_var["n"] = df["n"].values
-
-                    # Compute the NS-CDF
-                    if param["TS"]["ensemble"]:
-                        if param["EA"]["weights"] == "equal":
-                            cdfu = 0
-                            for model in param["TS"]["models"]:
-                                cdfu_model = core.cdf(df_var, param[var_][model])
-                                cdfu += cdfu_model
-                            cdfu = cdfu / len(param["TS"]["models"])
-                        else:
-                            cdfu = 0
-                            for i, model in enumerate(param["TS"]["models"]):
-                                cdfu_model = core.cdf(df_var, param[var_][model]) * (
-                                    param["EA"]["weights"][i]
-                                )
-                                cdfu += cdfu_model
+def _simulate_one(
+    nosim: int,
+    seed: int,
+    param: dict,
+    tidalConstituents: dict = None,
+    dur_storm_calms: pd.DataFrame = None,
+    include: bool = False,
+):
+    """Simulates and saves one realization of the time series
 
-                    else:
-                        cdfu = core.cdf(df_var, param[ind_])
-                    cdfu = pd.DataFrame(cdfu)
+    Args:
+        * nosim (int): index of the realization
+        * seed (int): seed of the random generator for this realization
+        * param (dict): the probability models of every variable, already checked
+        * tidalConstituents (dict, optional): tidal constituents. Defaults to None.
+        * dur_storm_calms (pd.DataFrame, optional): time series of storm events
+        * include (bool, optional): deterministic time series given by the user
 
-                    # Return the values
-                    cdfj = (
-                        st.norm.cdf(df.loc[:, var_]) * (1 - cdfu["prob"].values[:])
-                        + cdfu["prob"].values[:]
-                    )
-                    dfj = pd.DataFrame(cdfj, index=df.index, columns=["prob"])
-                else:
-                    # Compute the inverse Gaussian for the "var_"
-                    dfj = pd.DataFrame(
-                        st.norm.cdf(df.loc[:, var_].values[:]),
-                        index=df.index,
-                        columns=["prob"],
-                    )
+    Returns:
+        None
+    """
+    np.random.seed(seed)
 
-                dfj["n"] = df["n"].copy()
-                # Compute the ppf of the PM for "var_"
-                if param["TS"]["ensemble"]:
-                    res = core.ensemble_ppf(dfj, param, var_, param["TS"]["nodes"])
-                else:
-                    res = pd.DataFrame(
-                        core.ppf(dfj, param[var_]), #, ppf=True),
-                        index=dfj.index,
-                        columns=[var_],
-                    )
-                df[var_] = res[var_].values
+    logger.info(
+        "Simulation no. %s of %s"
+        % (str(nosim + 1).zfill(4), str(param["TS"]["nosim"]).zfill(4))
+    )
 
-                # Compute the inverse of the power transform if it is required
-                # Transformed timeserie
-                if param[var_]["transform"]["make"]:
-                    if "scale" in param:
-                        df[var_] = df[var_] * param[var_]["scale"]
+    # Make storms simulation (Lira et al, 2019)
+    if param["TS"]["events"]:
+        # Initializa storm duration and calms dictionary
+        durs_by_seasons = {
+            i: {"storms": [], "calms": []} for i in param["TS"]["season"]
+        }
+        index = {}
+
+        # Fill storm and calm durations using Copula parameters
+        for season in param["TS"]["season"].keys():
+            cop = Copula(
+                dur_storm_calms.loc[
+                    dur_storm_calms["season"] == season, "dur_storm"
+                ].values[:],
+                dur_storm_calms.loc[
+                    dur_storm_calms["season"] == season, "dur_calms"
+                ].values[:],
+                param["TS"]["family"],
+            )
+            # cop.theta, cop.tau = param["TS"]["season"][season]
+            cop.generate_xy(n=10000)
+            (
+                durs_by_seasons[season]["storms"],
+                durs_by_seasons[season]["calms"],
+            ) = (
+                cop.X1,
+                cop.Y1,
+            )
+            index[season] = 0
+            # Remove outlayers
+            if any(durs_by_seasons[season]["storms"] < 0):
+                indexs = np.where(durs_by_seasons[season]["storms"] > 0)
+                durs_by_seasons[season]["storms"] = durs_by_seasons[season][
+                    "storms"
+                ][indexs]
+                durs_by_seasons[season]["calms"] = durs_by_seasons[season]["calms"][
+                    indexs
+                ]
+                warnings.warn(
+                    "Some storms duration at {} are negative. Removed from events database. Please, check the copula parameters.".format(
+                        season
+                    )
+                )
+            # Remove outlayers
+            if any(durs_by_seasons[season]["calms"] < 0):
+                indexs = np.where(durs_by_seasons[season]["calms"] > 0)
+                durs_by_seasons[season]["storms"] = durs_by_seasons[season][
+                    "storms"
+                ][indexs]
+                durs_by_seasons[season]["calms"] = durs_by_seasons[season]["calms"][
+                    indexs
+                ]
+                warnings.warn(
+                    "Some calms duration at {} are negative. Removed from eventsdatabase. Please, check the copula parameters.".format(
+                        season
+                    )
+                )
 
-                    df[var_] = df[var_] + param[var_]["transform"]["min"]
-                    df[var_] = core.inverse_transform(
-                        df[[var_]], param[var_])
-                # if param["EA"]["make"]:
-                #     if "scale" in param:
-                #         df[var_] = df[var_] * param[var_]["scale"]
+        ini, end = (
+            datetime.strptime(param["TS"]["start"], "%Y/%m/%d %H:%M:%S"),
+            datetime.strptime(param["TS"]["end"], "%Y/%m/%d %H:%M:%S"),
+        )
+        df = pd.DataFrame()
 
-                #     df[var_] = df[var_] + param["EA"]["min_ensemble"]
-                #     df[var_] = core.inverse_transform(df[[var_]], param["EA"], True)
-                # elif "scale" in param:
-                #     df[var_] = df[var_] * param[var_]["scale"]
+        calms, storms = [], []
+        season = class_seasons(ini, type_=param["TS"]["class_type"])
+        calms.append(durs_by_seasons[season]["calms"][0])
+        ini = ini + timedelta(hours=durs_by_seasons[season]["calms"][0])
 
-        else:
-            # Make the full simulation
-            ini, end = (
-                datetime.strptime(param["TS"]["start"], "%Y/%m/%d %H:%M:%S"),
-                datetime.strptime(param["TS"]["end"], "%Y/%m/%d %H:%M:%S"),
+        # Start the simulation
+        while ini < end:
+            # Look for season and retrieve the durations
+            season = class_seasons(ini, type_=param["TS"]["class_type"])
+            dstorm, dcalm = (
+                durs_by_seasons[season]["storms"][index[season]],
+                durs_by_seasons[season]["calms"][index[season]],
             )
-            df = pd.DataFrame(
+            calms.append(dcalm)
+            storms.append(dstorm)
+
+            # Locate the start/end of the i-storm
+            if "D" in param["TS"]["freq"]:
+                timedelta_storm = timedelta(days=dstorm)
+                end_i = ini + timedelta(days=dstorm + dcalm)
+                if param["TS"]["freq"] == "D":
+                    factor = 1
+                else:
+                    factor = int(param["TS"]["freq"].split("D")[0])
+            elif "H" in param["TS"]["freq"]:
+                timedelta_storm = timedelta(hours=dstorm)
+                end_i = ini + timedelta(hours=dstorm + dcalm)
+                if param["TS"]["freq"] == "H":
+                    factor = 1
+                else:
+                    factor = int(param["TS"]["freq"].split("H")[0])
+
+            # Initialize the normalize simulation for the i-storm
+            df_zsim = pd.DataFrame(
+                -1,
                 index=pd.date_range(
                     start=ini,
-                    end=end,
+                    end=ini + timedelta_storm,
                     freq=param["TS"]["freq"],
-                )
+                ),
+                columns=param["TS"]["vars"],
             )
 
-            # Create the normalized date
-            df["n"] = (
-                (df.index.dayofyear + df.index.hour / 24.0 - 1)
-                / pd.to_datetime(
-                    {"year": df.index.year, "month": 12, "day": 31, "hour": 23}
-                ).dt.dayofyear
-            ).values
+            # Generate the i-storm
+            zsim = var_simulation(param["TD"], int(dstorm / factor) + 1, "normal")
+            df_zsim.loc[:, param["TS"]["vars"]] = zsim
+            df = pd.concat([df, df_zsim])
+
+            index[season] = index[season] + 1
+            ini = end_i
+
+        # Create the normalized date
+        df["n"] = (
+            (df.index.dayofyear + df.index.hour / 24.0 - 1)
+            / pd.to_datetime(
+                {"year": df.index.year, "month": 12, "day": 31, "hour": 23}
+            ).dt.dayofyear
+        ).values
+
+        # Return the value at time t and the parameters associated
+        for ind_, var_ in enumerate(param["TS"]["vars"]):
+            # Read the NS parameters of the PMs
+            if param["TS"]["ensemble"]:
+                for model in param["TS"]["models"]:
+                    param[var_] = utils.string_to_function(param[var_], model)
+            else:
+                param = utils.string_to_function(param, var_)
+
+            # Compute the inverse Gaussian for the "var_"
+            if param["TS"]["conditional"] & (param["TS"]["mvar"] == var_):
+                # If it is the main variable of the analysis, compute the
+                # conditional probability reached the threshold
+                df_var = pd.DataFrame(
+                    np.ones(len(df["n"])) * param["TS"]["threshold"],
+                    index=df.index,
+                    columns=["data"],
+                )
+                df_var[var_] = df[var_].values
+                df_var["n"] = df["n"].values
 
-            # Create the stationary full simulation
-            zsim = var_simulation(param["TD"], len(df), "normal")
+                # Compute the NS-CDF
+                if param["TS"]["ensemble"]:
+                    if param["EA"]["weights"] == "equal":
+                        cdfu = 0
+                        for model in param["TS"]["models"]:
+                            cdfu_model = core.cdf(df_var, param[var_][model])
+                            cdfu += cdfu_model
+                        cdfu = cdfu / len(param["TS"]["models"])
+                    else:
+                        cdfu = 0
+                        for i, model in enumerate(param["TS"]["models"]):
+                            cdfu_model = core.cdf(df_var, param[var_][model]) * (
+                                param["EA"]["weights"][i]
+                            )
+                            cdfu += cdfu_model
+
+                else:
+                    cdfu = core.cdf(df_var, param[ind_])
+                cdfu = pd.DataFrame(cdfu)
 
-            for ind_, var_ in enumerate(param["TD"]["vars"]):
-                # Compute the inverse of the Gaussian PM
+                # Return the values
+                cdfj = (
+                    st.norm.cdf(df.loc[:, var_]) * (1 - cdfu["prob"].values[:])
+                    + cdfu["prob"].values[:]
+                )
+                dfj = pd.DataFrame(cdfj, index=df.index, columns=["prob"])
+            else:
+                # Compute the inverse Gaussian for the "var_"
                 dfj = pd.DataFrame(
-                    st.norm.cdf(zsim[:, ind_]), index=df.index, columns=["prob"]
+                    st.norm.cdf(df.loc[:, var_].values[:]),
+                    index=df.index,
+                    columns=["prob"],
                 )
-                dfj["n"] = df["n"].copy()
 
-                # Compute the ppf of the PMs for "var_"
-                if param["TS"]["ensemble"]:
-                    for model in param["TS"]["models"]:
-                        param[var_] = utils.string_to_function(param[var_], model)
-                    df[var_] = core.ensemble_ppf(dfj, param, var_, param["TS"]["nodes"])
-
-                    # Transformed timeserie
-                    if param[var_]["transform"]["make"]:
-                        if "scale" in param:
-                            df[var_] = df[var_] * param[var_]["scale"]
-
-                        if "min" in param:
-                            df[var_] = df[var_] + param[var_]["transform"]["min"]
-                        df[var_] = core.inverse_transform(df[[var_]], param[var_])
-                    elif "scale" in param[var_]:
-                        df[var_] = df[var_] * param[var_]["scale"]
-                else:
-                    param = utils.string_to_function(param, var_)
-                    df[var_] = pd.DataFrame(
-                        core.ppf(dfj, param[var_]),
-                        index=dfj.index,
-                        columns=[var_],
-                    )
+            dfj["n"] = df["n"].copy()
+            # Compute the ppf of the PM for "var_"
+            if param["TS"]["ensemble"]:
+                res = core.ensemble_ppf(dfj, param, var_, param["TS"]["nodes"])
+            else:
+                res = pd.DataFrame(
+                    core.ppf(dfj, param[var_]), #, ppf=True),
+                    index=dfj.index,
+                    columns=[var_],
+                )
+            df[var_] = res[var_].values
+
+            # Compute the inverse of the power transform if it is required
+            # Transformed timeserie
+            if param[var_]["transform"]["make"]:
+                if "scale" in param:
+                    df[var_] = df[var_] * param[var_]["scale"]
+
+                df[var_] = df[var_] + param[var_]["transform"]["min"]
+                df[var_] = core.inverse_transform(
+                    df[[var_]], param[var_])
+            # if param["EA"]["make"]:
+            #     if "scale" in param:
+            #         df[var_] = df[var_] * param[var_]["scale"]
+
+            #     df[var_] = df[var_] + param["EA"]["min_ensemble"]
+            #     df[var_] = core.inverse_transform(df[[var_]], param["EA"], True)
+            # elif "scale" in param:
+            #     df[var_] = df[var_] * param[var_]["scale"]
 
-                    # Transformed timeseries
-                    if param[var_]["transform"]["make"]:
-                        if "scale" in param[var_]:
-                            df[var_] = df[var_] * param[var_]["scale"]
+    else:
+        # Make the full simulation
+        ini, end = (
+            datetime.strptime(param["TS"]["start"], "%Y/%m/%d %H:%M:%S"),
+            datetime.strptime(param["TS"]["end"], "%Y/%m/%d %H:%M:%S"),
+        )
+        df = pd.DataFrame(
+            index=pd.date_range(
+                start=ini,
+                end=end,
+                freq=param["TS"]["freq"],
+            )
+        )
+
+        # Create the normalized date
+        df["n"] = (
+            (df.index.dayofyear + df.index.hour / 24.0 - 1)
+            / pd.to_datetime(
+                {"year": df.index.year, "month": 12, "day": 31, "hour": 23}
+            ).dt.dayofyear
+        ).values
+
+        # Create the stationary full simulation
+        zsim = var_simulation(param["TD"], len(df), "normal")
+
+        for ind_, var_ in enumerate(param["TD"]["vars"]):
+            # Compute the inverse of the Gaussian PM
+            dfj = pd.DataFrame(
+                st.norm.cdf(zsim[:, ind_]), index=df.index, columns=["prob"]
+            )
+            dfj["n"] = df["n"].copy()
 
+            # Compute the ppf of the PMs for "var_"
+            if param["TS"]["ensemble"]:
+                for model in param["TS"]["models"]:
+                    param[var_] = utils.string_to_function(param[var_], model)
+                df[var_] = core.ensemble_ppf(dfj, param, var_, param["TS"]["nodes"])
+
+                # Transformed timeserie
+                if param[var_]["transform"]["make"]:
+                    if "scale" in param:
+                        df[var_] = df[var_] * param[var_]["scale"]
+
+                    if "min" in param:
                         df[var_] = df[var_] + param[var_]["transform"]["min"]
-                        df[var_] = core.inverse_transform(df[[var_]], param[var_])
-                    elif "scale" in param[var_]:
+                    df[var_] = core.inverse_transform(df[[var_]], param[var_])
+                elif "scale" in param[var_]:
+                    df[var_] = df[var_] * param[var_]["scale"]
+            else:
+                param = utils.string_to_function(param, var_)
+                df[var_] = pd.DataFrame(
+                    core.ppf(dfj, param[var_]),
+                    index=dfj.index,
+                    columns=[var_],
+                )
+
+                # Transformed timeseries
+                if param[var_]["transform"]["make"]:
+                    if "scale" in param[var_]:
                         df[var_] = df[var_] * param[var_]["scale"]
 
-        # Include tidal level if added
-        if tidalConstituents is not None:
-            # The tidal level is deterministic so just one time per simulations is
-            # reconstructed
-            if nosim == 0:
-                from utide import reconstruct
-
-                time = mdates.date2num(df.index.to_pydatetime())
-                tidalLevel = reconstruct(time, tidalConstituents)
-
-            df["ma"] = tidalLevel["h"] - tidalConstituents["mean"]
-            if "mm" in df.columns:
-                df["eta"] = tidalLevel["h"] + df["mm"]
-
-        # Transform radians to angles (circular variables)
-        # for var_ in param["TD"]["vars"]:
-        #    if param[var_]["circular"] == True:
-        #        df[var_] = np.rad2deg(df[var_])
-
-        # Include any deterministic timeseries if given
-        if "include" in param["TS"]:
-            if param["TS"]["include"]:
-                df[include.name] = include
-
-        logger.info(
-            "Saving simulation no. %s of %s"
-            % (str(nosim + 1).zfill(4), str(param["TS"]["nosim"]).zfill(4))
+                    df[var_] = df[var_] + param[var_]["transform"]["min"]
+                    df[var_] = core.inverse_transform(df[[var_]], param[var_])
+                elif "scale" in param[var_]:
+                    df[var_] = df[var_] * param[var_]["scale"]
+
+    # Include tidal level if added
+    if tidalConstituents is not None:
+        # The tidal level is deterministic, it is reconstructed at the dates of the
+        # realization
+        from utide import reconstruct
+
+        time = mdates.date2num(df.index.to_pydatetime())
+        tidalLevel = reconstruct(time, tidalConstituents)
+
+        df["ma"] = tidalLevel["h"] - tidalConstituents["mean"]
+        if "mm" in df.columns:
+            df["eta"] = tidalLevel["h"] + df["mm"]
+
+    # Transform radians to angles (circular variables)
+    # for var_ in param["TD"]["vars"]:
+    #    if param[var_]["circular"] == True:
+    #        df[var_] = np.rad2deg(df[var_])
+
+    # Include any deterministic timeseries if given
+    if "include" in param["TS"]:
+        if param["TS"]["include"]:
+            df[include.name] = include
+
+    logger.info(
+        "Saving simulation no. %s of %s"
+        % (str(nosim + 1).zfill(4), str(param["TS"]["nosim"]).zfill(4))
+    )
+    # Create the folder for simulations
+    os.makedirs(param["TS"]["folder"], exist_ok=True)
+
+    # Store the simulated values with the precision given in the parameters
+    float_columns = df.select_dtypes("float64").columns
+    df[float_columns] = df[float_columns].astype(param["TS"]["dtype"])
+
+    # Save simulation file
+    if param["TS"]["save_z"]:
+        save.to_txt(
+            zsim,
+            param["TS"]["folder"]
+            + "/simulation_z_"
+            + str(nosim + 1).zfill(4)
+            + ".csv",
         )
-        # Create the folder for simulations
-        os.makedirs(param["TS"]["folder"], exists_ok=True)
-
-        # Save simulation file
-        if param["TS"]["save_z"]:
-            save.to_txt(
-                zsim,
-                param["TS"]["folder"]
-                + "/simulation_z_"
-                + str(nosim + 1).zfill(4)
-                + ".csv",
-            )
 
-        save.to_csv(
-            df,
-            param["TS"]["folder"] + "/simulation_" + str(nosim + 1).zfill(4) + ".zip",
-        )
+    if param["TS"]["format"] == "parquet":
+        to_file, extension = save.to_parquet, ".parquet"
+    else:
+        to_file, extension = save.to_csv, ".zip"
 
-        # If storm analysis, save the storm and calms duration too
-        if param["TS"]["events"]:
-            dstorm = pd.DataFrame(storms)
-            save.to_csv(
-                dstorm,
-                param["TS"]["folder"]
-                + "/durs_storm_"
-                + str(nosim + 1).zfill(4)
-                + ".zip",
-            )
+    to_file(
+        df,
+        param["TS"]["folder"] + "/simulation_" + str(nosim + 1).zfill(4) + extension,
+    )
 
-            dcalms = pd.DataFrame(calms)
-            save.to_csv(
-                dcalms,
-                param["TS"]["folder"]
-                + "/durs_calms_"
-                + str(nosim + 1).zfill(4)
-                + ".zip",
-            )
+    # If storm analysis, save the storm and calms duration too
+    if param["TS"]["events"]:
+        dstorm = pd.DataFrame(storms)
+        to_file(
+            dstorm,
+            param["TS"]["folder"]
+            + "/durs_storm_"
+            + str(nosim + 1).zfill(4)
+            + extension,
+        )
 
-        del df
+        dcalms = pd.DataFrame(calms)
+        to_file(
+            dcalms,
+            param["TS"]["folder"]
+            + "/durs_calms_"
+            + str(nosim + 1).zfill(4)
+            + extension,
+        )
 
-    return
 
 
 def check_parameters(param):
@@ -510,6 +581,25 @@ def check_parameters(param):
     if not "save_z" in param["TS"].keys():
         param["TS"]["save_z"] = False
 
+    # Number of realizations simulated at the same time in separate processes
+    # (1, the default, runs them one after another in the current process)
+    if not "workers" in param["TS"].keys():
+        param["TS"]["workers"] = 1
+
+    # Floating type of the saved simulations ("float32" halves the size of the files)
+    if not "dtype" in param["TS"].keys():
+        param["TS"]["dtype"] = "float64"
+
+    # Output format of the simulations: zipped CSV or Parquet (requires pyarrow)
+    if not "format" in param["TS"].keys():
+        param["TS"]["format"] = "zip"
+    elif param["TS"]["format"] not in ["zip", "parquet"]:
+        raise ValueError(
+            "The format of the simulations should be 'zip' or 'parquet'. Got {}.".format(
+                param["TS"]["format"]
+            )
+        )
+
     return param
 
 
@@ -527,7 +617,6 @@ def var_simulation(par: dict, lsim: int, distribution: str):
 
     dim = par["dim"]
     ord_ = par["id"]+1
-    zsim = np.zeros([dim, lsim])
     if distribution == "normal":  # TODO: some other non-normal multivariate analysis
         if dim == 1:
             y = np.random.normal(np.zeros(dim), np.sqrt(par["Q"]), lsim)
@@ -535,14 +624,19 @@ def var_simulation(par: dict, lsim: int, distribution: str):
         else:
             y = np.random.multivariate_normal(np.zeros(dim), par["Q"], lsim).T
 
-    # Initialize the simulation matrix
-    zsim[:, 0:ord_] = y[:, 0:ord_]
+    # The simulation is stored backwards in time, so the lags x(t-1), ..., x(t-p)
+    # of every step are a contiguous block in the order of the columns of B
+    B = np.asarray(par["B"], dtype=float)
+    coefs = np.ascontiguousarray(B[:, 1:])
+    innovations = (y + B[:, :1]).T
+
+    zsim = np.zeros([lsim, dim])
+    zsim[lsim - ord_ :] = y[:, ord_ - 1 :: -1].T
     for i in range(ord_, lsim):
-        z = np.fliplr(zsim[:, i - ord_ : i])
-        z1 = np.vstack((1, np.reshape(z.T, (ord_ * dim, 1))))
-        zsim[:, i] = np.dot(par["B"], z1).T + y[:, i]
+        j = lsim - 1 - i
+        zsim[j] = np.dot(coefs, zsim[j + 1 : j + 1 + ord_].ravel()) + innovations[i]
 
-    return zsim.T
+    return np.ascontiguousarray(zsim[::-1])
 
 
 def class_seasons(date, type_="WSSF"):
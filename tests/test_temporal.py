@@ -6,6 +6,7 @@ and can be run without pytest, using only standard Python.
 
 import sys
 import os
+import tempfile
 import warnings
 import numpy as np
 import pandas as pd
@@ -291,6 +292,217 @@ def test_data_handling():
         print(f"✗ Data handling test failed: {e}")
         return False
 
+def test_var_bic():
+    """Test that var_bic gives the BIC of statsmodels AutoReg and VAR."""
+    print("Testing var_bic...")
+
+    from environmentaltools.temporal.analysis import var_bic
+    from statsmodels.tsa.ar_model import AutoReg
+    from statsmodels.tsa.api import VAR
+
+    np.random.seed(42)
+    order = 4
+    for dim in (1, 3):
+        # Correlated AR(1) series (dim x time)
+        data = np.zeros((dim, 500))
+        noise = np.random.normal(0, 1, data.shape)
+        for t in range(1, data.shape[1]):
+            data[:, t] = 0.6 * data[:, t - 1] + noise[:, t]
+
+        bic = var_bic(data, order)
+        if dim == 1:
+            expected = [AutoReg(data[0], lags=p, trend="c").fit().bic for p in range(1, order + 1)]
+        else:
+            expected = [VAR(data.T).fit(p).bic for p in range(1, order + 1)]
+        np.testing.assert_allclose(bic, expected, rtol=1e-12)
+
+    print("✓ var_bic test passed")
+    return True
+
+def test_maximum_dissimilarity_algorithm():
+    """Test that the k-d tree updates of the MDA select the brute-force cases."""
+    print("Testing maximum_dissimilarity_algorithm...")
+
+    from environmentaltools.temporal.classification import (
+        maximum_dissimilarity_algorithm,
+        normalize,
+    )
+
+    df = create_wave_data().set_index("date")
+    df["Tp"] = 4 * np.sqrt(df["Hs"]) + np.random.normal(0, 0.5, len(df))
+    df["DirM"] = np.random.uniform(0, 360, len(df))
+    variables, n_cases = ["Hs", "Tp", "DirM"], 150
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = maximum_dissimilarity_algorithm(
+            df, variables, n_cases, "Hs", file_name=os.path.join(tmp_dir, "cases.csv")
+        )
+
+    # Brute force: the distances to all the points are updated every iteration
+    columns = normalize(df[variables], variables)[variables].to_numpy(dtype=float).T
+    columns[2] = np.mod(columns[2], 2)
+    sel_pos = [int(np.argmax(df["Hs"].to_numpy()))]
+    min_dist = np.full(len(df), np.inf)
+    for _ in range(1, n_cases):
+        diff = np.abs(columns - columns[:, [sel_pos[-1]]])
+        diff[2] = np.minimum(diff[2], 2 - diff[2])
+        min_dist = np.minimum(min_dist, np.sum(diff**2, axis=0))
+        min_dist[sel_pos] = -np.inf
+        sel_pos.append(int(np.argmax(min_dist)))
+
+    assert list(cases.index) == list(df.index[sel_pos]), "Should select the same cases"
+
+    print("✓ maximum_dissimilarity_algorithm test passed")
+    return True
+
+def test_threshold_indicators():
+    """Test the threshold indicators against their definitions in float64 and float32."""
+    print("Testing threshold indicators...")
+
+    from environmentaltools.spatiotemporal import indicators
+
+    functions = {
+        "RAEH": indicators.fractional_exceedance_area,
+        "MEW": indicators.mean_exceedance_over_total_area,
+        "MEDW": indicators.mean_excess_over_total_area,
+        "WMEW": indicators.mean_exceedance_over_exceedance_area,
+        "WMDW": indicators.mean_excess_over_exceedance_area,
+        "AEAN": indicators.exceedance_to_nonexceedance_ratio,
+    }
+
+    np.random.seed(42)
+    values = np.random.gamma(2, 2, 5000)
+    values[::50] = np.nan
+    for dtype in (np.float64, np.float32):
+        # Few thresholds (direct count), many thresholds and the default ones (sort),
+        # which are NaN if the data has NaN values
+        for data, thresholds in (
+            (values.astype(dtype), np.array([0, 2.5, 5.0, 100])),
+            (values.astype(dtype), np.linspace(0, 20, 60)),
+            (values[~np.isnan(values)].astype(dtype), None),
+        ):
+            expected_thresholds = (
+                np.linspace(0, np.max(data), 100) if thresholds is None else thresholds
+            )
+            exceeding = data.astype(np.float64)[:, None] >= expected_thresholds
+            n_exceeding = exceeding.sum(axis=0)
+            sums = np.where(exceeding, data.astype(np.float64)[:, None], 0).sum(axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                expected = {
+                    "RAEH": n_exceeding / len(data),
+                    "MEW": sums / len(data),
+                    "MEDW": (sums - expected_thresholds * n_exceeding) / len(data),
+                    "WMEW": sums / n_exceeding,
+                    "WMDW": sums / n_exceeding - expected_thresholds,
+                    "AEAN": n_exceeding / (len(data) - n_exceeding),
+                }
+
+            _, fused = indicators.threshold_indicators(data, thresholds)
+            for name, function in functions.items():
+                thresholds_, result = function(data, thresholds)
+                np.testing.assert_array_equal(thresholds_, expected_thresholds)
+                np.testing.assert_allclose(result, expected[name], rtol=1e-12, atol=1e-12)
+                np.testing.assert_allclose(fused[name], expected[name], rtol=1e-12, atol=1e-12)
+
+    print("✓ threshold indicators test passed")
+    return True
+
+def test_histogram2d():
+    """Test that _histogram2d gives the density histogram of np.histogram2d."""
+    print("Testing _histogram2d...")
+
+    from environmentaltools.graphics.temporal import _histogram2d
+
+    df = create_wave_data()
+    x = df["Hs"].to_numpy()
+    # Values lying on the bin edges are binned as np.histogram2d does
+    y = np.round(np.random.normal(10, 2, len(x)), 1)
+    for bins in (10, 25):
+        H, xedges, yedges = _histogram2d(x, y, bins)
+        H_, xedges_, yedges_ = np.histogram2d(x, y, bins=[bins, bins], density=True)
+        np.testing.assert_allclose(H, H_, rtol=1e-12)
+        np.testing.assert_allclose(xedges, xedges_, rtol=1e-12)
+        np.testing.assert_allclose(yedges, yedges_, rtol=1e-12)
+
+    print("✓ _histogram2d test passed")
+    return True
+
+def test_read_json_cache():
+    """Test that read_json gives the same document from the .npz cache."""
+    print("Testing read_json cache...")
+
+    from environmentaltools.common import read, save
+
+    params = {
+        "var": "Hs",
+        "fun": {0: "norm", 1: "genpareto"},
+        "ws_ps": [0.05, 0.95],
+        "par": np.random.normal(0, 1, 20),
+        "mode": [2, 2],
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name = os.path.join(tmp_dir, "params.json")
+        save.to_json(params, file_name, numpy_array_serialization=True)
+
+        expected = read.read_json(file_name)
+        first = read.read_json(file_name, cache=True)
+        assert os.path.exists(file_name + ".npz"), "Should write the cache file"
+        # Skip the in-memory memoization, so the second read loads the .npz file
+        read._read_json_cached.cache_clear()
+        second = read.read_json(file_name, cache=True)
+
+    for result in (first, second):
+        assert list(result.keys()) == list(expected.keys()), "Should keep the keys"
+        for key, value in expected.items():
+            assert type(result[key]) is type(value), f"Should keep the type of {key}"
+            np.testing.assert_equal(result[key], value)
+
+    print("✓ read_json cache test passed")
+    return True
+
+def test_refinement_regular_grids():
+    """Test the regular-grid paths of refinement against LinearNDInterpolator."""
+    print("Testing refinement on regular grids...")
+
+    from environmentaltools.spatiotemporal.utils import refinement
+    from scipy.interpolate import LinearNDInterpolator
+
+    np.random.seed(42)
+    j, i = np.meshgrid(np.arange(60.0), np.arange(40.0))
+    angle = 0.4
+    grids = {
+        # Axis-aligned grid with the y axis descending along the rows
+        "descending": (5e5 + 2.0 * j, 4e6 - 2.0 * i),
+        # Grid rotated by the angle
+        "rotated": (
+            5e5 + 2.0 * (np.cos(angle) * j - np.sin(angle) * i),
+            4e6 + 2.0 * (np.sin(angle) * j + np.cos(angle) * i),
+        ),
+    }
+    for name, (x, y) in grids.items():
+        # Planar DEM, interpolated exactly by both methods
+        z = 0.3 * (x - 5e5) - 0.2 * (y - 4e6) + 10
+        band_ = np.zeros(x.shape, dtype=bool)
+        band_[10:25] = True
+        # Target points over the whole DEM and beyond, so that part of them fall
+        # outside the band
+        X = np.random.uniform(x.min() - 5, x.max() + 5, (30, 20))
+        Y = np.random.uniform(y.min() - 5, y.max() + 5, (30, 20))
+
+        Z = refinement({"x": x, "y": y, "z": z}, band_, {"X": X, "Y": Y})
+        expected = LinearNDInterpolator(
+            np.column_stack((x[band_], y[band_])), z[band_]
+        )(X, Y)
+
+        nan = np.isnan(expected)
+        assert nan.any() and not nan.all(), f"{name}: should have points out of the band"
+        np.testing.assert_array_equal(np.isnan(Z), nan)
+        # Rounding of the coordinates (about 1e6) bounds the absolute difference
+        np.testing.assert_allclose(Z[~nan], expected[~nan], rtol=1e-9, atol=1e-8)
+
+    print("✓ refinement test passed")
+    return True
+
 def run_all_tests():
     """Run all tests and report results."""
     print("="*60)
@@ -305,6 +517,12 @@ def run_all_tests():
         test_nonstationary_analysis,
         test_storm_series,
         test_temporal_utils,
+        test_var_bic,
+        test_maximum_dissimilarity_algorithm,
+        test_threshold_indicators,
+        test_histogram2d,
+        test_read_json_cache,
+        test_refinement_regular_grids,
     ]
     
     passed = 0